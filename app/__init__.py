@@ -0,0 +1,5 @@
+# Loaded before any app module, since many read their settings with
+# os.getenv at import time. Values already in the environment win.
+from dotenv import load_dotenv
+
+load_dotenv()
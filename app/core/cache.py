@@ -0,0 +1,57 @@
+import threading
+import time
+
+
+class TTLCache:
+    """
+    Small in-process cache whose entries expire `ttl` seconds after they
+    were computed. Concurrent misses on the same key wait for a single
+    computation instead of all running it.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = {}
+        self._lock = threading.Lock()
+        self._key_locks = {}
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def get_or_compute(self, key, compute):
+        value = self.get(key)
+        if value is not None:
+            return value
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            value = self.get(key)
+            if value is None:
+                value = compute()
+                self.set(key, value)
+        return value
+
+    def set(self, key, value):
+        now = time.monotonic()
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                for k in [k for k, (expires, _) in self._entries.items() if expires <= now]:
+                    self._entries.pop(k, None)
+                    self._key_locks.pop(k, None)
+                while len(self._entries) >= self.max_entries:
+                    oldest = min(self._entries, key=lambda k: self._entries[k][0])
+                    self._entries.pop(oldest)
+                    self._key_locks.pop(oldest, None)
+            self._entries[key] = (now + self.ttl, value)
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
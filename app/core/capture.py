@@ -0,0 +1,161 @@
+import json
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime
+
+
+TRAFFIC_CAPTURE_PATH = os.getenv("TRAFFIC_CAPTURE_PATH")
+TRAFFIC_CAPTURE_SAMPLE = float(os.getenv("TRAFFIC_CAPTURE_SAMPLE", "1.0"))
+TRAFFIC_CAPTURE_MAX_BODY = int(os.getenv("TRAFFIC_CAPTURE_MAX_BODY", "65536"))
+# enumerated parameters whose values are recorded as-is, so a replay sends
+# the same choice: without them `status=completed` replays as garbage
+TRAFFIC_CAPTURE_KEEP = set(
+    os.getenv("TRAFFIC_CAPTURE_KEEP", "status,type,dimension,period,fields").split(",")
+)
+
+_INTEGER = re.compile(r"^-?\d+$")
+# even for a kept key, only a word or a comma-separated list of words
+_ENUM_VALUE = re.compile(r"^[A-Za-z][A-Za-z_,-]{0,63}$")
+
+
+def _looks_like_datetime(value: str) -> bool:
+    if len(value) < 10 or value[4:5] != "-":
+        return False
+    try:
+        datetime.fromisoformat(value.replace("Z", "+00:00"))
+        return True
+    except ValueError:
+        return False
+
+
+def shape(value, key: str = ""):
+    """
+    Structure without content. Strings become "str:<len>" (or "datetime"),
+    numbers become their type, except integer *_id fields which are kept so
+    replays hit the same rows. Values of TRAFFIC_CAPTURE_KEEP keys are kept
+    as "=<value>".
+    """
+    if isinstance(value, dict):
+        return {k: shape(v, k) for k, v in value.items()}
+    if isinstance(value, list):
+        return {"list": len(value), "item": shape(value[0], key) if value else None}
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return value if key.endswith("_id") else "int"
+    if isinstance(value, float):
+        return "float"
+    if isinstance(value, str):
+        if key in TRAFFIC_CAPTURE_KEEP and _ENUM_VALUE.match(value):
+            return f"={value}"
+        return "datetime" if _looks_like_datetime(value) else f"str:{len(value)}"
+    return None if value is None else type(value).__name__
+
+
+def shape_query(query_string: bytes) -> dict:
+    """
+    Like `shape`, for query parameters, which are all strings: *_id values
+    are kept, other integers become "int:<digits>".
+    """
+    from urllib.parse import parse_qsl
+
+    shaped = {}
+    for k, v in parse_qsl(query_string.decode("latin-1"), keep_blank_values=True):
+        if _INTEGER.match(v):
+            shaped[k] = v if k.endswith("_id") else f"int:{len(v.lstrip('-'))}"
+        else:
+            shaped[k] = shape(v, k)
+    return shaped
+
+
+class TrafficCapture:
+    """
+    Appends one JSON line per request: arrival time (Unix epoch seconds, so
+    captures from several workers or hosts merge on one clock), method,
+    route template, path, sanitized query and body shape, status and
+    latency.
+    """
+
+    def __init__(self, path: str, sample: float = TRAFFIC_CAPTURE_SAMPLE):
+        self.path = path
+        self.sample = sample
+        self._file = open(path, "a", encoding="utf-8", buffering=1 << 16)
+        self._lock = threading.Lock()
+        self._write({"capture_started": datetime.now().astimezone().isoformat()})
+
+    def record(self, entry: dict):
+        entry["t"] = round(entry["t"], 4)
+        self._write(entry)
+
+    def _write(self, entry: dict):
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._file.write(line)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+capture = TrafficCapture(TRAFFIC_CAPTURE_PATH) if TRAFFIC_CAPTURE_PATH else None
+
+
+class TrafficCaptureMiddleware:
+    def __init__(self, app, recorder: TrafficCapture | None = None):
+        self.app = app
+        self.recorder = recorder or capture
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or self.recorder is None
+                or random.random() >= self.recorder.sample):
+            return await self.app(scope, receive, send)
+
+        arrived = time.time()
+        start = time.perf_counter()
+        chunks = []
+        size = 0
+        status = 500
+
+        async def receive_wrapper():
+            nonlocal size
+            message = await receive()
+            if message["type"] == "http.request" and size <= TRAFFIC_CAPTURE_MAX_BODY:
+                body = message.get("body", b"")
+                size += len(body)
+                if size <= TRAFFIC_CAPTURE_MAX_BODY:
+                    chunks.append(body)
+            return message
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            route = scope.get("route")
+            self.recorder.record({
+                "t": arrived,
+                "method": scope["method"],
+                "route": getattr(route, "path", None),
+                "path": scope["path"],
+                "query": shape_query(scope.get("query_string", b"")),
+                "body": self._body_shape(chunks, size),
+                "status": status,
+                "ms": round((time.perf_counter() - start) * 1000, 2),
+            })
+
+    def _body_shape(self, chunks, size):
+        if not size:
+            return None
+        if size > TRAFFIC_CAPTURE_MAX_BODY:
+            return f"too_large:{size}"
+        try:
+            return shape(json.loads(b"".join(chunks)))
+        except ValueError:
+            return f"bytes:{size}"
@@ -1,31 +1,211 @@
+import itertools
 import os
+import threading
+import time
+from fastapi import Request
 from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import sessionmaker, declarative_base
-from dotenv import load_dotenv
 
-load_dotenv()
+# The engine is created on first use rather than at import time, so a cold
+# start only pays for it when a request actually touches the database.
+_engine = None
+_engine_lock = threading.Lock()
 
-DATABASE_URL = os.getenv("DATABASE_URL")
 
-if not DATABASE_URL:
-    raise RuntimeError("DATABASE_URL is not set")
+def get_engine():
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                database_url = os.getenv("DATABASE_URL")
+                if not database_url:
+                    raise RuntimeError("DATABASE_URL is not set")
 
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True
-)
+                _engine = create_engine(
+                    database_url,
+                    pool_pre_ping=True
+                )
+                SessionLocal.configure(bind=_engine)
+    return _engine
+
+
+class _LazySessionmaker(sessionmaker):
+    def __call__(self, **local_kw):
+        if _engine is None:
+            get_engine()
+        return super().__call__(**local_kw)
 
-SessionLocal = sessionmaker(
+
+SessionLocal = _LazySessionmaker(
     autocommit=False,
-    autoflush=False,
-    bind=engine
+    autoflush=False
 )
 
 Base = declarative_base()
 
+
+def __getattr__(name):
+    # `from app.core.database import engine` keeps working
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+# -------- READ REPLICAS --------
+DATABASE_REPLICA_URLS = [u.strip() for u in os.getenv("DATABASE_REPLICA_URLS", "").split(",") if u.strip()]
+REPLICA_HEALTH_INTERVAL = float(os.getenv("REPLICA_HEALTH_INTERVAL", "5"))
+REPLICA_RETRY_AFTER = float(os.getenv("REPLICA_RETRY_AFTER", "30"))
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+READ_YOUR_WRITES_COOKIE = "hs_rw"
+
+
+class ReplicaPool:
+    """
+    Round-robin over replica engines. Each replica is pinged at most once
+    per `health_interval`; one that fails a ping or a query is skipped for
+    `retry_after` seconds. `pick` returns None when no replica is usable,
+    and callers fall back to the primary.
+    """
+
+    def __init__(self, urls, health_interval: float = REPLICA_HEALTH_INTERVAL,
+                 retry_after: float = REPLICA_RETRY_AFTER):
+        self.urls = list(urls)
+        self.health_interval = health_interval
+        self.retry_after = retry_after
+        self._engines = None
+        self._checked_at = {}
+        self._down_until = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+
+    def __bool__(self):
+        return bool(self.urls)
+
+    def engines(self):
+        if self._engines is None:
+            with self._lock:
+                if self._engines is None:
+                    self._engines = [create_engine(url, pool_pre_ping=True) for url in self.urls]
+        return self._engines
+
+    def pick(self):
+        if not self.urls:
+            return None
+        engines = self.engines()
+        now = time.monotonic()
+        start = next(self._counter)
+        for i in range(len(engines)):
+            engine = engines[(start + i) % len(engines)]
+            if self._down_until.get(engine, 0) > now:
+                continue
+            if now - self._checked_at.get(engine, 0) >= self.health_interval and not self._ping(engine, now):
+                continue
+            return engine
+        return None
+
+    def mark_down(self, engine):
+        self._down_until[engine] = time.monotonic() + self.retry_after
+        print(f"Replica {engine.url.render_as_string(hide_password=True)} marked down")
+
+    def _ping(self, engine, now: float) -> bool:
+        self._checked_at[engine] = now
+        try:
+            with engine.connect() as conn:
+                conn.exec_driver_sql("SELECT 1")
+            return True
+        except Exception:
+            self.mark_down(engine)
+            return False
+
+
+replicas = ReplicaPool(DATABASE_REPLICA_URLS)
+
+# client key -> monotonic deadline until which reads stay on the primary
+_recent_writers = {}
+
+
+def _client_key(scope_or_request) -> str:
+    headers = scope_or_request.headers
+    user = headers.get("x-user-id")
+    if user:
+        return f"user:{user}"
+    client = scope_or_request.client
+    return f"ip:{client.host if client else 'unknown'}"
+
+
+def mark_write(request: Request):
+    now = time.monotonic()
+    if len(_recent_writers) > 10_000:
+        for key in [k for k, until in _recent_writers.items() if until <= now]:
+            del _recent_writers[key]
+    _recent_writers[_client_key(request)] = now + READ_YOUR_WRITES_SECONDS
+
+
+def recently_wrote(request: Request) -> bool:
+    if request.cookies.get(READ_YOUR_WRITES_COOKIE):
+        return True
+    return _recent_writers.get(_client_key(request), 0) > time.monotonic()
+
+
+class ReadYourWritesMiddleware:
+    """
+    After a successful write, keep that client's reads on the primary for
+    READ_YOUR_WRITES_SECONDS: tracked in-process and, for other workers,
+    with a short-lived cookie.
+    """
+
+    WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in self.WRITE_METHODS or not replicas:
+            return await self.app(scope, receive, send)
+
+        request = Request(scope)
+        cookie = (
+            f"{READ_YOUR_WRITES_COOKIE}=1; Max-Age={int(READ_YOUR_WRITES_SECONDS)}; "
+            "Path=/; HttpOnly; SameSite=None; Secure"
+        ).encode()
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and message["status"] < 400:
+                mark_write(request)
+                message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", cookie)]
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def get_read_db(request: Request):
+    """
+    Session for read-only endpoints: a healthy replica, or the primary when
+    there is none or this client wrote within the read-your-writes window.
+    """
+    engine = None if recently_wrote(request) else replicas.pick()
+    db = SessionLocal(bind=engine) if engine is not None else SessionLocal()
+    try:
+        yield db
+    except OperationalError:
+        if engine is not None:
+            replicas.mark_down(engine)
+        raise
+    finally:
+        db.close()
+
+
+def init_db():
+    """
+    Create any missing tables. Existing tables are left untouched.
+    """
+    import app.models  # noqa: F401  registers every model on Base.metadata
+    Base.metadata.create_all(bind=get_engine())
@@ -0,0 +1,143 @@
+import os
+import random
+import threading
+from collections import deque
+from datetime import datetime, timezone
+from time import perf_counter
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.metrics import current_request, request_end_hooks
+
+
+DIAGNOSTICS_ENABLED = os.getenv("DIAGNOSTICS_ENABLED", "0") == "1"
+DIAGNOSTICS_TOKEN = os.getenv("DIAGNOSTICS_TOKEN")
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+EXPLAIN_SAMPLE_RATE = float(os.getenv("EXPLAIN_SAMPLE_RATE", "0.1"))
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "10"))
+DIAGNOSTICS_LOG_SIZE = int(os.getenv("DIAGNOSTICS_LOG_SIZE", "500"))
+
+
+def params_shape(parameters, executemany: bool):
+    """
+    Types only, never values: {"email": "str"} or ["int", "int"].
+    """
+    if executemany:
+        rows = list(parameters or [])
+        return {"rows": len(rows), "each": params_shape(rows[0], False) if rows else None}
+    if isinstance(parameters, dict):
+        return {k: type(v).__name__ for k, v in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(v).__name__ for v in parameters]
+    return type(parameters).__name__
+
+
+class QueryDiagnostics:
+    """
+    Slow-query log with sampled EXPLAIN plans, plus per-request detection
+    of statement templates that repeat more than `n_plus_one_threshold`
+    times (the classic N+1 pattern). Both logs are bounded ring buffers.
+    """
+
+    def __init__(self, slow_query_ms: float = SLOW_QUERY_MS, explain_sample_rate: float = EXPLAIN_SAMPLE_RATE,
+                 n_plus_one_threshold: int = N_PLUS_ONE_THRESHOLD, size: int = DIAGNOSTICS_LOG_SIZE):
+        self.slow_query_ms = slow_query_ms
+        self.explain_sample_rate = explain_sample_rate
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.slow_queries = deque(maxlen=size)
+        self.n_plus_one = deque(maxlen=size)
+        self._lock = threading.Lock()
+        self.enabled = False
+
+    def enable(self):
+        if self.enabled:
+            return
+        event.listen(Engine, "before_cursor_execute", self._before)
+        event.listen(Engine, "after_cursor_execute", self._after)
+        request_end_hooks.append(self._request_finished)
+        self.enabled = True
+
+    def clear(self):
+        self.slow_queries.clear()
+        self.n_plus_one.clear()
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._diagnostics_start = perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "_diagnostics_start", None)
+        if start is None:
+            return
+        elapsed_ms = (perf_counter() - start) * 1000
+        stats = current_request()
+
+        if stats is not None:
+            if stats.extra is None:
+                stats.extra = {}
+            counts = stats.extra.setdefault("statements", {})
+            counts[statement] = counts.get(statement, 0) + 1
+
+        if elapsed_ms < self.slow_query_ms:
+            return
+
+        entry = {
+            "at": datetime.now(timezone.utc).isoformat(),
+            "route": f"{stats.method} {stats.route_template()}" if stats else "<background>",
+            "duration_ms": round(elapsed_ms, 2),
+            "statement": statement,
+            "params_shape": params_shape(parameters, executemany),
+            "plan": None,
+        }
+        if (not executemany and statement.lstrip().upper().startswith("SELECT")
+                and random.random() < self.explain_sample_rate):
+            entry["plan"] = self._explain(conn, statement, parameters)
+        with self._lock:
+            self.slow_queries.append(entry)
+
+    def _explain(self, conn, statement, parameters):
+        prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+        # a failed statement aborts a Postgres transaction, and this one is
+        # the request's own: fence the EXPLAIN off in a savepoint. SQLite
+        # keeps its transaction usable after an error.
+        savepoint = conn.dialect.name != "sqlite" and conn.in_transaction()
+        # separate DBAPI cursor: the original one still holds the result
+        # the application is about to fetch, and this bypasses our hooks
+        cursor = conn.connection.cursor()
+        try:
+            if savepoint:
+                cursor.execute("SAVEPOINT diagnostics_explain")
+            try:
+                cursor.execute(prefix + statement, parameters)
+                plan = [" ".join(str(col) for col in row) for row in cursor.fetchall()]
+            except Exception as e:
+                if savepoint:
+                    cursor.execute("ROLLBACK TO SAVEPOINT diagnostics_explain")
+                plan = [f"EXPLAIN failed: {e!r}"]
+            if savepoint:
+                cursor.execute("RELEASE SAVEPOINT diagnostics_explain")
+            return plan
+        finally:
+            cursor.close()
+
+    def _request_finished(self, stats, status, elapsed):
+        counts = (stats.extra or {}).get("statements")
+        if not counts:
+            return
+        now = datetime.now(timezone.utc).isoformat()
+        for statement, n in counts.items():
+            if n > self.n_plus_one_threshold:
+                with self._lock:
+                    self.n_plus_one.append({
+                        "at": now,
+                        "route": f"{stats.method} {stats.route}",
+                        "statement": statement,
+                        "count": n,
+                    })
+
+
+diagnostics = QueryDiagnostics()
+
+if DIAGNOSTICS_ENABLED:
+    diagnostics.enable()
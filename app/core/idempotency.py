@@ -0,0 +1,296 @@
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+
+from app.core.database import SessionLocal
+from app.models.idempotency import IdempotencyKey
+
+
+IDEMPOTENCY_ROUTES = os.getenv("IDEMPOTENCY_ROUTES", "POST /bookings/;POST /auth/signup")
+IDEMPOTENCY_TTL_HOURS = float(os.getenv("IDEMPOTENCY_TTL_HOURS", "24"))
+IDEMPOTENCY_CACHE_SIZE = int(os.getenv("IDEMPOTENCY_CACHE_SIZE", "10000"))
+# how long a duplicate waits for the first request before getting a 409
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "10"))
+# a claim older than this belongs to a worker that died mid-request
+IDEMPOTENCY_CLAIM_TIMEOUT = float(os.getenv("IDEMPOTENCY_CLAIM_TIMEOUT", "300"))
+IDEMPOTENCY_MAX_KEY_LENGTH = 255
+
+BUSY = object()
+
+
+def parse_routes(spec: str) -> set:
+    """
+    "POST /bookings/;POST /auth/signup" -> {("POST", "/bookings/"), ...}
+    """
+    routes = set()
+    for part in spec.split(";"):
+        method, _, path = part.strip().partition(" ")
+        if path:
+            routes.add((method.upper(), path.strip()))
+    return routes
+
+
+class StoredResponse:
+    __slots__ = ("fingerprint", "status_code", "content_type", "body")
+
+    def __init__(self, fingerprint, status_code, content_type, body):
+        self.fingerprint = fingerprint
+        self.status_code = status_code
+        self.content_type = content_type
+        self.body = body
+
+
+def _utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class IdempotencyStore:
+    """
+    Completed responses in `idempotency_keys`, fronted by an in-process LRU.
+    A row with no status_code is a claim: the first request holding a key
+    inserts it before executing, which is what makes other workers wait.
+    """
+
+    def __init__(self, cache_size: int = IDEMPOTENCY_CACHE_SIZE, ttl_hours: float = IDEMPOTENCY_TTL_HOURS,
+                 claim_timeout: float = IDEMPOTENCY_CLAIM_TIMEOUT):
+        self.cache_size = cache_size
+        self.ttl = timedelta(hours=ttl_hours)
+        self.claim_timeout = timedelta(seconds=claim_timeout)
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._completed = 0
+
+    # -------- LRU --------
+    def cached(self, key: str):
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            expires, response = entry
+            if expires <= time.monotonic():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return response
+
+    def _remember(self, key: str, response: StoredResponse, created_at: datetime):
+        remaining = (_utc(created_at) + self.ttl - datetime.now(timezone.utc)).total_seconds()
+        if remaining <= 0:
+            return
+        with self._lock:
+            self._cache[key] = (time.monotonic() + remaining, response)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    # -------- TABLE --------
+    def claim(self, key: str, fingerprint: str):
+        """
+        None if this caller now owns the key, a StoredResponse if the key
+        already completed, or BUSY while another request holds it.
+        """
+        db = SessionLocal()
+        try:
+            for _ in range(3):
+                try:
+                    db.add(IdempotencyKey(key=key, fingerprint=fingerprint))
+                    db.commit()
+                    return None
+                except IntegrityError:
+                    db.rollback()
+
+                row = db.get(IdempotencyKey, key)
+                if row is None:
+                    continue
+                age = datetime.now(timezone.utc) - _utc(row.created_at)
+                if row.status_code is not None and age < self.ttl:
+                    response = StoredResponse(row.fingerprint, row.status_code, row.content_type, row.body)
+                    self._remember(key, response, row.created_at)
+                    return response
+                if row.status_code is None and age < self.claim_timeout:
+                    return BUSY
+
+                # expired response or abandoned claim: take the key over
+                db.query(IdempotencyKey).filter(
+                    IdempotencyKey.key == key,
+                    IdempotencyKey.created_at == row.created_at
+                ).delete(synchronize_session=False)
+                db.commit()
+                db.expunge_all()
+            return BUSY
+        finally:
+            db.close()
+
+    def complete(self, key: str, response: StoredResponse):
+        db = SessionLocal()
+        try:
+            db.query(IdempotencyKey).filter(IdempotencyKey.key == key).update({
+                IdempotencyKey.status_code: response.status_code,
+                IdempotencyKey.content_type: response.content_type,
+                IdempotencyKey.body: response.body,
+            }, synchronize_session=False)
+            self._completed += 1
+            if self._completed % 1000 == 0:
+                cutoff = datetime.now(timezone.utc) - self.ttl
+                db.query(IdempotencyKey).filter(
+                    IdempotencyKey.created_at < cutoff
+                ).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+        self._remember(key, response, datetime.now(timezone.utc))
+
+    def release(self, key: str):
+        """
+        Drop a claim whose request failed, so a retry executes again.
+        """
+        db = SessionLocal()
+        try:
+            db.query(IdempotencyKey).filter(
+                IdempotencyKey.key == key,
+                IdempotencyKey.status_code.is_(None)
+            ).delete(synchronize_session=False)
+            db.commit()
+        finally:
+            db.close()
+
+
+idempotency_store = IdempotencyStore()
+
+
+async def _send_json(send, status: int, payload: dict, headers=()):
+    body = json.dumps(payload).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()), *headers],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class IdempotencyMiddleware:
+    """
+    For the routes in IDEMPOTENCY_ROUTES, a request carrying an
+    Idempotency-Key runs at most once per key. Retries get the stored
+    response back (with `Idempotent-Replayed: true`) without executing;
+    a duplicate that arrives while the first is still running waits for
+    it. Reusing a key with a different body is a 422. 5xx responses are
+    not stored, so those can be retried.
+    """
+
+    def __init__(self, app, routes: set | None = None, store: IdempotencyStore | None = None):
+        self.app = app
+        self.routes = parse_routes(IDEMPOTENCY_ROUTES) if routes is None else routes
+        self.store = store or idempotency_store
+        self._inflight = {}
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or (scope["method"], scope["path"]) not in self.routes:
+            return await self.app(scope, receive, send)
+        header = Headers(scope=scope).get("idempotency-key")
+        if not header:
+            return await self.app(scope, receive, send)
+        if len(header) > IDEMPOTENCY_MAX_KEY_LENGTH:
+            return await _send_json(send, 400, {"detail": "Idempotency-Key is too long"})
+
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body", False):
+                break
+
+        key = f"{scope['method']} {scope['path']} {header}"
+        fingerprint = hashlib.sha256(body).hexdigest()[:32]
+
+        deadline = time.monotonic() + IDEMPOTENCY_WAIT_SECONDS
+        while True:
+            stored = self.store.cached(key)
+            if stored is not None:
+                return await self._replay(stored, fingerprint, send)
+
+            inflight = self._inflight.get(key)
+            if inflight is not None:
+                # same worker: wait on the first execution rather than the table
+                try:
+                    await asyncio.wait_for(inflight.wait(), max(0.0, deadline - time.monotonic()))
+                except asyncio.TimeoutError:
+                    return await self._busy(send)
+                continue
+
+            done = asyncio.Event()
+            self._inflight[key] = done
+            try:
+                claim = await run_in_threadpool(self.store.claim, key, fingerprint)
+                if isinstance(claim, StoredResponse):
+                    return await self._replay(claim, fingerprint, send)
+                if claim is BUSY:
+                    # another worker holds the key; poll until it finishes
+                    if time.monotonic() >= deadline:
+                        return await self._busy(send)
+                    await asyncio.sleep(0.1)
+                    continue
+                return await self._execute(scope, body, key, fingerprint, send)
+            finally:
+                del self._inflight[key]
+                done.set()
+
+    async def _execute(self, scope, body, key, fingerprint, send):
+        sent = False
+
+        async def replay_receive():
+            nonlocal sent
+            if sent:
+                return {"type": "http.disconnect"}
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        status = 500
+        content_type = None
+        chunks = []
+
+        async def send_wrapper(message):
+            nonlocal status, content_type
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                content_type = Headers(raw=message.get("headers", [])).get("content-type")
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_receive, send_wrapper)
+        except Exception:
+            await run_in_threadpool(self.store.release, key)
+            raise
+
+        if status >= 500 or status in (409, 429):
+            await run_in_threadpool(self.store.release, key)
+        else:
+            response = StoredResponse(fingerprint, status, content_type, b"".join(chunks))
+            await run_in_threadpool(self.store.complete, key, response)
+
+    async def _replay(self, stored: StoredResponse, fingerprint: str, send):
+        if stored.fingerprint != fingerprint:
+            return await _send_json(send, 422, {
+                "detail": "Idempotency-Key was already used with a different request body"
+            })
+        headers = [(b"content-length", str(len(stored.body or b"")).encode()), (b"idempotent-replayed", b"true")]
+        if stored.content_type:
+            headers.append((b"content-type", stored.content_type.encode()))
+        await send({"type": "http.response.start", "status": stored.status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": stored.body or b""})
+
+    async def _busy(self, send):
+        await _send_json(send, 409, {
+            "detail": "A request with this Idempotency-Key is still being processed"
+        }, headers=[(b"retry-after", b"1")])
@@ -0,0 +1,291 @@
+"""
+Cross-worker cache invalidation.
+
+Write paths publish `(topic, key)` after they commit; every worker's
+in-process caches subscribe by topic and drop or refresh the entry.
+
+    CACHE_BUS=postgres         LISTEN/NOTIFY on the primary (the default on Postgres)
+    CACHE_BUS=file:/tmp/bus    append-only log on a shared disk, for local
+                               multi-worker runs and tests
+    CACHE_BUS=local            this process only (the default elsewhere)
+
+Publishing only queues the message: one sender thread per worker
+numbers and sends them in order, over a connection of its own, so a
+write path never waits on the bus or a shared lock.
+
+Every message carries its publisher's id and a per-publisher sequence
+number. A worker that sees a gap in a publisher's sequence, loses its
+listening connection or finds the log truncated cannot tell what it
+missed, so it flushes every subscribed cache instead; they reload from
+the database on next use. A message that fails to send, or that did not
+fit in the queue, leaves such a gap.
+"""
+import fcntl
+import itertools
+import json
+import os
+import queue
+import select
+import threading
+import uuid
+
+from app.core.database import get_engine
+
+
+CACHE_BUS = os.getenv("CACHE_BUS", "")
+CACHE_BUS_CHANNEL = os.getenv("CACHE_BUS_CHANNEL", "cache_invalidation")
+CACHE_BUS_POLL_INTERVAL = float(os.getenv("CACHE_BUS_POLL_INTERVAL", "0.2"))
+CACHE_BUS_QUEUE_SIZE = int(os.getenv("CACHE_BUS_QUEUE_SIZE", "10000"))
+# the file log is truncated past this size; listeners treat that as a gap
+CACHE_BUS_FILE_MAX_BYTES = int(os.getenv("CACHE_BUS_FILE_MAX_BYTES", str(1024 * 1024)))
+
+
+# -------- TRANSPORTS --------
+class LocalTransport:
+    name = "local"
+
+    def send(self, payload: str):
+        pass
+
+    def close(self):
+        pass
+
+    def listen(self, deliver, resync, stopping: threading.Event):
+        pass
+
+
+class PostgresTransport:
+    name = "postgres"
+
+    def __init__(self, channel: str = CACHE_BUS_CHANNEL):
+        self.channel = channel
+        self._raw = None         # the sender thread's own connection
+
+    def send(self, payload: str):
+        try:
+            if self._raw is None:
+                self._raw = get_engine().raw_connection()
+                self._raw.driver_connection.autocommit = True
+            with self._raw.driver_connection.cursor() as cursor:
+                cursor.execute("SELECT pg_notify(%s, %s)", (self.channel, payload))
+        except Exception:
+            self.close()
+            raise
+
+    def close(self):
+        if self._raw is not None:
+            self._raw.invalidate()
+            self._raw = None
+
+    def listen(self, deliver, resync, stopping: threading.Event):
+        while not stopping.is_set():
+            raw = None
+            try:
+                raw = get_engine().raw_connection()
+                conn = raw.driver_connection
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute(f'LISTEN "{self.channel}"')
+                # anything published while we were not listening is lost
+                resync("listening")
+                while not stopping.is_set():
+                    if select.select([conn], [], [], CACHE_BUS_POLL_INTERVAL * 5) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        deliver(conn.notifies.pop(0).payload)
+            except Exception as e:
+                print(f"Cache bus listener failed, reconnecting: {e!r}")
+                stopping.wait(1.0)
+            finally:
+                if raw is not None:
+                    raw.invalidate()
+
+
+class FileTransport:
+    name = "file"
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def send(self, payload: str):
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            if os.fstat(fd).st_size > CACHE_BUS_FILE_MAX_BYTES:
+                os.ftruncate(fd, 0)
+            os.write(fd, payload.encode() + b"\n")
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def close(self):
+        pass
+
+    def _size(self) -> int:
+        try:
+            return os.stat(self.path).st_size
+        except FileNotFoundError:
+            return 0
+
+    def listen(self, deliver, resync, stopping: threading.Event):
+        offset = self._size()
+        while not stopping.wait(CACHE_BUS_POLL_INTERVAL):
+            size = self._size()
+            if size < offset:
+                resync("log truncated")
+                offset = 0
+            if size == offset:
+                continue
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                chunk = f.read(size - offset)
+            # only whole lines; a half-written one is picked up next poll
+            end = chunk.rfind(b"\n") + 1
+            offset += end
+            for line in chunk[:end].splitlines():
+                if line:
+                    deliver(line.decode())
+
+
+def make_transport(spec: str = CACHE_BUS):
+    if spec.startswith("file:"):
+        return FileTransport(spec[len("file:"):])
+    if spec == "postgres":
+        return PostgresTransport()
+    if spec == "local":
+        return LocalTransport()
+    return PostgresTransport() if get_engine().dialect.name == "postgresql" else LocalTransport()
+
+
+# -------- BUS --------
+class InvalidationBus:
+    """
+    Handlers are `fn(key)`; `key` is None when the whole cache should go.
+    A worker never receives its own messages: the write path has already
+    updated that worker's caches directly.
+    """
+
+    def __init__(self, spec: str = CACHE_BUS):
+        self.spec = spec
+        self.origin = uuid.uuid4().hex[:12]
+        self._transport = None
+        self._seq = itertools.count(1)
+        self._outbox = queue.Queue(maxsize=CACHE_BUS_QUEUE_SIZE)
+        self._lost = False       # a message was dropped; leave a gap
+        self._sender = None
+        self._sender_lock = threading.Lock()
+        self._seen = {}          # origin -> last sequence number delivered
+        self._handlers = {}      # topic -> [fn]
+        self._thread = None
+        self._stopping = threading.Event()
+        self.flushes = 0
+
+    @property
+    def transport(self):
+        if self._transport is None:
+            self._transport = make_transport(self.spec)
+        return self._transport
+
+    def subscribe(self, topic: str, handler):
+        self._handlers.setdefault(topic, []).append(handler)
+        return handler
+
+    def publish(self, topic: str, key=None):
+        """
+        Call after the write has committed. Queues the message and returns
+        straight away; never raises.
+        """
+        if isinstance(self.transport, LocalTransport):
+            return
+        if self._sender is None:
+            self._start_sender()
+        try:
+            self._outbox.put_nowait((topic, None if key is None else str(key)))
+        except queue.Full:
+            self._lost = True
+            print(f"Cache bus queue full, dropped {topic}:{key}")
+
+    def _start_sender(self):
+        with self._sender_lock:
+            if self._sender is None:
+                self._sender = threading.Thread(target=self._send_loop, name="cache-bus-send", daemon=True)
+                self._sender.start()
+
+    def _send_loop(self):
+        # the only thread that numbers and sends, so messages go out in
+        # sequence order
+        while True:
+            item = self._outbox.get()
+            if item is None:
+                break
+            topic, key = item
+            if self._lost:
+                # receivers see the skipped number and flush
+                self._lost = False
+                next(self._seq)
+            payload = json.dumps({"origin": self.origin, "seq": next(self._seq), "topic": topic, "key": key})
+            try:
+                self.transport.send(payload)
+            except Exception as e:
+                print(f"Cache bus publish {topic}:{key} failed: {e!r}")
+        self.transport.close()
+
+    def _deliver(self, payload: str):
+        try:
+            msg = json.loads(payload)
+        except ValueError:
+            return
+        origin, seq = msg.get("origin"), msg.get("seq")
+        if origin == self.origin or not isinstance(seq, int):
+            return
+
+        last = self._seen.get(origin)
+        if last is not None and seq <= last:
+            return
+        self._seen[origin] = seq
+        # first contact mid-stream, or a hole: something was missed
+        if seq != (last or 0) + 1:
+            return self.flush(f"gap from {origin}: {last} -> {seq}")
+        self._dispatch(msg.get("topic"), msg.get("key"))
+
+    def _dispatch(self, topic, key):
+        for handler in self._handlers.get(topic, []):
+            try:
+                handler(key)
+            except Exception as e:
+                print(f"Cache bus handler {handler.__name__} for {topic}:{key} failed: {e!r}")
+
+    def flush(self, reason: str = "manual"):
+        self.flushes += 1
+        print(f"Cache bus flushing all caches ({reason})")
+        for topic in list(self._handlers):
+            self._dispatch(topic, None)
+
+    def start(self):
+        if self._thread or not self._handlers or isinstance(self.transport, LocalTransport):
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self.transport.listen, args=(self._deliver, self.flush, self._stopping),
+            name="cache-bus", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        if self._sender is not None:
+            # sends what is already queued, then exits
+            try:
+                self._outbox.put(None, timeout=timeout)
+            except queue.Full:
+                pass
+            self._sender.join(timeout)
+            self._sender = None
+        if not self._thread:
+            return
+        self._stopping.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+
+cache_bus = InvalidationBus()
@@ -0,0 +1,220 @@
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar
+from time import perf_counter
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+# upstream LLM completions take seconds, not milliseconds
+COMPLETION_BUCKETS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+# -------- METRIC FAMILIES --------
+class Counter:
+    def __init__(self, name: str, help: str, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels=(), amount: float = 1):
+        with self._lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in list(self.values.items()):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {value}"
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labels -> [count per bucket..., +Inf count, sum]
+        self.series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value: float):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            s = self.series.get(labels)
+            if s is None:
+                s = self.series[labels] = [0] * (len(self.buckets) + 2)
+            s[i] += 1
+            s[-1] += value
+
+    def render(self):
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, s in list(self.series.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets, s):
+                cumulative += n
+                le = 'le="%s"' % bound
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+            cumulative += s[-2]
+            le = 'le="+Inf"'
+            yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {s[-1]}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}"
+
+
+class Registry:
+    def __init__(self):
+        self._families = {}
+
+    def counter(self, name: str, help: str, labelnames=()) -> Counter:
+        return self._families.setdefault(name, Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames=(), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self._families.setdefault(name, Histogram(name, help, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for family in list(self._families.values()):
+            lines.extend(family.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.counter(
+    "http_requests_total", "Requests by route template and status.", ("method", "route", "status"))
+http_latency = registry.histogram(
+    "http_request_duration_seconds", "Request latency by route template.", ("method", "route"))
+db_statements = registry.counter(
+    "db_statements_total", "SQL statements executed, by route template.", ("method", "route"))
+db_time = registry.histogram(
+    "db_time_per_request_seconds", "Time spent in the database per request.", ("method", "route"))
+db_statements_per_request = registry.histogram(
+    "db_statements_per_request", "SQL statements per request.", ("method", "route"), STATEMENT_BUCKETS)
+chat_completions = registry.counter(
+    "chat_completions_total", "Chatbot completions by chat route, model, prompt version and outcome.",
+    ("chat_route", "model", "prompt", "outcome"))
+chat_tokens = registry.counter(
+    "chat_tokens_total", "Chatbot tokens by chat route, model and kind (prompt, cached, completion).",
+    ("chat_route", "model", "kind"))
+chat_cost = registry.counter(
+    "chat_cost_usd_total", "Chatbot spend reported by the provider, by chat route and model.",
+    ("chat_route", "model"))
+chat_latency = registry.histogram(
+    "chat_completion_duration_seconds", "Chatbot completion latency by chat route and model.",
+    ("chat_route", "model"), COMPLETION_BUCKETS)
+
+
+# -------- PER-REQUEST STATE --------
+class RequestStats:
+    __slots__ = ("scope", "method", "route", "db_statements", "db_seconds", "extra")
+
+    def __init__(self, scope):
+        self.scope = scope
+        self.method = scope["method"]
+        self.route = None
+        self.db_statements = 0
+        self.db_seconds = 0.0
+        # scratch space for other instrumentation (e.g. diagnostics)
+        self.extra = None
+
+    def route_template(self) -> str:
+        """
+        Route template once routing has happened, the raw path before that.
+        """
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or self.scope["path"]
+
+
+_current = ContextVar("request_stats", default=None)
+
+
+def current_request():
+    """
+    The RequestStats of the request being handled, or None outside a request.
+    Sync endpoints run in the threadpool with a copy of the context, so
+    they see (and mutate) the same object as the middleware.
+    """
+    return _current.get()
+
+
+# Called as hook(stats, status, elapsed) once a request has finished.
+request_end_hooks = []
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        stats = RequestStats(scope)
+        token = _current.set(stats)
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = perf_counter() - start
+            _current.reset(token)
+            route = scope.get("route")
+            stats.route = getattr(route, "path", None) or "<unmatched>"
+
+            labels = (stats.method, stats.route)
+            http_requests.inc((stats.method, stats.route, status))
+            http_latency.observe(labels, elapsed)
+            if stats.db_statements:
+                db_statements.inc(labels, stats.db_statements)
+            db_time.observe(labels, stats.db_seconds)
+            db_statements_per_request.observe(labels, stats.db_statements)
+
+            for hook in request_end_hooks:
+                hook(stats, status, elapsed)
+
+
+# -------- SQLALCHEMY HOOKS --------
+# Registered on the Engine class so every engine, including ones created
+# later, is instrumented.
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._metrics_start = perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start = getattr(context, "_metrics_start", None)
+    if start is None:
+        return
+    stats = _current.get()
+    if stats is not None:
+        stats.db_statements += 1
+        stats.db_seconds += perf_counter() - start
+    else:
+        db_statements.inc(("-", "<background>"))
@@ -0,0 +1,70 @@
+"""
+Bring an existing database up to the indexes declared on the models.
+
+    python -m app.core.migrations            # create what is missing
+    python -m app.core.migrations --dry-run  # only print the DDL
+
+`init_db` creates missing tables (and their indexes) but never touches
+tables that already exist, so indexes added to existing models are
+applied here. On Postgres they are built CONCURRENTLY so writes to the
+table are not blocked while the index builds.
+"""
+import argparse
+
+from sqlalchemy import inspect
+from sqlalchemy.schema import CreateIndex
+
+from app.core.database import Base, get_engine
+
+
+def missing_indexes(engine):
+    import app.models  # noqa: F401  registers every model on Base.metadata
+
+    inspector = inspect(engine)
+    tables = set(inspector.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in tables:
+            continue
+        existing = {ix["name"] for ix in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda ix: ix.name):
+            # indexes declared with .ddl_if(dialect=...) for another database
+            only_on = index._ddl_if.dialect if index._ddl_if is not None else None
+            if only_on not in (None, engine.dialect.name):
+                continue
+            if index.name not in existing:
+                yield index
+
+
+def ensure_indexes(engine=None, dry_run: bool = False, log=print):
+    engine = engine or get_engine()
+    postgres = engine.dialect.name == "postgresql"
+    created = []
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction block
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+        for index in missing_indexes(engine):
+            if postgres:
+                index.dialect_options["postgresql"]["concurrently"] = True
+            try:
+                log(str(CreateIndex(index).compile(dialect=engine.dialect)))
+                if not dry_run:
+                    conn.execute(CreateIndex(index))
+            finally:
+                # shared model metadata; create_all must keep plain CREATE INDEX
+                if postgres:
+                    index.dialect_options["postgresql"]["concurrently"] = False
+            created.append(index.name)
+    return created
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    created = ensure_indexes(dry_run=args.dry_run)
+    print(f"{len(created)} index(es) {'missing' if args.dry_run else 'created'}")
+
+
+if __name__ == "__main__":
+    main()
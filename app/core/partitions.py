@@ -0,0 +1,249 @@
+"""
+Monthly range partitioning of `bookings` on scheduled_at (Postgres).
+
+    python -m app.core.partitions --convert            # one-off, takes an exclusive lock
+    python -m app.core.partitions --ensure             # partitions for the coming months
+    python -m app.core.partitions --list
+    python -m app.core.partitions --convert --dry-run  # only print the DDL
+
+Partitions are named bookings_YYYY_MM, with a bookings_default partition
+catching anything outside them. Queries on scheduled_at ranges only touch
+the months they cover, and an archived month's empty partition is
+dropped outright instead of being vacuumed.
+
+A partitioned table's primary key has to include the partition key, so
+the table's key becomes (booking_id, scheduled_at). booking_id still
+comes from the same sequence, and the ORM keeps treating it as the
+identity.
+
+SQLite has no partitioning: every command is a no-op there, and
+app.services.archive alone keeps the table small.
+"""
+import argparse
+from datetime import date, datetime, timezone
+
+from sqlalchemy import text
+from sqlalchemy.schema import AddConstraint, CreateIndex
+
+from app.core.database import get_engine
+
+
+PARTITIONED_TABLE = "bookings"
+PARTITION_KEY = "scheduled_at"
+
+
+def month_start(value: date) -> date:
+    return date(value.year, value.month, 1)
+
+
+def next_month(value: date) -> date:
+    return date(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARTITIONED_TABLE}_{month:%Y_%m}"
+
+
+def _bounds(month: date) -> str:
+    return f"FROM ('{month.isoformat()} 00:00:00+00') TO ('{next_month(month).isoformat()} 00:00:00+00')"
+
+
+def _create_partition(month: date) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {PARTITIONED_TABLE} "
+        f"FOR VALUES {_bounds(month)}"
+    )
+
+
+def is_partitioned(conn) -> bool:
+    return bool(conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(:t)"
+    ), {"t": PARTITIONED_TABLE}).scalar())
+
+
+def partitions(conn) -> list[str]:
+    return list(conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = to_regclass(:t) ORDER BY c.relname"
+    ), {"t": PARTITIONED_TABLE}).scalars())
+
+
+def _run(conn, statements, dry_run: bool, log):
+    for statement in statements:
+        log(str(statement.compile(dialect=conn.dialect)) if not isinstance(statement, str) else statement)
+        if not dry_run:
+            conn.execute(text(statement) if isinstance(statement, str) else statement)
+
+
+def convert(engine=None, months_ahead: int = 3, dry_run: bool = False, log=print) -> bool:
+    """
+    Rebuild `bookings` as a partitioned table with the same columns,
+    defaults, indexes and foreign keys, copying every row. Writes to
+    bookings wait for the duration.
+    """
+    from app.models.booking import Booking
+
+    engine = engine or get_engine()
+    if engine.dialect.name != "postgresql":
+        log(f"{engine.dialect.name}: partitioning not supported, {PARTITIONED_TABLE} left as is")
+        return False
+
+    with engine.connect() as conn:
+        if is_partitioned(conn):
+            log(f"{PARTITIONED_TABLE} is already partitioned")
+            return False
+        conn.execute(text(f"LOCK TABLE {PARTITIONED_TABLE} IN ACCESS EXCLUSIVE MODE"))
+        low, high = conn.execute(text(
+            f"SELECT min({PARTITION_KEY}), max({PARTITION_KEY}) FROM {PARTITIONED_TABLE}"
+        )).one()
+
+        this_month = month_start(datetime.now(timezone.utc).date())
+        month = month_start(low.date()) if low else this_month
+        last = max(month_start(high.date()) if high else this_month, this_month)
+        for _ in range(months_ahead):
+            last = next_month(last)
+
+        new, old = f"{PARTITIONED_TABLE}_partitioned", f"{PARTITIONED_TABLE}_unpartitioned"
+        statements = [
+            f"CREATE TABLE {new} (LIKE {PARTITIONED_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+            f"PARTITION BY RANGE ({PARTITION_KEY})",
+            f"ALTER TABLE {new} ADD PRIMARY KEY (booking_id, {PARTITION_KEY})",
+            f"ALTER TABLE {PARTITIONED_TABLE} RENAME TO {old}",
+            f"ALTER TABLE {new} RENAME TO {PARTITIONED_TABLE}",
+            f"CREATE TABLE {PARTITIONED_TABLE}_default PARTITION OF {PARTITIONED_TABLE} DEFAULT",
+        ]
+        while month <= last:
+            statements.append(_create_partition(month))
+            month = next_month(month)
+        statements += [
+            f"INSERT INTO {PARTITIONED_TABLE} SELECT * FROM {old}",
+            f"ALTER SEQUENCE {PARTITIONED_TABLE}_booking_id_seq OWNED BY {PARTITIONED_TABLE}.booking_id",
+            # indexes keep their model names, so the old table has to go first
+            f"DROP TABLE {old}",
+        ]
+        statements += [CreateIndex(index) for index in sorted(Booking.__table__.indexes, key=lambda ix: ix.name)]
+        statements += [AddConstraint(fk) for fk in Booking.__table__.foreign_key_constraints]
+        _run(conn, statements, dry_run, log)
+        if dry_run:
+            conn.rollback()
+        else:
+            conn.commit()
+    return True
+
+
+def _split_from_default(month: date) -> list[str]:
+    """
+    A month whose rows already sit in the default partition cannot be
+    created in place: Postgres rejects a partition that would make
+    default rows violate its constraint. Build the month as a standalone
+    table, move its rows across, then attach it.
+    """
+    name = partition_name(month)
+    low, high = f"'{month.isoformat()} 00:00:00+00'", f"'{next_month(month).isoformat()} 00:00:00+00'"
+    return [
+        f"CREATE TABLE {name} (LIKE {PARTITIONED_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)",
+        f"WITH moved AS (DELETE FROM {PARTITIONED_TABLE}_default "
+        f"WHERE {PARTITION_KEY} >= {low} AND {PARTITION_KEY} < {high} RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved",
+        f"ALTER TABLE {PARTITIONED_TABLE} ATTACH PARTITION {name} FOR VALUES {_bounds(month)}",
+    ]
+
+
+def _default_months(conn) -> list[date]:
+    return [
+        value.date() for value in conn.execute(text(
+            f"SELECT DISTINCT date_trunc('month', {PARTITION_KEY} AT TIME ZONE 'UTC') "
+            f"FROM {PARTITIONED_TABLE}_default ORDER BY 1"
+        )).scalars()
+    ]
+
+
+def ensure(engine=None, months_ahead: int = 3, dry_run: bool = False, log=print) -> list[str]:
+    """
+    Create this month's and the next `months_ahead` months' partitions,
+    plus one for every month with rows in the default partition (bookings
+    made further ahead than that), moving those rows out. Each month is
+    its own transaction, so one failure does not hold back the rest.
+    """
+    engine = engine or get_engine()
+    if engine.dialect.name != "postgresql":
+        return []
+    with engine.connect() as conn:
+        if not is_partitioned(conn):
+            return []
+        existing = set(partitions(conn))
+        crowded = set(_default_months(conn))
+
+    months = set(crowded)
+    month = month_start(datetime.now(timezone.utc).date())
+    for _ in range(months_ahead + 1):
+        months.add(month)
+        month = next_month(month)
+
+    created = []
+    for month in sorted(months):
+        if partition_name(month) in existing:
+            continue
+        statements = _split_from_default(month) if month in crowded else [_create_partition(month)]
+        try:
+            with engine.begin() as conn:
+                _run(conn, statements, dry_run, log)
+        except Exception as e:
+            log(f"creating {partition_name(month)} failed: {e!r}")
+            continue
+        created.append(partition_name(month))
+    return created
+
+
+def drop_empty_before(engine, before: date, dry_run: bool = False, log=print) -> list[str]:
+    """
+    Detach and drop month partitions that end on or before `before` and
+    hold no rows, i.e. months the archiver has emptied.
+    """
+    if engine.dialect.name != "postgresql":
+        return []
+    dropped = []
+    with engine.begin() as conn:
+        if not is_partitioned(conn):
+            return []
+        for name in partitions(conn):
+            try:
+                month = datetime.strptime(name[len(PARTITIONED_TABLE) + 1:], "%Y_%m").date()
+            except ValueError:
+                continue  # the default partition
+            if next_month(month) > before:
+                continue
+            if conn.execute(text(f"SELECT EXISTS (SELECT 1 FROM {name})")).scalar():
+                continue
+            _run(conn, [f"ALTER TABLE {PARTITIONED_TABLE} DETACH PARTITION {name}", f"DROP TABLE {name}"],
+                 dry_run, log)
+            dropped.append(name)
+    return dropped
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--convert", action="store_true")
+    group.add_argument("--ensure", action="store_true")
+    group.add_argument("--list", action="store_true")
+    parser.add_argument("--months-ahead", type=int, default=3)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    engine = get_engine()
+    if args.convert:
+        convert(engine, args.months_ahead, args.dry_run)
+    elif args.ensure:
+        created = ensure(engine, args.months_ahead, args.dry_run)
+        print(f"{len(created)} partition(s) {'missing' if args.dry_run else 'created'}")
+    elif engine.dialect.name != "postgresql":
+        print(f"{engine.dialect.name}: {PARTITIONED_TABLE} is not partitioned")
+    else:
+        with engine.connect() as conn:
+            for name in partitions(conn):
+                print(name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+import json
+import math
+import os
+import time
+
+from app.core.security import token_subject
+
+
+# "METHOD /path=capacity/seconds" separated by ";". A rule allows a burst of
+# `capacity` requests and refills at capacity/seconds tokens per second.
+DEFAULT_RATE_LIMIT_RULES = (
+    "POST /auth/login=10/60;"
+    "POST /auth/signup=5/60;"
+    "POST /professionals/login=10/60;"
+    "POST /api/chat=20/60"
+)
+RATE_LIMIT_RULES = os.getenv("RATE_LIMIT_RULES", DEFAULT_RATE_LIMIT_RULES)
+# "METHOD /path" rules whose per-account bucket is keyed on the submitted
+# JSON "email": logins carry no token, and a guessing run spread across
+# IPs still hits one account
+RATE_LIMIT_LOGIN_RULES = os.getenv("RATE_LIMIT_LOGIN_RULES", "POST /auth/login;POST /professionals/login")
+# login bodies are tiny; anything bigger is not read for an email
+RATE_LIMIT_MAX_LOGIN_BODY = 16 * 1024
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL")
+RATE_LIMIT_TRUST_PROXY = os.getenv("RATE_LIMIT_TRUST_PROXY", "0") == "1"
+
+
+class Rule:
+    __slots__ = ("name", "capacity", "rate")
+
+    def __init__(self, name: str, capacity: int, seconds: float):
+        self.name = name
+        self.capacity = capacity
+        self.rate = capacity / seconds
+
+
+def parse_rules(spec: str) -> dict:
+    """
+    Returns {(method, path): Rule}. Paths are matched without a trailing slash.
+    """
+    rules = {}
+    for part in filter(None, (p.strip() for p in spec.split(";"))):
+        target, _, limit = part.partition("=")
+        method, _, path = target.strip().partition(" ")
+        capacity, _, seconds = limit.partition("/")
+        path = path.strip().rstrip("/") or "/"
+        rules[(method.upper(), path)] = Rule(f"{method.upper()} {path}", int(capacity), float(seconds))
+    return rules
+
+
+def parse_login_rules(spec: str) -> set:
+    names = set()
+    for part in filter(None, (p.strip() for p in spec.split(";"))):
+        method, _, path = part.partition(" ")
+        names.add(f"{method.upper()} {path.strip().rstrip('/') or '/'}")
+    return names
+
+
+# -------- BACKENDS --------
+class MemoryBucketStore:
+    """
+    Token buckets in a plain dict: key -> [tokens, last_seen, seconds_to_full].
+
+    A bucket that has been idle long enough to refill completely is
+    indistinguishable from a missing one, so the periodic sweep drops those
+    entries and memory stays proportional to recently active clients.
+    Only touched from the event loop thread, so no locking.
+    """
+
+    def __init__(self, sweep_every: int = 10_000):
+        self._buckets = {}
+        self._sweep_every = sweep_every
+        self._calls = 0
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def hit(self, key: str, rule: Rule, now: float) -> float:
+        """
+        Take one token. Returns 0 when allowed, otherwise seconds until a token is free.
+        """
+        self._calls += 1
+        if self._calls >= self._sweep_every:
+            self._calls = 0
+            self.sweep(now)
+
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            self._buckets[key] = [rule.capacity - 1, now, rule.capacity / rule.rate]
+            return 0.0
+
+        tokens = min(rule.capacity, bucket[0] + (now - bucket[1]) * rule.rate)
+        bucket[1] = now
+        if tokens >= 1:
+            bucket[0] = tokens - 1
+            return 0.0
+        bucket[0] = tokens
+        return (1 - tokens) / rule.rate
+
+    def sweep(self, now: float):
+        expired = [k for k, b in self._buckets.items() if now - b[1] >= b[2]]
+        for k in expired:
+            del self._buckets[k]
+
+
+_REDIS_TOKEN_BUCKET = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local b = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(b[1]) or capacity
+local ts = tonumber(b[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) * rate)
+local wait = 0
+if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return tostring(wait)
+"""
+
+
+class RedisBucketStore:
+    """
+    Shared buckets for multi-worker deployments. Needs the optional `redis` package.
+    """
+
+    is_async = True
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("RATE_LIMIT_REDIS_URL is set but the redis package is not installed") from e
+        self._client = redis.from_url(url)
+        self._script = self._client.register_script(_REDIS_TOKEN_BUCKET)
+
+    async def hit(self, key: str, rule: Rule, now: float) -> float:
+        return float(await self._script(keys=[f"ratelimit:{key}"], args=[rule.capacity, rule.rate]))
+
+
+# -------- MIDDLEWARE --------
+class RateLimitMiddleware:
+    """
+    Token-bucket limits per client IP and, on top of that, per account:
+    the subject of a valid `Authorization: Bearer` access token or, on a
+    login rule, the submitted email. A request is charged to every bucket
+    it maps to, so collecting tokens for several accounts never raises
+    one IP's limit. Only paths with a configured rule pay for anything
+    beyond a dict lookup.
+    """
+
+    def __init__(self, app, rules: dict | None = None, store=None, login_rules: set | None = None):
+        self.app = app
+        self.rules = parse_rules(RATE_LIMIT_RULES) if rules is None else rules
+        self.login_rules = parse_login_rules(RATE_LIMIT_LOGIN_RULES) if login_rules is None else login_rules
+        if store is None:
+            store = RedisBucketStore(RATE_LIMIT_REDIS_URL) if RATE_LIMIT_REDIS_URL else MemoryBucketStore()
+        self.store = store
+        self._async_store = getattr(store, "is_async", False)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        rule = self.rules.get((scope["method"], scope["path"].rstrip("/") or "/"))
+        if rule is None:
+            return await self.app(scope, receive, send)
+
+        ip, user = self._identify(scope)
+        if rule.name in self.login_rules:
+            email, receive = await self._login_email(receive)
+            if email:
+                user = f"email:{email}"
+
+        now = time.monotonic()
+        wait = await self._hit(f"{rule.name}|ip|{ip}", rule, now)
+        if not wait and user:
+            wait = await self._hit(f"{rule.name}|user|{user}", rule, now)
+
+        if wait:
+            return await self._reject(send, wait)
+        return await self.app(scope, receive, send)
+
+    async def _hit(self, key: str, rule: Rule, now: float) -> float:
+        if self._async_store:
+            return await self.store.hit(key, rule, now)
+        return self.store.hit(key, rule, now)
+
+    async def _login_email(self, receive):
+        """
+        The lower-cased "email" of a JSON login body, and a `receive` that
+        replays the body to the app.
+        """
+        messages, body, more = [], b"", True
+        while more and len(body) <= RATE_LIMIT_MAX_LOGIN_BODY:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                break
+            body += message.get("body", b"")
+            more = message.get("more_body", False)
+
+        async def replay():
+            return messages.pop(0) if messages else await receive()
+
+        email = None
+        if not more:
+            try:
+                email = json.loads(body).get("email")
+            except (ValueError, AttributeError):
+                pass
+        return (email.strip().lower() if isinstance(email, str) else None), replay
+
+    def _identify(self, scope):
+        ip = scope["client"][0] if scope.get("client") else "unknown"
+        user = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                scheme, _, token = value.decode("latin-1").partition(" ")
+                if scheme.lower() == "bearer":
+                    # a forged or expired token counts as no token
+                    user = token_subject(token.strip())
+            elif name == b"x-forwarded-for" and RATE_LIMIT_TRUST_PROXY:
+                ip = value.decode("latin-1").split(",")[0].strip()
+        return ip, user
+
+    async def _reject(self, send, wait: float):
+        body = json.dumps({"detail": "Too many requests"}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(math.ceil(wait)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
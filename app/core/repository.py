@@ -0,0 +1,113 @@
+"""
+Single-statement partial updates and deletes.
+
+Each helper issues one UPDATE/DELETE ... RETURNING and maps "no row" to a
+404, instead of SELECT + write + commit + refresh. Returned objects are
+detached from the session so the caller's commit does not expire them;
+reading them afterwards costs no extra SELECT. Callers still commit.
+"""
+from fastapi import HTTPException
+from sqlalchemy import delete, inspect, select, update
+from sqlalchemy.orm import Session
+
+
+def _pk(model):
+    return inspect(model).primary_key[0]
+
+
+def _returning_supported(db: Session, kind: str) -> bool:
+    return getattr(db.get_bind().dialect, f"{kind}_returning", False)
+
+
+def _detach(db: Session, obj):
+    if obj is not None and obj in db:
+        db.expunge(obj)
+    return obj
+
+
+def get_or_404(db: Session, model, pk_value, detail: str):
+    obj = db.get(model, pk_value)
+    if obj is None:
+        raise HTTPException(404, detail)
+    return obj
+
+
+def update_returning(db: Session, model, pk_value, values: dict, detail: str):
+    """
+    UPDATE model SET values WHERE pk = pk_value RETURNING *
+    """
+    if not values:
+        return _detach(db, get_or_404(db, model, pk_value, detail))
+    if not _returning_supported(db, "update"):
+        obj = get_or_404(db, model, pk_value, detail)
+        for key, value in values.items():
+            setattr(obj, key, value)
+        db.flush()
+        return _detach(db, obj)
+
+    stmt = update(model).where(_pk(model) == pk_value).values(**values).returning(model)
+    obj = db.execute(stmt, execution_options={"synchronize_session": False}).scalar_one_or_none()
+    if obj is None:
+        raise HTTPException(404, detail)
+    return _detach(db, obj)
+
+
+def update_returning_previous(db: Session, model, pk_value, values: dict, previous, detail: str):
+    """
+    Like update_returning, but also returns the pre-update values of the
+    `previous` columns as a dict. On Postgres this is still one statement:
+    the old values come from a locked subquery joined in with UPDATE ... FROM.
+    Elsewhere they are read first (two round trips).
+    """
+    previous = list(previous)
+    if not values or not previous or db.get_bind().dialect.name != "postgresql":
+        return _update_after_select(db, model, pk_value, values, previous, detail)
+
+    pk = _pk(model)
+    old = (
+        select(pk, *(getattr(model, k) for k in previous))
+        .where(pk == pk_value)
+        .with_for_update()
+        .subquery("old")
+    )
+    stmt = (
+        update(model)
+        .where(pk == old.c[pk.key])
+        .values(**values)
+        .returning(model, *(old.c[k] for k in previous))
+    )
+    row = db.execute(stmt, execution_options={"synchronize_session": False}).first()
+    if row is None:
+        raise HTTPException(404, detail)
+    obj, *old_values = row
+    return _detach(db, obj), dict(zip(previous, old_values))
+
+
+def _update_after_select(db: Session, model, pk_value, values, previous, detail):
+    pk = _pk(model)
+    old = db.execute(
+        select(*(getattr(model, k) for k in previous) or [pk])
+        .where(pk == pk_value)
+        .with_for_update()
+    ).first()
+    if old is None:
+        raise HTTPException(404, detail)
+    before = dict(zip(previous, old)) if previous else {}
+    return update_returning(db, model, pk_value, values, detail), before
+
+
+def delete_returning(db: Session, model, pk_value, detail: str):
+    """
+    DELETE FROM model WHERE pk = pk_value RETURNING *
+    """
+    if not _returning_supported(db, "delete"):
+        obj = get_or_404(db, model, pk_value, detail)
+        db.delete(obj)
+        db.flush()
+        return obj
+
+    stmt = delete(model).where(_pk(model) == pk_value).returning(model)
+    obj = db.execute(stmt, execution_options={"synchronize_session": False}).scalar_one_or_none()
+    if obj is None:
+        raise HTTPException(404, detail)
+    return _detach(db, obj)
@@ -1,6 +1,9 @@
+import base64
 import hashlib
-import os
 import hmac
+import json
+import os
+import time
 
 PBKDF2_ITERATIONS = 100_000
 
@@ -27,3 +30,45 @@ def verify_password(password: str, stored: str) -> bool:
     )
 
     return hmac.compare_digest(pwd_hash.hex(), hash_hex)
+
+
+# -------- ACCESS TOKENS --------
+# HS256 JWTs signed with SECRET_KEY, built on hmac so no JWT package is
+# needed. The subject is "user:<id>" or "professional:<id>".
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _unb64(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(message: bytes) -> str:
+    from app.core.config import get_settings  # deferred: settings load on first use
+
+    return _b64(hmac.new(get_settings().SECRET_KEY.encode(), message, hashlib.sha256).digest())
+
+
+def create_access_token(subject: str) -> str:
+    from app.core.config import get_settings
+
+    expires = int(time.time()) + get_settings().ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    header = _b64(json.dumps({"alg": "HS256", "typ": "JWT"}).encode())
+    payload = _b64(json.dumps({"sub": subject, "exp": expires}).encode())
+    return f"{header}.{payload}.{_sign(f'{header}.{payload}'.encode())}"
+
+
+def token_subject(token: str) -> str | None:
+    """
+    The subject of a valid, unexpired access token; None otherwise.
+    """
+    try:
+        header, payload, signature = token.split(".")
+        if not hmac.compare_digest(signature, _sign(f"{header}.{payload}".encode())):
+            return None
+        claims = json.loads(_unb64(payload))
+    except ValueError:
+        return None
+    if not isinstance(claims, dict) or claims.get("exp", 0) < time.time():
+        return None
+    return claims.get("sub")
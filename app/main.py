@@ -1,3 +1,6 @@
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
@@ -13,10 +16,59 @@ from app.routers import (
     professional_auth,
     professional_dashboard,
     professional_jobs,
-    chatbot
+    professional_events,
+    chatbot,
+    metrics,
+    diagnostics,
+    reports,
+    reviews,
+    search
 )
+from app.core.capture import TrafficCaptureMiddleware, capture
+from app.core.compression import CompressionMiddleware
+from app.core.database import ReadYourWritesMiddleware, init_db
+from app.core.idempotency import IdempotencyMiddleware
+from app.core.invalidation import cache_bus
+from app.core.metrics import MetricsMiddleware
+from app.core.rate_limit import RateLimitMiddleware
+from app.services.contact_buffer import contact_buffer
+from app.services.dispatcher import dispatcher
+from app.services.outbox import outbox_relay
+from app.services.scheduler import booking_scheduler
+
+# Serverless deployments: skip the table check on every cold start.
+FAST_STARTUP = os.getenv("FAST_STARTUP", "0") == "1"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if not FAST_STARTUP:
+        init_db()
+    outbox_relay.start()
+    contact_buffer.start()
+    cache_bus.start()
+    booking_scheduler.start()
+    yield
+    booking_scheduler.stop()
+    cache_bus.stop()
+    contact_buffer.stop()
+    outbox_relay.stop()
+    # drain queued notifications before the worker goes away
+    dispatcher.shutdown()
+    if capture:
+        capture.close()
+
+
+app = FastAPI(title="HomeServ API", lifespan=lifespan)
 
-app = FastAPI(title="HomeServ API")
+# innermost: only the handler itself is deduplicated
+app.add_middleware(IdempotencyMiddleware)
+
+# no-op unless DATABASE_REPLICA_URLS is set
+app.add_middleware(ReadYourWritesMiddleware)
+
+# added before CORS so 429 responses still get CORS headers
+app.add_middleware(RateLimitMiddleware)
 
 app.add_middleware(
     CORSMiddleware,
@@ -29,6 +81,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# opt-in via TRAFFIC_CAPTURE_PATH, see benchmarks/replay.py
+if capture:
+    app.add_middleware(TrafficCaptureMiddleware)
+
+app.add_middleware(CompressionMiddleware)
+
+# outermost, so the latency covers every other middleware too
+app.add_middleware(MetricsMiddleware)
+
 app.include_router(auth.router)
 app.include_router(user.router)
 app.include_router(area.router)
@@ -40,7 +101,13 @@ app.include_router(contact.router)
 app.include_router(professional_auth.router)
 app.include_router(professional_dashboard.router)
 app.include_router(professional_jobs.router)
+app.include_router(professional_events.router)
 app.include_router(chatbot.router, prefix="/api")
+app.include_router(metrics.router)
+app.include_router(diagnostics.router)
+app.include_router(reports.router)
+app.include_router(reviews.router)
+app.include_router(search.router)
 
 @app.get("/")
 def root():
@@ -3,4 +3,11 @@ from app.models.area import Area
 from app.models.service import Service
 from app.models.professionals import Professional
 from app.models.booking import Booking
-from app.models.package import Package  
+from app.models.package import Package
+from app.models.outbox import OutboxDeadLetter, OutboxEvent, OutboxOffset
+from app.models.contact import Contact
+from app.models.rollup import EarningsRollup
+from app.models.idempotency import IdempotencyKey
+from app.models.review import Review, ProfessionalRating
+from app.models.scheduler import SchedulerState
+from app.models.archive import ArchivedBooking
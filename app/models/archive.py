@@ -0,0 +1,34 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, DECIMAL, Index
+from datetime import datetime, timezone
+from app.core.database import Base
+
+class ArchivedBooking(Base):
+    """
+    Where an archived booking's full row lives (a gzip block inside an
+    NDJSON archive file), plus the few columns lifetime totals and rollup
+    checks still need once the row has left `bookings`.
+    """
+    __tablename__ = "archived_bookings"
+    __table_args__ = (
+        # the professional dashboard's lifetime totals
+        Index("ix_archived_bookings_professional_status", "professional_id", "status"),
+    )
+
+    booking_id = Column(Integer, primary_key=True)
+
+    professional_id = Column(Integer, nullable=True)
+    area_id = Column(Integer, nullable=True)
+    service_id = Column(Integer, nullable=True)
+    status = Column(String, nullable=False)
+    total_price = Column(DECIMAL, nullable=False)
+    scheduled_at = Column(DateTime(timezone=True), nullable=False)
+
+    # key in ARCHIVE_STORE
+    archive_file = Column(String, nullable=False)
+    block_offset = Column(BigInteger, nullable=False)
+    block_length = Column(Integer, nullable=False)
+
+    archived_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc)
+    )
@@ -1,9 +1,23 @@
-from sqlalchemy import Column, Integer, String, DateTime, DECIMAL, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, DECIMAL, Text, ForeignKey, Index
 from datetime import datetime, timezone
 from app.core.database import Base
 
 class Booking(Base):
     __tablename__ = "bookings"
+    __table_args__ = (
+        # my-jobs and the dashboard: professional_id [+ status]; INCLUDE lets
+        # the earnings sum on Postgres be an index-only scan
+        Index(
+            "ix_bookings_professional_status",
+            "professional_id", "status",
+            postgresql_include=["total_price"]
+        ),
+        # /bookings/user/{user_id}* ordered by created_at desc
+        Index("ix_bookings_user_created", "user_id", "created_at"),
+        # the booking scheduler's horizon loads and overdue-expiry sweep:
+        # pending bookings in a scheduled_at range
+        Index("ix_bookings_status_scheduled", "status", "scheduled_at"),
+    )
 
     booking_id = Column(Integer, primary_key=True, index=True)
 
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary
+from datetime import datetime, timezone
+from app.core.database import Base
+
+class IdempotencyKey(Base):
+    """
+    Stored response for an Idempotency-Key. status_code is NULL while the
+    first request with the key is still executing.
+    """
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String, primary_key=True)
+    fingerprint = Column(String(32), nullable=False)
+
+    status_code = Column(Integer, nullable=True)
+    content_type = Column(String, nullable=True)
+    body = Column(LargeBinary, nullable=True)
+
+    created_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        index=True
+    )
@@ -0,0 +1,72 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, BigInteger, Index
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from datetime import datetime, timezone
+from app.core.database import Base
+
+
+class current_tx_id(FunctionElement):
+    """
+    The writing transaction's id on Postgres; NULL elsewhere.
+    """
+    type = BigInteger()
+    inherit_cache = True
+
+
+@compiles(current_tx_id)
+def _current_tx_id(element, compiler, **kw):
+    return "NULL"
+
+
+@compiles(current_tx_id, "postgresql")
+def _current_tx_id_postgresql(element, compiler, **kw):
+    return "pg_current_xact_id()::text::bigint"
+
+
+class OutboxEvent(Base):
+    __tablename__ = "outbox_events"
+    __table_args__ = (
+        # the relay's cursor on Postgres
+        Index("ix_outbox_events_tx_event", "tx_id", "event_id"),
+    )
+
+    event_id = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    aggregate_id = Column(Integer, nullable=False, index=True)
+    event_type = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)
+    # lets the relay tell finished transactions from ones still running
+    tx_id = Column(BigInteger, default=current_tx_id(), nullable=True)
+
+    created_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        index=True
+    )
+
+
+class OutboxOffset(Base):
+    __tablename__ = "outbox_offsets"
+
+    consumer = Column(String, primary_key=True)
+    last_tx_id = Column(BigInteger, nullable=False, default=0)
+    last_event_id = Column(BigInteger, nullable=False, default=0)
+
+
+class OutboxDeadLetter(Base):
+    """
+    An event a consumer gave up on after OUTBOX_MAX_ATTEMPTS failures.
+    """
+    __tablename__ = "outbox_dead_letters"
+
+    dead_letter_id = Column(Integer, primary_key=True)
+    consumer = Column(String, nullable=False)
+    event_id = Column(BigInteger, nullable=False, index=True)
+    event_type = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)
+    error = Column(Text, nullable=False)
+    attempts = Column(Integer, nullable=False)
+
+    failed_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc)
+    )
@@ -1,5 +1,6 @@
-from sqlalchemy import Column, Integer, String, DECIMAL, Text
+from sqlalchemy import Column, Integer, String, DECIMAL, Text, Index
 from app.core.database import Base
+from app.models.service import weighted_tsvector
 
 class Package(Base):
     __tablename__ = "packages"
@@ -11,3 +12,16 @@ class Package(Base):
     duration = Column(String)
     features = Column(Text)
     description = Column(Text)
+
+    __table_args__ = (
+        # SEARCH_BACKEND=postgres
+        Index(
+            "ix_packages_search",
+            weighted_tsvector((name, "A"), (category, "B"), (features, "C"), (description, "C")),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+    )
+
+
+# the indexed expression itself, so search queries cannot drift from it
+package_search_vector = Package.__table_args__[0].expressions[0]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, Float, ForeignKey, Index
 from app.core.database import Base
 
 class Professional(Base):
@@ -15,3 +15,14 @@ class Professional(Base):
 
     rating = Column(Float)
     is_active = Column(Boolean, default=True)
+
+
+# /professionals/search: active professionals in one area + service, best rated first
+Index(
+    "ix_professionals_market_rating",
+    Professional.area_id,
+    Professional.service_id,
+    Professional.rating.desc(),
+    postgresql_where=Professional.is_active == True,
+    sqlite_where=Professional.is_active == True,
+)
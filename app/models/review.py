@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, Float, Text, DateTime, ForeignKey, Index
+from datetime import datetime, timezone
+from app.core.database import Base
+
+class Review(Base):
+    __tablename__ = "reviews"
+    __table_args__ = (
+        # /reviews/professional/{id}, newest first
+        Index("ix_reviews_professional_created", "professional_id", "created_at"),
+    )
+
+    review_id = Column(Integer, primary_key=True, index=True)
+
+    # one review per booking; not a foreign key so archiving old bookings
+    # does not take their reviews with them
+    booking_id = Column(Integer, nullable=False, unique=True)
+    user_id = Column(Integer, ForeignKey("users.user_id"), nullable=False)
+    professional_id = Column(Integer, ForeignKey("professionals.professional_id"), nullable=False)
+
+    rating = Column(Integer, nullable=False)
+    comment = Column(Text)
+
+    created_at = Column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc)
+    )
+
+
+class ProfessionalRating(Base):
+    """
+    Running review count and sum per professional, plus the smoothed score
+    that is also written to Professional.rating. Maintained one review at a
+    time by app.services.ratings.
+    """
+    __tablename__ = "professional_ratings"
+
+    professional_id = Column(Integer, ForeignKey("professionals.professional_id"), primary_key=True)
+    review_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Integer, nullable=False, default=0)
+    score = Column(Float, nullable=False)
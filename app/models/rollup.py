@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, String, Date, DECIMAL
+from app.core.database import Base
+
+class EarningsRollup(Base):
+    """
+    Booking counts and completed earnings per (dimension, period) bucket,
+    maintained incrementally from booking events by app.services.rollups.
+    dimension: professional | area | service; period: day | week | month,
+    bucketed on the booking's scheduled_at (UTC).
+    """
+    __tablename__ = "earnings_rollups"
+
+    dimension = Column(String, primary_key=True)
+    dimension_id = Column(Integer, primary_key=True)
+    period = Column(String, primary_key=True)
+    period_start = Column(Date, primary_key=True)
+
+    bookings = Column(Integer, nullable=False, default=0)
+    completed = Column(Integer, nullable=False, default=0)
+    cancelled = Column(Integer, nullable=False, default=0)
+    earnings = Column(DECIMAL, nullable=False, default=0)
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, String, DateTime
+from app.core.database import Base
+
+class SchedulerState(Base):
+    """
+    One row per scheduler. Only the worker holding the lease runs timers;
+    `watermark` is the latest reminder time already sent, so a new leader
+    neither repeats reminders nor loses the ones that came due while no
+    one was running. `started_at` is when the scheduler first ran:
+    pending bookings that expired before then are never swept.
+    """
+    __tablename__ = "scheduler_state"
+
+    name = Column(String, primary_key=True)
+    owner = Column(String, nullable=True)
+    lease_until = Column(DateTime(timezone=True), nullable=True)
+    watermark = Column(DateTime(timezone=True), nullable=True)
+    started_at = Column(DateTime(timezone=True), nullable=True)
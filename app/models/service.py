@@ -1,6 +1,21 @@
-from sqlalchemy import Column, Integer, String, DECIMAL, Text
+from sqlalchemy import Column, Integer, String, DECIMAL, Text, Index, func, literal_column
+from sqlalchemy.dialects import postgresql  # noqa: F401  registers the typed to_tsvector()
 from app.core.database import Base
 
+
+def weighted_tsvector(*columns_weights):
+    """
+    setweight(to_tsvector('simple', coalesce(column, '')), weight) || ...
+    'simple' is inlined rather than bound, so the expression renders the
+    same in CREATE INDEX and in queries.
+    """
+    vector = None
+    for column, weight in columns_weights:
+        part = func.setweight(func.to_tsvector(literal_column("'simple'"), func.coalesce(column, "")), weight)
+        vector = part if vector is None else vector.op("||")(part)
+    return vector
+
+
 class Service(Base):
     __tablename__ = "services"
 
@@ -9,3 +24,16 @@ class Service(Base):
     description = Column(Text)
     category = Column(String)
     base_price = Column(DECIMAL)
+
+    __table_args__ = (
+        # SEARCH_BACKEND=postgres
+        Index(
+            "ix_services_search",
+            weighted_tsvector((name, "A"), (category, "B"), (description, "C")),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+    )
+
+
+# the indexed expression itself, so search queries cannot drift from it
+service_search_vector = Service.__table_args__[0].expressions[0]
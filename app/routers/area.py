@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
 
-from app.schemas.area import AreaCreate, AreaUpdate, AreaOut
+from app.schemas.area import AreaCreate, AreaUpdate, AreaOut, AreaResolution
 from app.models.area import Area
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.repository import delete_returning, update_returning
+from app.services.area_lookup import area_index, ensure_fresh, index_area, remove_area
 
 router = APIRouter(prefix="/areas", tags=["Areas"])
 
@@ -13,31 +15,44 @@ def create_area(data: AreaCreate, db: Session = Depends(get_db)):
     db.add(area)
     db.commit()
     db.refresh(area)
+    index_area(area)
     return area
 
 @router.get("/", response_model=list[AreaOut])
-def get_areas(db: Session = Depends(get_db)):
+def get_areas(db: Session = Depends(get_read_db)):
     return db.query(Area).all()
 
+@router.get("/lookup", response_model=list[AreaOut])
+def lookup_areas(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Autocomplete on pincode prefix, or on any word of the city or area name.
+    """
+    ensure_fresh(db)
+    return area_index.autocomplete(q, limit)
+
+@router.get("/resolve/{pincode}", response_model=AreaResolution)
+def resolve_pincode(pincode: str, limit: int = Query(5, ge=1, le=20), db: Session = Depends(get_read_db)):
+    """
+    Areas serving this pincode; if none, the nearest pincodes in the same district.
+    """
+    ensure_fresh(db)
+    exact, areas = area_index.resolve(pincode, limit)
+    return {"pincode": pincode, "exact": exact, "areas": areas}
+
 @router.put("/{area_id}", response_model=AreaOut)
 def update_area(area_id: int, data: AreaUpdate, db: Session = Depends(get_db)):
-    area = db.query(Area).filter(Area.area_id == area_id).first()
-    if not area:
-        raise HTTPException(404, "Area not found")
-
-    for k, v in data.dict(exclude_unset=True).items():
-        setattr(area, k, v)
-
+    area = update_returning(db, Area, area_id, data.dict(exclude_unset=True), "Area not found")
     db.commit()
-    db.refresh(area)
+    index_area(area)
     return area
 
 @router.delete("/{area_id}")
 def delete_area(area_id: int, db: Session = Depends(get_db)):
-    area = db.query(Area).filter(Area.area_id == area_id).first()
-    if not area:
-        raise HTTPException(404, "Area not found")
-
-    db.delete(area)
+    delete_returning(db, Area, area_id, "Area not found")
     db.commit()
+    remove_area(area_id)
     return {"message": "Area deleted"}
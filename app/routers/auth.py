@@ -4,7 +4,7 @@ from sqlalchemy.orm import Session
 from app.schemas.user import UserCreate, UserOut, UserLogin
 from app.models.user import User
 from app.core.database import get_db
-from app.core.security import hash_password, verify_password
+from app.core.security import create_access_token, hash_password, verify_password
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -40,5 +40,7 @@ def login(data: UserLogin, db: Session = Depends(get_db)):
         "message": "Login successful",
         "user_id": user.user_id,
         "name": user.name,
-        "email": user.email
+        "email": user.email,
+        "access_token": create_access_token(f"user:{user.user_id}"),
+        "token_type": "bearer"
     }
@@ -1,10 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
 
-from app.schemas.booking import BookingCreate, BookingOut, BookingUpdate
-from app.services.bookings import create_booking_service, update_booking_status
+from app.schemas.booking import BookingBulkStatus, BookingCreate, BookingOut, BookingUpdate
+from app.services.archive import fetch_archived
+from app.services.bookings import (
+    bulk_update_status, check_status_change, create_booking_service, update_booking_status
+)
+from app.services.outbox import record_booking_event
 from app.models.booking import Booking
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.repository import delete_returning, update_returning_previous
+from app.utils.fields import FieldSelection, load_fields, sparse_response
 
 router = APIRouter(
     prefix="/bookings",
@@ -36,57 +43,62 @@ def create_booking(data: BookingCreate, db: Session = Depends(get_db)):
     return create_booking_service(data, db)
 
 @router.get("/", response_model=list[BookingOut])
-def get_all_bookings(db: Session = Depends(get_db)):
-    return db.query(Booking).all()
+def get_all_bookings(
+    fields: list[str] | None = Depends(FieldSelection(BookingOut)),
+    db: Session = Depends(get_read_db)
+):
+    return sparse_response(load_fields(db.query(Booking), Booking, fields).all(), fields)
+
+def user_bookings_query(db: Session, user_id: int, fields=None, packages: bool | None = None):
+    """
+    A user's bookings, newest first; `packages` narrows them to package
+    (True) or single-service (False) bookings. benchmarks/query_plans.py
+    checks this query's plan.
+    """
+    query = load_fields(db.query(Booking), Booking, fields).filter(Booking.user_id == user_id)
+    if packages is True:
+        query = query.filter(Booking.package_id.isnot(None))
+    elif packages is False:
+        query = query.filter(Booking.package_id.is_(None))
+    return query.order_by(Booking.created_at.desc())
 
 @router.get("/user/{user_id}", response_model=list[BookingOut])
-def get_user_bookings(user_id: int, db: Session = Depends(get_db)):
-    return (
-        db.query(Booking)
-        .filter(Booking.user_id == user_id)
-        .order_by(Booking.created_at.desc())
-        .all()
-    )
+def get_user_bookings(
+    user_id: int,
+    fields: list[str] | None = Depends(FieldSelection(BookingOut)),
+    db: Session = Depends(get_read_db)
+):
+    return sparse_response(user_bookings_query(db, user_id, fields).all(), fields)
 
 @router.get("/user/{user_id}/packages", response_model=list[BookingOut])
-def get_user_package_bookings(user_id: int, db: Session = Depends(get_db)):
-    return (
-        db.query(Booking)
-        .filter(
-            Booking.user_id == user_id,
-            Booking.package_id.isnot(None)
-        )
-        .order_by(Booking.created_at.desc())
-        .all()
-    )
+def get_user_package_bookings(
+    user_id: int,
+    fields: list[str] | None = Depends(FieldSelection(BookingOut)),
+    db: Session = Depends(get_read_db)
+):
+    return sparse_response(user_bookings_query(db, user_id, fields, packages=True).all(), fields)
 
 @router.get("/user/{user_id}/normal", response_model=list[BookingOut])
-def get_user_normal_bookings(user_id: int, db: Session = Depends(get_db)):
-    return (
-        db.query(Booking)
-        .filter(
-            Booking.user_id == user_id,
-            Booking.package_id.is_(None)
-        )
-        .order_by(Booking.created_at.desc())
-        .all()
-    )
+def get_user_normal_bookings(
+    user_id: int,
+    fields: list[str] | None = Depends(FieldSelection(BookingOut)),
+    db: Session = Depends(get_read_db)
+):
+    return sparse_response(user_bookings_query(db, user_id, fields, packages=False).all(), fields)
 
 @router.get("/{booking_id}", response_model=BookingOut)
-def get_booking(booking_id: int, db: Session = Depends(get_db)):
+def get_booking(booking_id: int, db: Session = Depends(get_read_db)):
     booking = db.query(Booking).filter(Booking.booking_id == booking_id).first()
+    if not booking:
+        # old completed/cancelled bookings live in the archive files
+        booking = fetch_archived(db, booking_id)
     if not booking:
         raise HTTPException(404, "Booking not found")
     return booking
 
 @router.put("/{booking_id}/complete")
 def complete_job(booking_id: int, db: Session = Depends(get_db)):
-    booking = db.query(Booking).filter(Booking.booking_id == booking_id).first()
-    if not booking:
-        raise HTTPException(404, "Job not found")
-
-    booking.status = "completed"
-    db.commit()
+    update_booking_status(booking_id, "completed", db, "Job not found")
     return {"message": "Job marked as completed"}
 
 @router.put("/{booking_id}", response_model=BookingOut)
@@ -95,31 +107,27 @@ def update_booking(
     data: BookingUpdate,
     db: Session = Depends(get_db)
 ):
-    booking = db.query(Booking).filter(Booking.booking_id == booking_id).first()
-    if not booking:
-        raise HTTPException(404, "Booking not found")
-
-    for key, value in data.dict(exclude_unset=True).items():
-        setattr(booking, key, value)
-
+    changes = data.dict(exclude_unset=True)
+    if "status" in changes:
+        check_status_change(db, booking_id, changes["status"])
+    booking, previous = update_returning_previous(
+        db, Booking, booking_id, changes, changes.keys(), "Booking not found"
+    )
+    record_booking_event(db, booking, "booking.updated", jsonable_encoder(previous))
     db.commit()
-    db.refresh(booking)
     return booking
 
 @router.patch("/{booking_id}/status", response_model=BookingOut)
 def change_status(booking_id: int, status: str, db: Session = Depends(get_db)):
-
-    if status not in ["pending", "cancelled", "completed"]:
-        raise HTTPException(400, "Invalid status")
-
     return update_booking_status(booking_id, status, db)
 
+@router.post("/bulk-status")
+def change_status_bulk(data: BookingBulkStatus, db: Session = Depends(get_db)):
+    return bulk_update_status(data, db)
+
 @router.delete("/{booking_id}")
 def delete_booking(booking_id: int, db: Session = Depends(get_db)):
-    booking = db.query(Booking).filter(Booking.booking_id == booking_id).first()
-    if not booking:
-        raise HTTPException(404, "Booking not found")
-
-    db.delete(booking)
+    booking = delete_returning(db, Booking, booking_id, "Booking not found")
+    record_booking_event(db, booking, "booking.deleted")
     db.commit()
     return {"message": "Booking deleted successfully"}
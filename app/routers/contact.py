@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.models.contact import Contact
 from app.schemas.contact import ContactCreate, ContactOut
+from app.services.contact_buffer import contact_buffer
 
 router = APIRouter(
     prefix="/contact",   
@@ -12,6 +14,15 @@ router = APIRouter(
 
 @router.post("/", response_model=ContactOut)   
 def create_contact(data: ContactCreate, db: Session = Depends(get_db)):
+    if contact_buffer.enabled:
+        if not contact_buffer.offer(data.dict()):
+            raise HTTPException(
+                status_code=429,
+                detail="Too many submissions, please retry shortly",
+                headers={"Retry-After": str(max(1, int(contact_buffer.flush_interval)))}
+            )
+        return JSONResponse(status_code=202, content={"message": "Contact request received"})
+
     contact = Contact(**data.dict())
     db.add(contact)
     db.commit()
@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, Query
+
+from app.core.diagnostics import diagnostics, DIAGNOSTICS_TOKEN
+
+def require_diagnostics(x_diagnostics_token: str | None = Header(None)):
+    if not diagnostics.enabled:
+        raise HTTPException(404, "Diagnostics are disabled")
+    if DIAGNOSTICS_TOKEN and x_diagnostics_token != DIAGNOSTICS_TOKEN:
+        raise HTTPException(403, "Invalid diagnostics token")
+
+router = APIRouter(
+    prefix="/internal/diagnostics",
+    tags=["Diagnostics"],
+    dependencies=[Depends(require_diagnostics)],
+    include_in_schema=False
+)
+
+@router.get("/slow-queries")
+def get_slow_queries(route: str | None = None, limit: int = Query(50, ge=1)):
+    rows = [q for q in diagnostics.slow_queries if route is None or route in q["route"]]
+    rows.sort(key=lambda q: q["duration_ms"], reverse=True)
+    return rows[:limit]
+
+@router.get("/n-plus-one")
+def get_n_plus_one(route: str | None = None, limit: int = Query(50, ge=1)):
+    rows = [q for q in diagnostics.n_plus_one if route is None or route in q["route"]]
+    return rows[-limit:][::-1]
+
+@router.delete("/")
+def clear_diagnostics():
+    diagnostics.clear()
+    return {"message": "Diagnostics cleared"}
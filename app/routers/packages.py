@@ -1,9 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
 from app.schemas.package import PackageCreate, PackageUpdate, PackageOut
 from app.models.package import Package
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.repository import delete_returning, update_returning
+from app.services.search import index_catalog_item, remove_catalog_item
+from app.utils.fields import FieldSelection, load_fields, sparse_response
 
 router = APIRouter(prefix="/packages", tags=["Packages"])
 
@@ -13,31 +16,26 @@ def create_package(data: PackageCreate, db: Session = Depends(get_db)):
     db.add(pkg)
     db.commit()
     db.refresh(pkg)
+    index_catalog_item("package", pkg)
     return pkg
 
 @router.get("/", response_model=list[PackageOut])
-def get_packages(db: Session = Depends(get_db)):
-    return db.query(Package).all()
+def get_packages(
+    fields: list[str] | None = Depends(FieldSelection(PackageOut)),
+    db: Session = Depends(get_read_db)
+):
+    return sparse_response(load_fields(db.query(Package), Package, fields).all(), fields)
 
 @router.put("/{package_id}", response_model=PackageOut)
 def update_package(package_id: int, data: PackageUpdate, db: Session = Depends(get_db)):
-    pkg = db.query(Package).filter(Package.package_id == package_id).first()
-    if not pkg:
-        raise HTTPException(404, "Package not found")
-
-    for k, v in data.dict(exclude_unset=True).items():
-        setattr(pkg, k, v)
-
+    pkg = update_returning(db, Package, package_id, data.dict(exclude_unset=True), "Package not found")
     db.commit()
-    db.refresh(pkg)
+    index_catalog_item("package", pkg)
     return pkg
 
 @router.delete("/{package_id}")
 def delete_package(package_id: int, db: Session = Depends(get_db)):
-    pkg = db.query(Package).filter(Package.package_id == package_id).first()
-    if not pkg:
-        raise HTTPException(404, "Package not found")
-
-    db.delete(pkg)
+    delete_returning(db, Package, package_id, "Package not found")
     db.commit()
+    remove_catalog_item("package", package_id)
     return {"message": "Package deleted"}
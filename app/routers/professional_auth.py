@@ -4,7 +4,7 @@ from sqlalchemy.orm import Session
 from app.core.database import get_db
 from app.models.professionals import Professional
 from app.schemas.professional_auth import ProfessionalLogin
-from app.core.security import verify_password
+from app.core.security import create_access_token, verify_password
 
 router = APIRouter(prefix="/professionals", tags=["Professional Auth"])
 
@@ -28,5 +28,7 @@ def professional_login(
     return {
         "professional_id": professional.professional_id,
         "name": professional.name,
-        "email": professional.email
+        "email": professional.email,
+        "access_token": create_access_token(f"professional:{professional.professional_id}"),
+        "token_type": "bearer"
     }
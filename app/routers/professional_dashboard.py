@@ -1,32 +1,44 @@
 from fastapi import APIRouter, Depends
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import get_read_db
+from app.models.archive import ArchivedBooking
 from app.models.booking import Booking
 
 router = APIRouter(prefix="/professionals/dashboard", tags=["Professional Dashboard"])
 
 
+def jobs_query(db: Session, professional_id: int, status: str, *columns):
+    # benchmarks/query_plans.py checks this query's plan
+    return db.query(*(columns or (Booking,))).filter(
+        Booking.professional_id == professional_id,
+        Booking.status == status
+    )
+
+
 @router.get("/{professional_id}")
-def get_dashboard(professional_id: int, db: Session = Depends(get_db)):
+def get_dashboard(professional_id: int, db: Session = Depends(get_read_db)):
 
-    pending_jobs = db.query(Booking).filter(
-        Booking.professional_id == professional_id,
-        Booking.status == "pending"
-    ).count()
+    pending_jobs = jobs_query(db, professional_id, "pending").count()
 
-    completed_jobs = db.query(Booking).filter(
-        Booking.professional_id == professional_id,
-        Booking.status == "completed"
-    ).count()
+    completed_jobs = jobs_query(db, professional_id, "completed").count()
 
-    earnings_rows = db.query(Booking.total_price).filter(
-        Booking.professional_id == professional_id,
-        Booking.status == "completed"
-    ).all()
+    earnings_rows = jobs_query(db, professional_id, "completed", Booking.total_price).all()
 
     total_earnings = sum(row[0] for row in earnings_rows if row[0])
 
+    # lifetime totals include bookings that have been archived
+    archived_jobs, archived_earnings = db.query(
+        func.count(ArchivedBooking.booking_id),
+        func.coalesce(func.sum(ArchivedBooking.total_price), 0)
+    ).filter(
+        ArchivedBooking.professional_id == professional_id,
+        ArchivedBooking.status == "completed"
+    ).one()
+    completed_jobs += archived_jobs
+    total_earnings += archived_earnings
+
     return {
         "pending_jobs": pending_jobs,
         "completed_jobs": completed_jobs,
@@ -0,0 +1,46 @@
+import asyncio
+import json
+import os
+
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+
+from app.services.pubsub import broker, professional_topic
+
+router = APIRouter(prefix="/professionals/events", tags=["Professional Events"])
+
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+
+
+@router.get("/{professional_id}")
+async def stream_job_events(professional_id: int, request: Request):
+    """
+    Server-sent events for one professional. Replaces polling
+    /professionals/jobs/my-jobs and /professionals/dashboard: the app
+    subscribes once and refetches only when an event arrives.
+    """
+    sub = broker.subscribe(professional_topic(professional_id))
+
+    async def events():
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    msg = await asyncio.wait_for(sub.get(), SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+
+                if sub.dropped:
+                    sub.dropped = 0
+                    yield "event: resync\ndata: {}\n\n"
+
+                yield f"event: {msg['event_type']}\ndata: {json.dumps(msg)}\n\n"
+        finally:
+            broker.unsubscribe(sub)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,16 +1,15 @@
 from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import get_read_db
 from app.models.booking import Booking
 from app.models.user import User
 from app.models.service import Service
 
 router = APIRouter(prefix="/professionals/jobs", tags=["Professional Jobs"])
 
-@router.get("/my-jobs/{professional_id}")
-def my_jobs(professional_id: int, db: Session = Depends(get_db)):
-
-    rows = (
+def my_jobs_query(db: Session, professional_id: int):
+    # benchmarks/query_plans.py checks this query's plan
+    return (
         db.query(
             Booking.booking_id,
             Booking.status,
@@ -23,9 +22,14 @@ def my_jobs(professional_id: int, db: Session = Depends(get_db)):
         .join(User, Booking.user_id == User.user_id)
         .join(Service, Booking.service_id == Service.service_id)
         .filter(Booking.professional_id == professional_id)
-        .all()
     )
 
+
+@router.get("/my-jobs/{professional_id}")
+def my_jobs(professional_id: int, db: Session = Depends(get_read_db)):
+
+    rows = my_jobs_query(db, professional_id).all()
+
     jobs = []
     for r in rows:
         jobs.append({
@@ -3,26 +3,53 @@ from sqlalchemy.orm import Session
 
 from app.models.professionals import Professional
 from app.schemas.professional import ProfessionalOut
-from app.core.database import get_db
+from app.schemas.review import ProfessionalRatingOut
+from app.core.database import get_read_db
+from app.services.ratings import best_in_market, rating_summary
+from app.utils.fields import FieldSelection, load_fields, sparse_response
 
 router = APIRouter(prefix="/professionals", tags=["Professionals"])
 
 
-@router.get("/search", response_model=list[ProfessionalOut])
-def search_professionals(
-    area_id: int = Query(...),
-    service_id: int = Query(...),
-    db: Session = Depends(get_db)
-):
-    professionals = (
-        db.query(Professional)
+def search_query(db: Session, area_id: int, service_id: int, fields=None):
+    # benchmarks/query_plans.py checks this query's plan
+    return (
+        load_fields(db.query(Professional), Professional, fields)
         .filter(
             Professional.area_id == area_id,
             Professional.service_id == service_id,
             Professional.is_active == True
         )
         .order_by(Professional.rating.desc())
-        .all()
     )
 
-    return professionals
+
+@router.get("/search", response_model=list[ProfessionalOut])
+def search_professionals(
+    area_id: int = Query(...),
+    service_id: int = Query(...),
+    fields: list[str] | None = Depends(FieldSelection(ProfessionalOut)),
+    db: Session = Depends(get_read_db)
+):
+    professionals = search_query(db, area_id, service_id, fields).all()
+
+    return sparse_response(professionals, fields)
+
+
+@router.get("/top", response_model=list[ProfessionalOut])
+def top_professionals(
+    area_id: int = Query(...),
+    service_id: int = Query(...),
+    limit: int = Query(10, ge=1, le=20),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Best rated active professionals in one area + service, served from
+    an in-memory top-k rather than a sort.
+    """
+    return best_in_market(db, area_id, service_id, limit)
+
+
+@router.get("/{professional_id}/rating", response_model=ProfessionalRatingOut)
+def professional_rating(professional_id: int, db: Session = Depends(get_read_db)):
+    return rating_summary(db, professional_id)
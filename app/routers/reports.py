@@ -0,0 +1,59 @@
+from datetime import date, datetime
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.core.database import get_read_db
+from app.models.rollup import EarningsRollup
+from app.schemas.report import EarningsRollupOut
+from app.services.heatmap import demand_heatmap
+from app.services.rollups import DIMENSIONS, PERIODS
+
+router = APIRouter(prefix="/reports", tags=["Reports"])
+
+
+@router.get("/earnings", response_model=list[EarningsRollupOut])
+def get_earnings(
+    dimension: str = Query(..., description="professional | area | service"),
+    period: str = Query("day", description="day | week | month"),
+    dimension_id: int | None = None,
+    start: date | None = None,
+    end: date | None = None,
+    db: Session = Depends(get_read_db)
+):
+    """
+    Reads only the rollup table; never scans bookings.
+    """
+    if dimension not in DIMENSIONS:
+        raise HTTPException(400, f"dimension must be one of: {', '.join(DIMENSIONS)}")
+    if period not in PERIODS:
+        raise HTTPException(400, f"period must be one of: {', '.join(PERIODS)}")
+
+    query = db.query(EarningsRollup).filter(
+        EarningsRollup.dimension == dimension,
+        EarningsRollup.period == period
+    )
+    if dimension_id is not None:
+        query = query.filter(EarningsRollup.dimension_id == dimension_id)
+    if start is not None:
+        query = query.filter(EarningsRollup.period_start >= start)
+    if end is not None:
+        query = query.filter(EarningsRollup.period_start <= end)
+
+    return query.order_by(EarningsRollup.dimension_id, EarningsRollup.period_start).all()
+
+
+@router.get("/demand-heatmap")
+def get_demand_heatmap(
+    area_id: int | None = None,
+    service_id: int | None = None,
+    since: datetime | None = None,
+    include_cancelled: bool = False,
+    utc_offset_minutes: int = Query(0, ge=-720, le=840),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Bookings per area x service x hour-of-week (168 slots, Monday 00:00
+    first), cached for HEATMAP_TTL_SECONDS.
+    """
+    return demand_heatmap(db, area_id, service_id, since, include_cancelled, utc_offset_minutes)
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from app.models.review import Review
+from app.schemas.review import ReviewCreate, ReviewOut
+from app.core.database import get_db, get_read_db
+from app.services.ratings import submit_review
+
+router = APIRouter(prefix="/reviews", tags=["Reviews"])
+
+
+@router.post("/", response_model=ReviewOut)
+def create_review(data: ReviewCreate, db: Session = Depends(get_db)):
+    return submit_review(data, db)
+
+
+@router.get("/professional/{professional_id}", response_model=list[ReviewOut])
+def get_professional_reviews(
+    professional_id: int,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db)
+):
+    return (
+        db.query(Review)
+        .filter(Review.professional_id == professional_id)
+        .order_by(Review.created_at.desc())
+        .limit(limit)
+        .all()
+    )
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.core.database import get_read_db
+from app.services.search import search_catalog
+
+router = APIRouter(prefix="/search", tags=["Search"])
+
+
+@router.get("/")
+def search(
+    q: str = Query(..., max_length=100),
+    kind: str | None = Query(None, alias="type", description="service | package"),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Ranked search over service and package names, categories,
+    descriptions and features. The last word matches as a prefix.
+    """
+    if kind not in (None, "service", "package"):
+        raise HTTPException(400, "type must be service or package")
+    return search_catalog(db, q, limit, kind)
@@ -1,9 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
 from app.schemas.service import ServiceCreate, ServiceUpdate, ServiceOut
 from app.models.service import Service
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.repository import delete_returning, update_returning
+from app.services.search import index_catalog_item, remove_catalog_item
 
 router = APIRouter(prefix="/services", tags=["Services"])
 
@@ -13,31 +15,23 @@ def create_service(data: ServiceCreate, db: Session = Depends(get_db)):
     db.add(service)
     db.commit()
     db.refresh(service)
+    index_catalog_item("service", service)
     return service
 
 @router.get("/", response_model=list[ServiceOut])
-def get_services(db: Session = Depends(get_db)):
+def get_services(db: Session = Depends(get_read_db)):
     return db.query(Service).all()
 
 @router.put("/{service_id}", response_model=ServiceOut)
 def update_service(service_id: int, data: ServiceUpdate, db: Session = Depends(get_db)):
-    service = db.query(Service).filter(Service.service_id == service_id).first()
-    if not service:
-        raise HTTPException(404, "Service not found")
-
-    for k, v in data.dict(exclude_unset=True).items():
-        setattr(service, k, v)
-
+    service = update_returning(db, Service, service_id, data.dict(exclude_unset=True), "Service not found")
     db.commit()
-    db.refresh(service)
+    index_catalog_item("service", service)
     return service
 
 @router.delete("/{service_id}")
 def delete_service(service_id: int, db: Session = Depends(get_db)):
-    service = db.query(Service).filter(Service.service_id == service_id).first()
-    if not service:
-        raise HTTPException(404, "Service not found")
-
-    db.delete(service)
+    delete_returning(db, Service, service_id, "Service not found")
     db.commit()
+    remove_catalog_item("service", service_id)
     return {"message": "Service deleted"}
@@ -3,17 +3,22 @@ from sqlalchemy.orm import Session
 
 from app.schemas.user import UserOut, UserUpdate
 from app.models.user import User
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db
+from app.core.repository import delete_returning, update_returning
 from app.schemas.user import UserLogin
+from app.utils.fields import FieldSelection, load_fields, sparse_response
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
 @router.get("/", response_model=list[UserOut])
-def get_users(db: Session = Depends(get_db)):
-    return db.query(User).all()
+def get_users(
+    fields: list[str] | None = Depends(FieldSelection(UserOut)),
+    db: Session = Depends(get_read_db)
+):
+    return sparse_response(load_fields(db.query(User), User, fields).all(), fields)
 
 @router.get("/{user_id}", response_model=UserOut)
-def get_user(user_id: int, db: Session = Depends(get_db)):
+def get_user(user_id: int, db: Session = Depends(get_read_db)):
     user = db.query(User).filter(User.user_id == user_id).first()
     if not user:
         raise HTTPException(404, "User not found")
@@ -21,23 +26,12 @@ def get_user(user_id: int, db: Session = Depends(get_db)):
 
 @router.put("/{user_id}", response_model=UserOut)
 def update_user(user_id: int, data: UserUpdate, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.user_id == user_id).first()
-    if not user:
-        raise HTTPException(404, "User not found")
-
-    for key, value in data.dict(exclude_unset=True).items():
-        setattr(user, key, value)
-
+    user = update_returning(db, User, user_id, data.dict(exclude_unset=True), "User not found")
     db.commit()
-    db.refresh(user)
     return user
 
 @router.delete("/{user_id}")
 def delete_user(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.user_id == user_id).first()
-    if not user:
-        raise HTTPException(404, "User not found")
-
-    db.delete(user)
+    delete_returning(db, User, user_id, "User not found")
     db.commit()
     return {"message": "User deleted"}
@@ -1,6 +1,8 @@
 from .user import UserCreate, UserOut, UserUpdate, UserLogin
-from .area import AreaCreate, AreaOut
+from .area import AreaCreate, AreaOut, AreaResolution
 from .service import ServiceCreate, ServiceOut
 from .professional import ProfessionalCreate, ProfessionalOut
 from .package import PackageCreate, PackageOut
-from .booking import BookingCreate, BookingOut, BookingUpdate
\ No newline at end of file
+from .booking import BookingCreate, BookingOut, BookingUpdate, BookingBulkStatus
+from .report import EarningsRollupOut
+from .review import ReviewCreate, ReviewOut, ProfessionalRatingOut
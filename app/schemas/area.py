@@ -20,3 +20,8 @@ class AreaOut(AreaBase):
 
     class Config:
         from_attributes = True
+
+class AreaResolution(BaseModel):
+    pincode: str
+    exact: bool
+    areas: list[AreaOut]
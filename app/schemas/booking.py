@@ -30,3 +30,13 @@ class BookingOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+class BookingBulkStatus(BaseModel):
+    status: str
+
+    # either explicit ids or a filter
+    booking_ids: Optional[list[int]] = None
+    professional_id: Optional[int] = None
+    area_id: Optional[int] = None
+    scheduled_from: Optional[datetime] = None
+    scheduled_to: Optional[datetime] = None
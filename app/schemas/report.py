@@ -0,0 +1,15 @@
+from pydantic import BaseModel
+from datetime import date
+
+class EarningsRollupOut(BaseModel):
+    dimension: str
+    dimension_id: int
+    period: str
+    period_start: date
+    bookings: int
+    completed: int
+    cancelled: int
+    earnings: float
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,26 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+class ReviewCreate(BaseModel):
+    booking_id: int
+    rating: int
+    comment: Optional[str] = None
+
+class ReviewOut(BaseModel):
+    review_id: int
+    booking_id: int
+    user_id: int
+    professional_id: int
+    rating: int
+    comment: Optional[str] = None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class ProfessionalRatingOut(BaseModel):
+    professional_id: int
+    review_count: int
+    average: float
+    score: float
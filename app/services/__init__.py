@@ -1,2 +1,2 @@
-from .bookings import create_booking_service, update_booking_status
-from .notifications import send_notification, send_booking_confirmation
+from .bookings import create_booking_service, update_booking_status, bulk_update_status
+from .notifications import send_notification, send_booking_confirmation, send_booking_status_update
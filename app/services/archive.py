@@ -0,0 +1,294 @@
+"""
+Archival of cold bookings.
+
+    ARCHIVE_STORE=s3://bucket/prefix python -m app.services.archive
+    python -m app.services.archive --older-than-days 730 --dry-run
+
+Completed and cancelled bookings scheduled before the cutoff are written
+to bookings/YYYY-MM/<run>.ndjson.gz in the archive store and deleted from
+`bookings`. Each file is a sequence of independent gzip members of up to
+ARCHIVE_BLOCK_ROWS rows, and `archived_bookings` records which member
+holds each booking, so a lookup reads and inflates one block, not the
+whole file.
+
+ARCHIVE_STORE is required, and every instance serving the API must be
+able to read it:
+
+    ARCHIVE_STORE=s3://bucket/prefix   S3 or any S3-compatible store (needs
+                                       boto3; AWS_ENDPOINT_URL and the usual
+                                       AWS_* credentials apply)
+    ARCHIVE_STORE=file:/mnt/archive    a directory on storage shared by all
+                                       instances; never an instance's own disk
+
+Archiving is not a booking change: no outbox events are written, and the
+rollup recompute counts `archived_bookings` alongside live rows. On
+Postgres the run also creates upcoming month partitions and drops the
+ones it has emptied (see app.core.partitions).
+"""
+import argparse
+import gzip
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.core import partitions
+from app.core.database import SessionLocal, get_engine
+from app.models.archive import ArchivedBooking
+from app.models.booking import Booking
+
+
+ARCHIVE_STORE = os.getenv("ARCHIVE_STORE", "")
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "365"))
+# rows per gzip member: a lookup reads and inflates one member
+ARCHIVE_BLOCK_ROWS = int(os.getenv("ARCHIVE_BLOCK_ROWS", "1000"))
+# rows moved per transaction
+ARCHIVE_BATCH_ROWS = int(os.getenv("ARCHIVE_BATCH_ROWS", "10000"))
+
+TERMINAL_STATUSES = ("completed", "cancelled")
+DATETIME_COLUMNS = ("scheduled_at", "created_at")
+
+
+def _utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; everything is stored as UTC
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def _encode(value):
+    # datetimes round-trip exactly as stored; Decimals as strings
+    return value.isoformat() if isinstance(value, datetime) else str(value)
+
+
+def _row(booking: Booking) -> dict:
+    return {c.key: getattr(booking, c.key) for c in Booking.__mapper__.column_attrs}
+
+
+def _booking(row: dict) -> Booking:
+    """
+    A detached Booking rebuilt from an archived row. Never add it to a
+    session: the row no longer exists in `bookings`.
+    """
+    for name in DATETIME_COLUMNS:
+        if row.get(name):
+            row[name] = datetime.fromisoformat(row[name])
+    if row.get("total_price") is not None:
+        row["total_price"] = Decimal(row["total_price"])
+    return Booking(**row)
+
+
+# -------- STORES --------
+class FileStore:
+    def __init__(self, root: str):
+        self.root = root
+
+    def put(self, key: str, data: bytes):
+        # the file only appears under its final name once it is on disk
+        path = os.path.join(self.root, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+
+    def read(self, key: str, offset: int, length: int) -> bytes:
+        with open(os.path.join(self.root, key), "rb") as f:
+            f.seek(offset)
+            return f.read(length)
+
+    def delete(self, key: str):
+        os.remove(os.path.join(self.root, key))
+
+
+class S3Store:
+    def __init__(self, bucket: str, prefix: str = ""):
+        import boto3  # optional: only deployments archiving to S3 need it
+
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.client = boto3.client("s3")
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def put(self, key: str, data: bytes):
+        self.client.put_object(Bucket=self.bucket, Key=self._key(key), Body=data)
+
+    def read(self, key: str, offset: int, length: int) -> bytes:
+        response = self.client.get_object(
+            Bucket=self.bucket, Key=self._key(key), Range=f"bytes={offset}-{offset + length - 1}"
+        )
+        return response["Body"].read()
+
+    def delete(self, key: str):
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+
+
+def make_store(spec: str = ARCHIVE_STORE):
+    if spec.startswith("s3://"):
+        bucket, _, prefix = spec[len("s3://"):].partition("/")
+        return S3Store(bucket, prefix)
+    if spec.startswith("file:"):
+        return FileStore(spec[len("file:"):])
+    raise RuntimeError("ARCHIVE_STORE must be s3://bucket/prefix or file:/shared/path")
+
+
+_store = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        _store = make_store()
+    return _store
+
+
+# -------- WRITE --------
+def _pack(key: str, bookings: list[Booking]) -> tuple[bytes, list[dict]]:
+    """
+    One archive file's bytes, and an `archived_bookings` mapping per
+    booking pointing into it.
+    """
+    data, entries = bytearray(), []
+    for i in range(0, len(bookings), ARCHIVE_BLOCK_ROWS):
+        block = bookings[i:i + ARCHIVE_BLOCK_ROWS]
+        member = gzip.compress(b"".join(
+            json.dumps(_row(b), default=_encode).encode() + b"\n" for b in block
+        ))
+        offset = len(data)
+        data += member
+        entries += [{
+            "booking_id": b.booking_id,
+            "professional_id": b.professional_id,
+            "area_id": b.area_id,
+            "service_id": b.service_id,
+            "status": b.status,
+            "total_price": b.total_price,
+            "scheduled_at": b.scheduled_at,
+            "archive_file": key,
+            "block_offset": offset,
+            "block_length": len(member),
+        } for b in block]
+    return bytes(data), entries
+
+
+def archive_bookings(db: Session, before: datetime, dry_run: bool = False, log=print) -> int:
+    """
+    Move terminal bookings scheduled before `before` into archive files,
+    ARCHIVE_BATCH_ROWS per transaction. Returns the number of bookings
+    archived (or that would be, with `dry_run`).
+    """
+    store = None if dry_run else get_store()
+    run = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+    moved, last_id, batch_no = 0, 0, 0
+    while True:
+        bookings = (
+            db.query(Booking)
+            .filter(
+                Booking.status.in_(TERMINAL_STATUSES),
+                Booking.scheduled_at < before,
+                Booking.booking_id > last_id
+            )
+            .order_by(Booking.booking_id)
+            .limit(ARCHIVE_BATCH_ROWS)
+            # a booking being changed right now is left for the next run
+            .with_for_update(skip_locked=True)
+            .all()
+        )
+        if not bookings:
+            break
+        last_id = bookings[-1].booking_id
+        batch_no += 1
+
+        by_month = {}
+        for booking in bookings:
+            by_month.setdefault(f"{_utc(booking.scheduled_at):%Y-%m}", []).append(booking)
+        if dry_run:
+            for month, rows in sorted(by_month.items()):
+                log(f"would archive {len(rows)} booking(s) from {month}")
+            moved += len(bookings)
+            db.rollback()
+            continue
+
+        start = time.perf_counter()
+        written, entries = [], []
+        try:
+            for month, rows in sorted(by_month.items()):
+                key = f"bookings/{month}/{run}-{batch_no:04d}.ndjson.gz"
+                data, packed = _pack(key, rows)
+                store.put(key, data)
+                written.append(key)
+                entries += packed
+            db.bulk_insert_mappings(ArchivedBooking, entries)
+            db.query(Booking).filter(
+                Booking.booking_id.in_([b.booking_id for b in bookings])
+            ).delete(synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            # nothing points at these files any more
+            for key in written:
+                store.delete(key)
+            raise
+        db.expunge_all()
+        moved += len(bookings)
+        log(f"archived {len(bookings)} booking(s) into {len(written)} file(s) "
+            f"in {(time.perf_counter() - start) * 1000:.0f}ms")
+    return moved
+
+
+# -------- READ --------
+def fetch_archived(db: Session, booking_id: int) -> Booking | None:
+    """
+    An archived booking as a detached Booking, or None if it was never
+    archived.
+    """
+    entry = db.get(ArchivedBooking, booking_id)
+    if not entry:
+        return None
+    try:
+        block = gzip.decompress(get_store().read(entry.archive_file, entry.block_offset, entry.block_length))
+    except Exception as e:
+        print(f"Archived booking {booking_id} unreadable from {entry.archive_file}: {e!r}")
+        raise HTTPException(503, "Archived booking unavailable")
+
+    for line in block.splitlines():
+        row = json.loads(line)
+        if row["booking_id"] == booking_id:
+            return _booking(row)
+    print(f"Archived booking {booking_id} missing from its block in {entry.archive_file}")
+    raise HTTPException(503, "Archived booking unavailable")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--older-than-days", type=int, default=ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+    if not ARCHIVE_STORE and not args.dry_run:
+        parser.error("set ARCHIVE_STORE to storage every API instance can read (s3://bucket/prefix "
+                     "or file:/shared/path)")
+
+    before = datetime.now(timezone.utc) - timedelta(days=args.older_than_days)
+    engine = get_engine()
+    db = SessionLocal()
+    try:
+        moved = archive_bookings(db, before, args.dry_run)
+    finally:
+        db.close()
+    print(f"{moved} booking(s) {'to archive' if args.dry_run else 'archived'} "
+          f"scheduled before {before:%Y-%m-%d}")
+
+    created = partitions.ensure(engine, dry_run=args.dry_run)
+    dropped = partitions.drop_empty_before(engine, before.date(), dry_run=args.dry_run)
+    if created or dropped:
+        print(f"partitions: {len(created)} created, {len(dropped)} dropped")
+
+
+if __name__ == "__main__":
+    main()
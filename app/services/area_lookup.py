@@ -0,0 +1,285 @@
+"""
+Pincode and city/name resolution for areas.
+
+Two sorted arrays, searched by bisection:
+  - (pincode, area_id) for exact resolution, pincode-prefix autocomplete
+    and the nearest-pincode fallback;
+  - (word-suffix, area_id) over each area's city and name, so "koram",
+    "bengaluru" and "5th blo" all autocomplete.
+Built on first use and updated by the area router on every write (other
+workers via the cache bus). Also rebuilt every AREA_LOOKUP_REFRESH_SECONDS,
+and after a cache bus flush, by a background thread: lookups keep using
+the current arrays until the new ones are swapped in.
+"""
+import bisect
+import os
+import re
+import threading
+import time
+
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.core.invalidation import cache_bus
+from app.models.area import Area
+
+
+AREA_LOOKUP_REFRESH_SECONDS = float(os.getenv("AREA_LOOKUP_REFRESH_SECONDS", "300"))
+# a neighbouring pincode must share at least this many leading digits
+# (the first three identify the sorting district)
+AREA_NEIGHBOUR_PREFIX = int(os.getenv("AREA_NEIGHBOUR_PREFIX", "3"))
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text: str | None) -> str:
+    return " ".join(_WORD.findall(text.lower())) if text else ""
+
+
+def name_keys(city: str | None, name: str | None) -> set:
+    """
+    Every word-suffix of the city and name: "hsr layout" -> {"hsr layout", "layout"}.
+    """
+    keys = set()
+    for text in (city, name):
+        words = normalize(text).split()
+        for i in range(len(words)):
+            keys.add(" ".join(words[i:]))
+    return keys
+
+
+def area_dict(area) -> dict:
+    return {
+        "area_id": area.area_id, "name": area.name, "city": area.city,
+        "pincode": area.pincode, "image_url": area.image_url,
+    }
+
+
+class AreaIndex:
+    def __init__(self):
+        self._areas = {}         # area_id -> area dict
+        self._pincodes = []      # sorted (pincode, area_id)
+        self._names = []         # sorted (key, area_id)
+        self._lock = threading.RLock()
+        self._built_at = None
+        self._expired = False
+        self._replay = None      # writes made while a rebuild is reading
+
+    # -------- WRITES --------
+    def upsert(self, area):
+        self._write(area.area_id, area_dict(area))
+
+    def remove(self, area_id: int):
+        self._write(area_id, None)
+
+    def _write(self, area_id: int, area: dict | None):
+        with self._lock:
+            if self._replay is not None:
+                self._replay.append((area_id, area))
+            self._apply(area_id, area)
+
+    def _apply(self, area_id: int, area: dict | None):
+        self._remove(area_id)
+        if area is None:
+            return
+        self._areas[area_id] = area
+        pincode = (area["pincode"] or "").strip()
+        if pincode:
+            bisect.insort(self._pincodes, (pincode, area_id))
+        for key in name_keys(area["city"], area["name"]):
+            bisect.insort(self._names, (key, area_id))
+
+    def _remove(self, area_id: int):
+        old = self._areas.pop(area_id, None)
+        if old is None:
+            return
+        pincode = (old["pincode"] or "").strip()
+        if pincode:
+            self._delete(self._pincodes, (pincode, area_id))
+        for key in name_keys(old["city"], old["name"]):
+            self._delete(self._names, (key, area_id))
+
+    @staticmethod
+    def _delete(array: list, item):
+        i = bisect.bisect_left(array, item)
+        if i < len(array) and array[i] == item:
+            del array[i]
+
+    def rebuild(self, db: Session):
+        """
+        Build fresh arrays off to the side and swap them in. Writes that
+        land meanwhile go to the current arrays and are replayed onto the
+        new ones, since the query may have read those rows before them.
+        """
+        with self._lock:
+            self._replay = []
+        try:
+            self._rebuild(db)
+        finally:
+            with self._lock:
+                self._replay = None
+
+    def _rebuild(self, db: Session):
+        areas = {}
+        pincodes, names = [], []
+        for area in db.query(Area).yield_per(500):
+            areas[area.area_id] = area_dict(area)
+            pincode = (area.pincode or "").strip()
+            if pincode:
+                pincodes.append((pincode, area.area_id))
+            names.extend((key, area.area_id) for key in name_keys(area.city, area.name))
+        pincodes.sort()
+        names.sort()
+        with self._lock:
+            self._areas, self._pincodes, self._names = areas, pincodes, names
+            for area_id, area in self._replay:
+                self._apply(area_id, area)
+            self._built_at = time.monotonic()
+            self._expired = False
+
+    def stale(self) -> bool:
+        return (self._built_at is None or self._expired
+                or time.monotonic() - self._built_at > AREA_LOOKUP_REFRESH_SECONDS)
+
+    def expire(self):
+        # keeps serving until the background rebuild replaces it
+        self._expired = True
+
+    # -------- QUERIES --------
+    @staticmethod
+    def _prefix(array: list, prefix: str, limit: int) -> list[int]:
+        ids = []
+        i = bisect.bisect_left(array, (prefix,))
+        while i < len(array) and len(ids) < limit and array[i][0].startswith(prefix):
+            if array[i][1] not in ids:
+                ids.append(array[i][1])
+            i += 1
+        return ids
+
+    def autocomplete(self, q: str, limit: int = 10) -> list[dict]:
+        """
+        All-digit input completes pincodes; anything else matches the
+        start of any word in the city or area name.
+        """
+        q = q.strip()
+        with self._lock:
+            if q.isdigit():
+                ids = self._prefix(self._pincodes, q, limit)
+            else:
+                key = normalize(q)
+                ids = self._prefix(self._names, key, limit) if key else []
+            return [self._areas[i] for i in ids]
+
+    def resolve(self, pincode: str, limit: int = 5) -> tuple[bool, list[dict]]:
+        """
+        (True, areas) for an exact pincode match, otherwise (False, the
+        nearest pincodes that share AREA_NEIGHBOUR_PREFIX leading digits).
+        """
+        pincode = pincode.strip()
+        with self._lock:
+            i = j = bisect.bisect_left(self._pincodes, (pincode,))
+            while j < len(self._pincodes) and self._pincodes[j][0] == pincode:
+                j += 1
+            if j > i:
+                return True, [self._areas[area_id] for _, area_id in self._pincodes[i:j]]
+            if not pincode.isdigit() or len(pincode) < AREA_NEIGHBOUR_PREFIX:
+                return False, []
+
+            # walk outwards from the insertion point, closest pincode first
+            district = pincode[:AREA_NEIGHBOUR_PREFIX]
+            target = int(pincode)
+
+            def candidate(j, step):
+                # pincodes in the district are contiguous in sort order:
+                # step past the ones that are not plain digits ("560 034")
+                # and stop only at the end of the district or the list
+                while 0 <= j < len(self._pincodes) and self._pincodes[j][0].startswith(district):
+                    if self._pincodes[j][0].isdigit():
+                        return j
+                    j += step
+                return None
+
+            lo, hi = candidate(i - 1, -1), candidate(i, 1)
+            found = []
+            while len(found) < limit and (lo is not None or hi is not None):
+                below = abs(int(self._pincodes[lo][0]) - target) if lo is not None else None
+                above = abs(int(self._pincodes[hi][0]) - target) if hi is not None else None
+                if above is None or (below is not None and below <= above):
+                    found.append(self._pincodes[lo][1])
+                    lo = candidate(lo - 1, -1)
+                else:
+                    found.append(self._pincodes[hi][1])
+                    hi = candidate(hi + 1, 1)
+            return False, [self._areas[j] for j in found]
+
+
+area_index = AreaIndex()
+_rebuild_lock = threading.Lock()
+
+
+def _rebuild_in_background():
+    db = SessionLocal()
+    try:
+        area_index.rebuild(db)
+    except Exception as e:
+        print(f"Area index rebuild failed: {e!r}")
+    finally:
+        db.close()
+        _rebuild_lock.release()
+
+
+def ensure_fresh(db: Session | None = None):
+    """
+    Build the index on first use. After that a stale index keeps serving
+    while one background thread rebuilds it.
+    """
+    if area_index._built_at is None:
+        with _rebuild_lock:
+            if area_index._built_at is not None:
+                return
+            own = db is None
+            db = db or SessionLocal()
+            try:
+                area_index.rebuild(db)
+            finally:
+                if own:
+                    db.close()
+    elif area_index.stale() and _rebuild_lock.acquire(blocking=False):
+        # released by the thread once the rebuild is done
+        threading.Thread(target=_rebuild_in_background, name="area-rebuild", daemon=True).start()
+
+
+def index_area(area):
+    """
+    Called by the area router after a successful write.
+    """
+    if area_index._built_at is not None:
+        area_index.upsert(area)
+    cache_bus.publish("areas", area.area_id)
+
+
+def remove_area(area_id: int):
+    area_index.remove(area_id)
+    cache_bus.publish("areas", area_id)
+
+
+def refresh_area(key: str | None):
+    """
+    Another worker wrote this area: re-read just that row.
+    """
+    if key is None:
+        return area_index.expire()
+    if area_index._built_at is None:
+        return
+    db = SessionLocal()
+    try:
+        area = db.get(Area, int(key))
+        if area is None:
+            area_index.remove(int(key))
+        else:
+            area_index.upsert(area)
+    finally:
+        db.close()
+
+
+cache_bus.subscribe("areas", refresh_area)
@@ -1,7 +1,13 @@
+import os
+from fastapi import HTTPException
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
+from app.core.repository import update_returning
 from app.models.booking import Booking
 from datetime import timezone
-from app.schemas.booking import BookingCreate
+from app.schemas.booking import BookingBulkStatus, BookingCreate
+from app.services.notifications import send_booking_confirmation, send_booking_status_update
+from app.services.outbox import record_booking_batch, record_booking_event
 
 def create_booking_service(data, db):
     booking = Booking(
@@ -18,14 +24,141 @@ def create_booking_service(data, db):
     )
 
     db.add(booking)
+    db.flush()
+    record_booking_event(db, booking, "booking.created")
     db.commit()
     db.refresh(booking)
+    send_booking_confirmation(booking)
     return booking
 
 
-def update_booking_status(booking_id: int, status: str, db: Session):
-    booking = db.query(Booking).filter(Booking.booking_id == booking_id).first()
-    booking.status = status
+BULK_STATUS_MAX_ROWS = int(os.getenv("BULK_STATUS_MAX_ROWS", "1000"))
+
+# target status -> statuses a booking may move to it from
+ALLOWED_TRANSITIONS = {
+    "completed": {"pending"},
+    "cancelled": {"pending"},
+    "pending": {"cancelled"},
+}
+
+
+def check_status_change(db: Session, booking_id: int, status: str, detail: str = "Booking not found") -> str:
+    """
+    Lock the booking and return its current status. Raises unless it is
+    already `status` or ALLOWED_TRANSITIONS lets it move there.
+    """
+    allowed_from = ALLOWED_TRANSITIONS.get(status)
+    if allowed_from is None:
+        raise HTTPException(400, "Invalid status")
+    current = (
+        db.query(Booking.status)
+        .filter(Booking.booking_id == booking_id)
+        .with_for_update()
+        .scalar()
+    )
+    if current is None:
+        raise HTTPException(404, detail)
+    if current != status and current not in allowed_from:
+        raise HTTPException(409, f"A {current} booking cannot become {status}")
+    return current
+
+
+def update_booking_status(booking_id: int, status: str, db: Session, detail: str = "Booking not found"):
+    current = check_status_change(db, booking_id, status, detail)
+    if current == status:
+        booking = db.get(Booking, booking_id)
+        db.expunge(booking)
+        db.commit()
+        return booking
+    booking = update_returning(db, Booking, booking_id, {"status": status}, detail)
+    record_booking_event(db, booking, "booking.status_changed", {"status": current})
     db.commit()
-    db.refresh(booking)
+    send_booking_status_update(booking)
     return booking
+
+
+def bulk_update_status(data: BookingBulkStatus, db: Session):
+    """
+    Move every matching booking to `data.status` with one UPDATE, and
+    report an outcome per booking: updated, unchanged, invalid_transition,
+    filtered_out (a listed booking the other filters exclude) or
+    not_found. Events, rollups and notifications are handled once for
+    the whole batch.
+    """
+    allowed_from = ALLOWED_TRANSITIONS.get(data.status)
+    if allowed_from is None:
+        raise HTTPException(400, "Invalid status")
+
+    filters = []
+    if data.booking_ids is not None:
+        if len(data.booking_ids) > BULK_STATUS_MAX_ROWS:
+            raise HTTPException(400, f"At most {BULK_STATUS_MAX_ROWS} bookings per request")
+        filters.append(Booking.booking_id.in_(data.booking_ids))
+    if data.professional_id is not None:
+        filters.append(Booking.professional_id == data.professional_id)
+    if data.area_id is not None:
+        filters.append(Booking.area_id == data.area_id)
+    if data.scheduled_from is not None:
+        filters.append(Booking.scheduled_at >= data.scheduled_from)
+    if data.scheduled_to is not None:
+        filters.append(Booking.scheduled_at < data.scheduled_to)
+    if not filters:
+        raise HTTPException(400, "Give booking_ids or at least one filter")
+
+    # lock the candidates so the transition check holds until the UPDATE
+    current = dict(
+        db.query(Booking.booking_id, Booking.status)
+        .filter(*filters)
+        .order_by(Booking.booking_id)
+        .limit(BULK_STATUS_MAX_ROWS + 1)
+        .with_for_update()
+        .all()
+    )
+    if len(current) > BULK_STATUS_MAX_ROWS:
+        raise HTTPException(400, f"Filter matches more than {BULK_STATUS_MAX_ROWS} bookings; narrow it")
+
+    filtered_out = set()
+    if data.booking_ids is not None and len(filters) > 1:
+        unmatched = [bid for bid in data.booking_ids if bid not in current]
+        if unmatched:
+            filtered_out = set(
+                db.scalars(select(Booking.booking_id).where(Booking.booking_id.in_(unmatched)))
+            )
+
+    eligible = [bid for bid, status in current.items() if status in allowed_from]
+    updated = []
+    if eligible:
+        updated = db.execute(
+            update(Booking)
+            .where(Booking.booking_id.in_(eligible), Booking.status.in_(allowed_from))
+            .values(status=data.status)
+            .returning(Booking),
+            execution_options={"synchronize_session": False}
+        ).scalars().all()
+        for booking in updated:
+            db.expunge(booking)
+
+    record_booking_batch(
+        db, [(b, {"status": current[b.booking_id]}) for b in updated], "booking.status_changed"
+    )
+    db.commit()
+    for booking in updated:
+        send_booking_status_update(booking)
+
+    done = {b.booking_id for b in updated}
+    results = []
+    for booking_id in (dict.fromkeys(data.booking_ids) if data.booking_ids is not None else current):
+        status = current.get(booking_id)
+        if booking_id in filtered_out:
+            outcome = "filtered_out"
+        elif status is None:
+            outcome = "not_found"
+        elif booking_id in done:
+            outcome, status = "updated", data.status
+        elif status == data.status:
+            outcome = "unchanged"
+        else:
+            outcome = "invalid_transition"
+        results.append({"booking_id": booking_id, "outcome": outcome, "status": status})
+
+    return {"status": data.status, "updated": len(done), "results": results}
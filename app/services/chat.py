@@ -0,0 +1,135 @@
+"""
+Chatbot completions: model routing, prompt templates and accounting.
+
+Each request goes to one chat route, which fixes its prompt template,
+model and max_tokens:
+
+    faq      short, single-question text         CHAT_FAST_MODEL
+    support  everything else in text             CHAT_MODEL
+    image    photo triage, JSON answer           CHAT_IMAGE_MODEL
+
+Every completion records its latency, prompt/cached/completion tokens
+and, when the provider reports it, cost, labelled by chat route and the
+model that actually answered (see chat_* in app.core.metrics).
+"""
+import os
+import re
+from time import perf_counter
+
+from fastapi import HTTPException
+
+from app.core.metrics import chat_completions, chat_cost, chat_latency, chat_tokens
+from app.services.prompts import CHAT_PROMPT_VERSION, INLINE_PROMPTS, get_prompt
+
+
+OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
+CHAT_API_URL = os.getenv("CHAT_API_URL", "https://openrouter.ai/api/v1/chat/completions")
+CHAT_TIMEOUT = float(os.getenv("CHAT_TIMEOUT", "30"))
+
+CHAT_MODEL = os.getenv("CHAT_MODEL", "openrouter/auto")
+CHAT_MAX_TOKENS = int(os.getenv("CHAT_MAX_TOKENS", "512"))
+CHAT_FAST_MODEL = os.getenv("CHAT_FAST_MODEL", "openai/gpt-4o-mini")
+CHAT_FAST_MAX_TOKENS = int(os.getenv("CHAT_FAST_MAX_TOKENS", "160"))
+CHAT_IMAGE_MODEL = os.getenv("CHAT_IMAGE_MODEL", "openai/gpt-4o-mini")
+# the DIY answer lists tools and steps; truncated JSON is a failed answer
+CHAT_IMAGE_MAX_TOKENS = int(os.getenv("CHAT_IMAGE_MAX_TOKENS", "800"))
+# longer messages always take the support route
+CHAT_FAQ_MAX_WORDS = int(os.getenv("CHAT_FAQ_MAX_WORDS", "20"))
+
+CHAT_ROUTES = {
+    "faq": {"prompt": "support", "model": CHAT_FAST_MODEL, "max_tokens": CHAT_FAST_MAX_TOKENS},
+    "support": {"prompt": "support", "model": CHAT_MODEL, "max_tokens": CHAT_MAX_TOKENS},
+    "image": {"prompt": "image_triage", "model": CHAT_IMAGE_MODEL, "max_tokens": CHAT_IMAGE_MAX_TOKENS},
+}
+
+FAQ_OPENER = re.compile(
+    r"^(what|which|when|where|who|is|are|do|does|can|how (much|many|long))\b"
+)
+SENTENCE_END = re.compile(r"[.?!]+(\s|$)")
+
+
+# -------- ROUTING --------
+def route_text(message: str) -> str:
+    """
+    "faq" for a short, single question or a few words; "support" otherwise.
+    """
+    text = message.strip().lower()
+    words = text.split()
+    if len(words) > CHAT_FAQ_MAX_WORDS or "\n" in text:
+        return "support"
+    # "My sink leaks. What should I do?" needs the stronger model
+    if len(SENTENCE_END.findall(text)) > 1:
+        return "support"
+    if len(words) <= 4 or FAQ_OPENER.match(text):
+        return "faq"
+    return "support"
+
+
+# -------- COMPLETION --------
+def _messages(name: str, version: str, prompt: str, user_content) -> list[dict]:
+    if (name, version) in INLINE_PROMPTS:
+        parts = user_content if isinstance(user_content, list) else [{"type": "text", "text": user_content}]
+        return [{"role": "user", "content": [{"type": "text", "text": prompt}, *parts]}]
+    return [
+        {"role": "system", "content": prompt},
+        {"role": "user", "content": user_content}
+    ]
+
+
+def _record(route: str, model: str, prompt: str, outcome: str, elapsed: float, usage: dict):
+    chat_completions.inc((route, model, prompt, outcome))
+    chat_latency.observe((route, model), elapsed)
+    if not usage:
+        return
+    prompt_tokens = usage.get("prompt_tokens") or 0
+    cached = (usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+    completion_tokens = usage.get("completion_tokens") or 0
+    chat_tokens.inc((route, model, "prompt"), prompt_tokens)
+    chat_tokens.inc((route, model, "cached"), cached)
+    chat_tokens.inc((route, model, "completion"), completion_tokens)
+    if usage.get("cost"):
+        chat_cost.inc((route, model), usage["cost"])
+    print(f"Chat {route} via {model} ({prompt}): {prompt_tokens} prompt ({cached} cached) "
+          f"+ {completion_tokens} completion tokens in {elapsed * 1000:.0f}ms")
+
+
+def complete(route: str, user_content, version: str = CHAT_PROMPT_VERSION) -> str:
+    """
+    Reply text for `user_content` (a string, or content parts) on the
+    given chat route.
+    """
+    import requests  # deferred: keeps it off the cold-start import path
+
+    spec = CHAT_ROUTES[route]
+    version, prompt = get_prompt(spec["prompt"], version)
+    prompt_label = f"{spec['prompt']}:{version}"
+    model, outcome, usage = spec["model"], "error", None
+
+    start = perf_counter()
+    try:
+        response = requests.post(
+            CHAT_API_URL,
+            headers={
+                "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+                "Content-Type": "application/json"
+            },
+            json={
+                "model": spec["model"],
+                "max_tokens": spec["max_tokens"],
+                "messages": _messages(spec["prompt"], version, prompt, user_content),
+                # OpenRouter: report cached tokens and cost with the usage
+                "usage": {"include": True}
+            },
+            timeout=CHAT_TIMEOUT
+        )
+        if response.status_code != 200:
+            raise HTTPException(status_code=500, detail=response.text)
+
+        body = response.json()
+        # openrouter/auto resolves to a concrete model; label by that one
+        model = body.get("model") or model
+        usage = body.get("usage")
+        outcome = "ok"
+        return body["choices"][0]["message"]["content"]
+    finally:
+        _record(route, model, prompt_label, outcome, perf_counter() - start, usage)
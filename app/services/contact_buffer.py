@@ -0,0 +1,150 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+from sqlalchemy import insert
+from sqlalchemy.exc import InterfaceError, OperationalError
+
+from app.core.database import SessionLocal
+from app.models.contact import Contact
+
+
+CONTACT_WRITE_BEHIND = os.getenv("CONTACT_WRITE_BEHIND", "0") == "1"
+CONTACT_BUFFER_SIZE = int(os.getenv("CONTACT_BUFFER_SIZE", "5000"))
+CONTACT_FLUSH_SIZE = int(os.getenv("CONTACT_FLUSH_SIZE", "500"))
+CONTACT_FLUSH_INTERVAL = float(os.getenv("CONTACT_FLUSH_INTERVAL", "1.0"))
+
+
+class ContactBuffer:
+    """
+    Write-behind buffer for contact form submissions.
+
+    `offer` appends to a bounded in-memory buffer and returns False when it
+    is full so the caller can push back. A background thread flushes with
+    one multi-row INSERT whenever `flush_size` rows are waiting or
+    `flush_interval` seconds have passed. `stop` flushes whatever is left.
+
+    If the batch INSERT fails, its rows are retried one at a time: a row
+    that still fails is logged in full and dropped, so one bad submission
+    cannot hold up the rest. Only when the database itself is unreachable
+    are rows kept in the buffer for the next flush.
+    """
+
+    def __init__(self, enabled: bool = CONTACT_WRITE_BEHIND, session_factory=SessionLocal,
+                 max_size: int = CONTACT_BUFFER_SIZE, flush_size: int = CONTACT_FLUSH_SIZE,
+                 flush_interval: float = CONTACT_FLUSH_INTERVAL):
+        self.enabled = enabled
+        self.session_factory = session_factory
+        self.max_size = max_size
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+
+        self._rows = deque()
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+
+    def __len__(self):
+        return len(self._rows)
+
+    def offer(self, row: dict) -> bool:
+        row.setdefault("created_at", datetime.utcnow())
+        with self._lock:
+            if len(self._rows) >= self.max_size:
+                return False
+            self._rows.append(row)
+            size = len(self._rows)
+        if size >= self.flush_size:
+            self._wakeup.set()
+        return True
+
+    def flush(self) -> int:
+        """
+        Write everything currently buffered. Returns the number of rows written.
+        """
+        written = 0
+        with self._flush_lock:
+            while True:
+                with self._lock:
+                    n = min(len(self._rows), self.flush_size)
+                    batch = [self._rows.popleft() for _ in range(n)]
+                if not batch:
+                    return written
+
+                try:
+                    self._insert(batch)
+                    written += len(batch)
+                except (OperationalError, InterfaceError):
+                    self._requeue(batch)
+                    raise
+                except Exception:
+                    written += self._insert_each(batch)
+
+    def _insert(self, rows: list[dict]):
+        db = self.session_factory()
+        try:
+            db.execute(insert(Contact), rows)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _insert_each(self, batch: list[dict]) -> int:
+        written = 0
+        for i, row in enumerate(batch):
+            try:
+                self._insert([row])
+                written += 1
+            except (OperationalError, InterfaceError):
+                self._requeue(batch[i:])
+                raise
+            except Exception as e:
+                self.dropped += 1
+                print(f"Contact submission dropped, cannot be written: {e!r} "
+                      f"{json.dumps(row, default=str)}")
+        return written
+
+    def _requeue(self, rows: list[dict]):
+        with self._lock:
+            # keep the rows for the next attempt, oldest first
+            self._rows.extendleft(reversed(rows))
+
+    def start(self):
+        if not self.enabled or self._thread:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="contact-buffer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 10.0):
+        if self._thread:
+            self._stopping.set()
+            self._wakeup.set()
+            self._thread.join(timeout)
+            self._thread = None
+        try:
+            self.flush()
+        except Exception as e:
+            # shutting down: the rows cannot be kept anywhere, say how many
+            print(f"Contact buffer final flush failed, {len(self._rows)} rows lost: {e!r}")
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Contact buffer flush failed, {len(self._rows)} rows pending: {e!r}")
+                time.sleep(self.flush_interval)
+
+
+contact_buffer = ContactBuffer()
@@ -0,0 +1,332 @@
+import heapq
+import itertools
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+
+NOTIFICATION_WORKERS = int(os.getenv("NOTIFICATION_WORKERS", "2"))
+NOTIFICATION_QUEUE_SIZE = int(os.getenv("NOTIFICATION_QUEUE_SIZE", "10000"))
+NOTIFICATION_BATCH_SIZE = int(os.getenv("NOTIFICATION_BATCH_SIZE", "50"))
+NOTIFICATION_BATCH_WAIT = float(os.getenv("NOTIFICATION_BATCH_WAIT", "0.05"))
+NOTIFICATION_MAX_RETRIES = int(os.getenv("NOTIFICATION_MAX_RETRIES", "3"))
+NOTIFICATION_RETRY_BACKOFF = float(os.getenv("NOTIFICATION_RETRY_BACKOFF", "0.5"))
+
+
+class Notification:
+    __slots__ = ("user_id", "message", "channel", "created_at", "attempts", "error")
+
+    def __init__(self, user_id: int, message: str, channel: str = "email"):
+        self.user_id = user_id
+        self.message = message
+        self.channel = channel
+        self.created_at = datetime.now(timezone.utc)
+        self.attempts = 0
+        self.error = None
+
+    def to_dict(self):
+        return {
+            "user_id": self.user_id,
+            "message": self.message,
+            "channel": self.channel,
+            "created_at": self.created_at.isoformat(),
+            "attempts": self.attempts,
+            "error": self.error,
+        }
+
+
+# -------- SINKS --------
+# `send_batch` returns the notifications it could not deliver, each with
+# its `error` set, and raises only when none of the batch went out.
+class ConsoleSink:
+    """
+    Default sink. Keeps the old print behaviour.
+    """
+
+    def send_batch(self, notifications):
+        for n in notifications:
+            print(f"Notification sent to user {n.user_id}: {n.message}")
+
+
+class FileSink:
+    """
+    Appends one JSON line per notification. Local stand-in for tests.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def send_batch(self, notifications):
+        lines = "".join(json.dumps(n.to_dict()) + "\n" for n in notifications)
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+class SMTPSink:
+    """
+    Sends a whole batch over a single SMTP connection.
+    Works against a local debugging server (e.g. `python -m aiosmtpd -n`).
+    A refused message fails alone; a dropped connection fails the rest.
+    """
+
+    def __init__(self, host: str, port: int = 25, sender: str = "no-reply@homeserv.local",
+                 username: str | None = None, password: str | None = None,
+                 resolve_address=None):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.username = username
+        self.password = password
+        self.resolve_address = resolve_address or (lambda user_id: f"user-{user_id}@homeserv.local")
+
+    def send_batch(self, notifications):
+        import smtplib
+        from email.message import EmailMessage
+
+        failed = []
+        with smtplib.SMTP(self.host, self.port, timeout=10) as smtp:
+            if self.username:
+                smtp.starttls()
+                smtp.login(self.username, self.password)
+            for i, n in enumerate(notifications):
+                msg = EmailMessage()
+                msg["From"] = self.sender
+                msg["To"] = self.resolve_address(n.user_id)
+                msg["Subject"] = "HomeServ notification"
+                msg.set_content(n.message)
+                try:
+                    smtp.send_message(msg)
+                except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused) as e:
+                    # refused by the server; the connection is still good
+                    n.error = repr(e)
+                    failed.append(n)
+                except OSError as e:
+                    # connection lost: nothing from here on went out
+                    for rest in notifications[i:]:
+                        rest.error = repr(e)
+                    failed += notifications[i:]
+                    break
+        return failed
+
+
+def sink_from_env(value: str | None):
+    """
+    console | file:/path/to/log.jsonl | smtp://host:port
+    """
+    if not value or value == "console":
+        return ConsoleSink()
+    if value.startswith("file:"):
+        return FileSink(value[len("file:"):])
+    if value.startswith("smtp://"):
+        host, _, port = value[len("smtp://"):].partition(":")
+        return SMTPSink(
+            host,
+            int(port or 25),
+            username=os.getenv("SMTP_USERNAME"),
+            password=os.getenv("SMTP_PASSWORD"),
+        )
+    raise ValueError(f"Unknown notification sink: {value}")
+
+
+# -------- DISPATCHER --------
+class NotificationDispatcher:
+    """
+    In-process queue drained by background worker threads.
+
+    `enqueue` is O(1) and never blocks the request. Workers pull up to
+    `batch_size` messages, group them per channel and hand each group to
+    the channel's sink. Only the notifications a sink reports as failed
+    (all of them, if it raises) are retried: each is put on a retry heap
+    due after an exponential backoff, and workers pick due retries up
+    ahead of the queue, so a failing sink never parks a worker in a sleep.
+    A notification still failing after `max_retries` retries goes to the
+    dead-letter store.
+    """
+
+    def __init__(self, workers: int = NOTIFICATION_WORKERS, queue_size: int = NOTIFICATION_QUEUE_SIZE,
+                 batch_size: int = NOTIFICATION_BATCH_SIZE, batch_wait: float = NOTIFICATION_BATCH_WAIT,
+                 max_retries: int = NOTIFICATION_MAX_RETRIES, retry_backoff: float = NOTIFICATION_RETRY_BACKOFF,
+                 dead_letter_size: int = 1000):
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._sinks = {}
+        self._default_sink = sink_from_env(os.getenv("NOTIFICATION_SINK"))
+        self._dead_letters = deque(maxlen=dead_letter_size)
+        self._threads = []
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        # (due, seq, notification), due on the monotonic clock
+        self._retries = []
+        # notifications a worker is delivering right now
+        self._in_flight = set()
+        # guards _retries and _in_flight
+        self._retry_lock = threading.Lock()
+        self._retry_seq = itertools.count()
+
+    def register_sink(self, channel: str, sink):
+        self._sinks[channel] = sink
+
+    def set_default_sink(self, sink):
+        self._default_sink = sink
+
+    def enqueue(self, notification: Notification):
+        if not self._threads:
+            self.start()
+        try:
+            self._queue.put_nowait(notification)
+        except queue.Full:
+            notification.error = "queue full"
+            self._dead_letters.append(notification)
+
+    def dead_letters(self):
+        return [n.to_dict() for n in self._dead_letters]
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            self._stopping.clear()
+            for i in range(self.workers):
+                t = threading.Thread(target=self._run, name=f"notifications-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def flush(self, timeout: float | None = None):
+        """
+        Block until everything enqueued so far has been delivered or
+        dead-lettered, pending retries included.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def shutdown(self, timeout: float = 5.0):
+        if not self._threads:
+            return
+        self.flush(timeout)
+        self._stopping.set()
+        for t in self._threads:
+            t.join(timeout)
+        self._threads = []
+
+        # whatever flush() did not get through: pending retries, batches
+        # of workers that did not stop in time, and the queue itself
+        with self._retry_lock:
+            pending = [n for _, _, n in self._retries] + list(self._in_flight)
+            self._retries, self._in_flight = [], set()
+        while True:
+            try:
+                n = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            pending.append(n)
+        if pending:
+            print(f"{len(pending)} undelivered notification(s) dead-lettered at shutdown")
+        for n in pending:
+            n.error = n.error or "dispatcher shut down"
+            self._dead_letters.append(n)
+            self._queue.task_done()
+
+    # -------- WORKER --------
+    def _run(self):
+        while not self._stopping.is_set():
+            batch = self._next_batch()
+            if not batch:
+                continue
+
+            by_channel = {}
+            for n in batch:
+                by_channel.setdefault(n.channel, []).append(n)
+
+            for channel, notifications in by_channel.items():
+                self._deliver(channel, notifications)
+
+    def _due_retries(self):
+        """
+        Due retries, up to `batch_size`, and the seconds until the next
+        one after them (None if there is none).
+        """
+        now = time.monotonic()
+        due = []
+        with self._retry_lock:
+            while self._retries and len(due) < self.batch_size and self._retries[0][0] <= now:
+                due.append(heapq.heappop(self._retries)[2])
+            self._in_flight.update(due)
+            wait = self._retries[0][0] - now if self._retries else None
+        return due, wait
+
+    def _next_batch(self):
+        due, wait = self._due_retries()
+        if due:
+            return due
+        try:
+            first = self._queue.get(timeout=0.5 if wait is None else min(0.5, max(wait, 0)))
+        except queue.Empty:
+            return []
+
+        batch = [first]
+        deadline = time.monotonic() + self.batch_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        with self._retry_lock:
+            self._in_flight.update(batch)
+        return batch
+
+    def _deliver(self, channel: str, notifications):
+        sink = self._sinks.get(channel, self._default_sink)
+
+        for n in notifications:
+            n.attempts += 1
+        try:
+            failed = sink.send_batch(notifications) or []
+        except Exception as e:
+            for n in notifications:
+                n.error = repr(e)
+            failed = notifications
+
+        # a notification stays unfinished in the queue's accounting, so
+        # flush() waits for it, until it is delivered or dead-lettered
+        failed_ids = {id(n) for n in failed}
+        dead = []
+        now = time.monotonic()
+        with self._retry_lock:
+            for n in notifications:
+                if n not in self._in_flight:
+                    # shutdown() has already dead-lettered it
+                    continue
+                self._in_flight.discard(n)
+                if id(n) not in failed_ids:
+                    n.error = None
+                    self._queue.task_done()
+                elif n.attempts <= self.max_retries:
+                    due = now + self.retry_backoff * (2 ** (n.attempts - 1))
+                    heapq.heappush(self._retries, (due, next(self._retry_seq), n))
+                else:
+                    dead.append(n)
+                    self._dead_letters.append(n)
+                    self._queue.task_done()
+
+        if dead:
+            print(f"{len(dead)} notification(s) for channel {channel} dead-lettered: {dead[0].error}")
+
+
+dispatcher = NotificationDispatcher()
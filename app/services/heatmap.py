@@ -0,0 +1,129 @@
+"""
+Booking demand by area x service x hour-of-week.
+
+Bookings are streamed in chunks of HEATMAP_CHUNK_SIZE rows, each chunk
+turned into one int64 array and binned with NumPy, so memory is bounded
+by the chunk size plus the number of non-empty cells no matter how many
+bookings there are. The epoch is computed in SQL so no datetime objects
+are built per row.
+"""
+import itertools
+import os
+from datetime import datetime, timezone
+
+from sqlalchemy import BigInteger, cast, func, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import TTLCache
+from app.models.booking import Booking
+
+HEATMAP_TTL_SECONDS = float(os.getenv("HEATMAP_TTL_SECONDS", "300"))
+HEATMAP_CHUNK_SIZE = int(os.getenv("HEATMAP_CHUNK_SIZE", "100000"))
+
+HOURS_PER_WEEK = 168
+# 1970-01-01 was a Thursday; shifting by three days makes hour 0 Monday 00:00
+EPOCH_WEEKDAY_SHIFT_HOURS = 72
+
+heatmap_cache = TTLCache(HEATMAP_TTL_SECONDS)
+
+
+def epoch_seconds(db: Session, column):
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        return cast(func.strftime("%s", column), BigInteger)
+    if dialect in ("mysql", "mariadb"):
+        return cast(func.unix_timestamp(column), BigInteger)
+    return cast(func.extract("epoch", column), BigInteger)
+
+
+def demand_query(db: Session, area_id=None, service_id=None, since=None, include_cancelled=False):
+    # package bookings have no service; they are binned under service 0
+    query = select(
+        Booking.area_id,
+        func.coalesce(Booking.service_id, 0),
+        epoch_seconds(db, Booking.scheduled_at)
+    )
+    if not include_cancelled:
+        query = query.where(Booking.status != "cancelled")
+    if area_id is not None:
+        query = query.where(Booking.area_id == area_id)
+    if service_id is not None:
+        query = query.where(Booking.service_id == service_id)
+    if since is not None:
+        query = query.where(Booking.scheduled_at >= since)
+    return query
+
+
+def bin_chunk(np, rows, utc_offset_minutes: int = 0):
+    """
+    (area_id, service_id, epoch) rows -> unique keys and their counts,
+    key = (area_id << 40) | (service_id << 8) | hour_of_week.
+    """
+    flat = itertools.chain.from_iterable(rows)
+    data = np.fromiter(flat, dtype=np.int64, count=3 * len(rows)).reshape(-1, 3)
+    hours = (data[:, 2] + utc_offset_minutes * 60) // 3600
+    hour_of_week = (hours + EPOCH_WEEKDAY_SHIFT_HOURS) % HOURS_PER_WEEK
+    keys = (data[:, 0] << 40) | (data[:, 1] << 8) | hour_of_week
+    return np.unique(keys, return_counts=True)
+
+
+def merge(np, keys_list, counts_list):
+    keys, inverse = np.unique(np.concatenate(keys_list), return_inverse=True)
+    counts = np.bincount(inverse, weights=np.concatenate(counts_list), minlength=len(keys))
+    return keys, counts.astype(np.int64)
+
+
+def compute_heatmap(db: Session, area_id=None, service_id=None, since=None,
+                    include_cancelled=False, utc_offset_minutes: int = 0,
+                    chunk_size: int = HEATMAP_CHUNK_SIZE) -> dict:
+    import numpy as np
+
+    keys = np.empty(0, dtype=np.int64)
+    counts = np.empty(0, dtype=np.int64)
+    pending_keys, pending_counts = [], []
+    rows_seen = 0
+
+    query = demand_query(db, area_id, service_id, since, include_cancelled)
+    result = db.execute(query.execution_options(yield_per=chunk_size))
+    for rows in result.partitions(chunk_size):
+        rows_seen += len(rows)
+        chunk_keys, chunk_counts = bin_chunk(np, rows, utc_offset_minutes)
+        pending_keys.append(chunk_keys)
+        pending_counts.append(chunk_counts)
+        # fold partial results in batches rather than re-sorting every chunk
+        if sum(len(k) for k in pending_keys) >= chunk_size * 4:
+            keys, counts = merge(np, [keys, *pending_keys], [counts, *pending_counts])
+            pending_keys, pending_counts = [], []
+    keys, counts = merge(np, [keys, *pending_keys], [counts, *pending_counts])
+
+    # one 168-slot row per (area, service) pair
+    pairs, pair_index = np.unique(keys >> 8, return_inverse=True)
+    grid = np.zeros((len(pairs), HOURS_PER_WEEK), dtype=np.int64)
+    np.add.at(grid, (pair_index, keys & 0xFF), counts)
+
+    series = []
+    for pair, row in zip(pairs.tolist(), grid.tolist()):
+        service = pair & 0xFFFFFFFF
+        series.append({
+            "area_id": pair >> 32,
+            "service_id": service or None,
+            "total": sum(row),
+            "counts": row,
+        })
+    series.sort(key=lambda s: s["total"], reverse=True)
+
+    return {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "utc_offset_minutes": utc_offset_minutes,
+        "hour_of_week": "0 = Monday 00:00",
+        "bookings": rows_seen,
+        "series": series,
+    }
+
+
+def demand_heatmap(db: Session, area_id=None, service_id=None, since=None,
+                   include_cancelled=False, utc_offset_minutes: int = 0) -> dict:
+    key = (area_id, service_id, since, include_cancelled, utc_offset_minutes)
+    return heatmap_cache.get_or_compute(key, lambda: compute_heatmap(
+        db, area_id, service_id, since, include_cancelled, utc_offset_minutes
+    ))
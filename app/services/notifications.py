@@ -1,9 +1,12 @@
-def send_notification(user_id: int, message: str):
+from app.services.dispatcher import Notification, dispatcher
+
+
+def send_notification(user_id: int, message: str, channel: str = "email"):
     """
     Generic notification sender.
-    Replace with Email / SMS / Push service logic.
+    Only enqueues; delivery happens on the dispatcher's worker threads.
     """
-    print(f"Notification sent to user {user_id}: {message}")
+    dispatcher.enqueue(Notification(user_id, message, channel))
 
 
 def send_booking_confirmation(booking):
@@ -15,3 +18,11 @@ def send_booking_confirmation(booking):
         f"on {booking.scheduled_at}."
     )
     send_notification(booking.user_id, msg)
+
+
+def send_booking_status_update(booking):
+    """
+    Tell the user their booking moved to a new status.
+    """
+    msg = f"Booking #{booking.booking_id} is now {booking.status}."
+    send_notification(booking.user_id, msg)
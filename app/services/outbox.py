@@ -0,0 +1,322 @@
+import json
+import os
+import threading
+import time
+
+from sqlalchemy import event, func, text, tuple_
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models.outbox import OutboxDeadLetter, OutboxEvent, OutboxOffset
+
+
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "200"))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "1.0"))
+# deliveries of one event before it is moved to outbox_dead_letters
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "5"))
+# how often the relay deletes events every consumer has moved past
+OUTBOX_PRUNE_INTERVAL = float(os.getenv("OUTBOX_PRUNE_INTERVAL", "300"))
+
+
+def booking_snapshot(booking):
+    return {
+        "booking_id": booking.booking_id,
+        "user_id": booking.user_id,
+        "area_id": booking.area_id,
+        "service_id": booking.service_id,
+        "package_id": booking.package_id,
+        "professional_id": booking.professional_id,
+        "status": booking.status,
+        "total_price": float(booking.total_price) if booking.total_price is not None else None,
+        "scheduled_at": booking.scheduled_at.isoformat() if booking.scheduled_at else None,
+    }
+
+
+def record_booking_event(db: Session, booking, event_type: str, previous: dict | None = None):
+    """
+    Add an outbox row to the current transaction. Nothing is sent until
+    the caller commits; a rollback discards the event with the change.
+    `previous` carries the fields that changed, as they were before.
+    """
+    payload = booking_snapshot(booking)
+    if previous:
+        payload["previous"] = previous
+
+    db.add(OutboxEvent(
+        aggregate_id=booking.booking_id,
+        event_type=event_type,
+        payload=json.dumps(payload)
+    ))
+    db.info.setdefault("booking_events", []).append({"event_type": event_type, **payload})
+
+
+def record_booking_batch(db: Session, changes, event_type: str):
+    """
+    One outbox row for a set-based change. `changes` is a list of
+    (booking, previous) pairs; the row's payload lists every booking so
+    consumers can fold the whole batch in at once. In-process listeners
+    still see one event per booking.
+    """
+    items = []
+    for booking, previous in changes:
+        payload = booking_snapshot(booking)
+        if previous:
+            payload["previous"] = previous
+        items.append(payload)
+    if not items:
+        return
+
+    # batch events are not about a single booking
+    db.add(OutboxEvent(
+        aggregate_id=0,
+        event_type=f"{event_type}.batch",
+        payload=json.dumps({"bookings": items})
+    ))
+    db.info.setdefault("booking_events", []).extend(
+        {"event_type": event_type, **payload} for payload in items
+    )
+
+
+def expand_batch(evt: dict) -> list[dict]:
+    """
+    Relay-side view of an event as a list of per-booking events.
+    """
+    if not evt["event_type"].endswith(".batch"):
+        return [evt]
+    event_type = evt["event_type"][:-len(".batch")]
+    return [{**evt, **item, "event_type": event_type} for item in evt.get("bookings", [])]
+
+
+# -------- IN-PROCESS COMMIT LISTENERS --------
+# Low-latency, best-effort fan-out inside this worker. Durable consumers
+# should subscribe to the relay instead.
+_commit_listeners = []
+
+
+def add_commit_listener(fn):
+    _commit_listeners.append(fn)
+    return fn
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _after_commit(session):
+    events = session.info.pop("booking_events", None)
+    if not events:
+        return
+    for listener in _commit_listeners:
+        try:
+            listener(events)
+        except Exception as e:
+            print(f"Booking event listener {listener.__name__} failed: {e!r}")
+
+
+@event.listens_for(SessionLocal, "after_rollback")
+def _after_rollback(session):
+    session.info.pop("booking_events", None)
+
+
+# -------- RELAY --------
+class OutboxRelay:
+    """
+    Drains `outbox_events` and hands each event to its subscribers. The
+    consumer's offset is advanced in the same transaction as the
+    subscribers' own writes, so every event is delivered once its
+    transaction commits, at least once. Handlers receive
+    `(event: dict, db: Session)`.
+
+    event_ids are handed out before commit, so a transaction can commit
+    event 12 after event 13 has been relayed. On Postgres the relay only
+    reads events from transactions older than every transaction still
+    running (the snapshot's xmin), in (tx_id, event_id) order: those are
+    final, and nothing can appear behind the offset. SQLite serializes
+    writers, so event_id order there is commit order.
+
+    An event whose handlers keep failing is retried OUTBOX_MAX_ATTEMPTS
+    times, then copied to `outbox_dead_letters` and skipped.
+    """
+
+    def __init__(self, consumer: str = "default", batch_size: int = OUTBOX_BATCH_SIZE,
+                 interval: float = OUTBOX_POLL_INTERVAL):
+        self.consumer = consumer
+        self.batch_size = batch_size
+        self.interval = interval
+        self._handlers = {}
+        self._attempts = {}      # event_id -> failed deliveries so far
+        self._thread = None
+        self._stopping = threading.Event()
+
+    def subscribe(self, event_type: str, handler):
+        """
+        `event_type` may be "*" to receive every event.
+        """
+        self._handlers.setdefault(event_type, []).append(handler)
+        return handler
+
+    def drain_once(self, db: Session) -> int:
+        offset = (
+            db.query(OutboxOffset)
+            .filter(OutboxOffset.consumer == self.consumer)
+            .with_for_update()
+            .first()
+        )
+        if not offset:
+            offset = OutboxOffset(consumer=self.consumer, last_tx_id=0, last_event_id=0)
+            db.add(offset)
+            db.flush()
+
+        rows = self._pending(db, offset).limit(self.batch_size).all()
+        if not rows:
+            db.rollback()
+            return 0
+
+        delivered = 0
+        for row in rows:
+            try:
+                # a failing event only undoes its own handlers' writes
+                with db.begin_nested():
+                    self._deliver(row, db)
+            except Exception as e:
+                if not self._give_up(db, row, e):
+                    # events before it are committed; it is retried next tick
+                    break
+            self._attempts.pop(row.event_id, None)
+            offset.last_tx_id = row.tx_id or 0
+            offset.last_event_id = row.event_id
+            delivered += 1
+
+        if not delivered:
+            db.rollback()
+            return 0
+        db.commit()
+        return delivered
+
+    def _deliver(self, row, db: Session):
+        evt = {
+            "event_id": row.event_id,
+            "event_type": row.event_type,
+            "created_at": row.created_at,
+            **json.loads(row.payload)
+        }
+        for handler in self._handlers.get(row.event_type, []) + self._handlers.get("*", []):
+            handler(evt, db)
+
+    def _give_up(self, db: Session, row, error: Exception) -> bool:
+        """
+        Count a failed delivery. After OUTBOX_MAX_ATTEMPTS the event is
+        dead-lettered and skipped, so one bad event cannot stall the relay.
+        """
+        attempts = self._attempts[row.event_id] = self._attempts.get(row.event_id, 0) + 1
+        print(f"Outbox relay {self.consumer}: event {row.event_id} ({row.event_type}) failed, "
+              f"attempt {attempts}/{OUTBOX_MAX_ATTEMPTS}: {error!r}")
+        if attempts < OUTBOX_MAX_ATTEMPTS:
+            return False
+        db.add(OutboxDeadLetter(
+            consumer=self.consumer, event_id=row.event_id, event_type=row.event_type,
+            payload=row.payload, error=repr(error), attempts=attempts
+        ))
+        print(f"Outbox relay {self.consumer}: event {row.event_id} dead-lettered")
+        return True
+
+    def _pending(self, db: Session, offset):
+        query = db.query(OutboxEvent)
+        if db.get_bind().dialect.name != "postgresql":
+            return query.filter(OutboxEvent.event_id > offset.last_event_id).order_by(OutboxEvent.event_id)
+
+        # every transaction below this id has committed or rolled back
+        horizon = db.execute(text("SELECT pg_snapshot_xmin(pg_current_snapshot())::text::bigint")).scalar()
+        return (
+            query.filter(
+                OutboxEvent.tx_id < horizon,
+                tuple_(OutboxEvent.tx_id, OutboxEvent.event_id) > tuple_(offset.last_tx_id, offset.last_event_id)
+            )
+            .order_by(OutboxEvent.tx_id, OutboxEvent.event_id)
+        )
+
+    def skip_to_end(self, db: Session, offset):
+        """
+        Move `offset` past every event written so far. Only safe with
+        booking writes quiesced.
+        """
+        last = (
+            db.query(OutboxEvent.tx_id, OutboxEvent.event_id)
+            .order_by(func.coalesce(OutboxEvent.tx_id, 0).desc(), OutboxEvent.event_id.desc())
+            .first()
+        )
+        if last:
+            offset.last_tx_id, offset.last_event_id = last.tx_id or 0, last.event_id
+
+    def prune(self, db: Session) -> int:
+        """
+        Delete events at or below the lowest consumer offset. A consumer
+        added later starts from whatever is left.
+        """
+        offsets = db.query(OutboxOffset.last_tx_id, OutboxOffset.last_event_id).all()
+        if not offsets:
+            return 0
+        low_tx, low_event = min(offsets)
+        query = db.query(OutboxEvent)
+        if db.get_bind().dialect.name == "postgresql":
+            query = query.filter(tuple_(OutboxEvent.tx_id, OutboxEvent.event_id) <= tuple_(low_tx, low_event))
+        else:
+            query = query.filter(OutboxEvent.event_id <= low_event)
+        deleted = query.delete(synchronize_session=False)
+        db.commit()
+        return deleted
+
+    def drain(self) -> int:
+        """
+        Drain until caught up. Returns the number of events consumed,
+        dead-lettered ones included.
+        """
+        total = 0
+        db = SessionLocal()
+        try:
+            while True:
+                n = self.drain_once(db)
+                total += n
+                if n < self.batch_size:
+                    return total
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def start(self):
+        if self._thread or not self._handlers:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name=f"outbox-{self.consumer}", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        if not self._thread:
+            return
+        self._stopping.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        next_prune = time.monotonic() + OUTBOX_PRUNE_INTERVAL
+        while not self._stopping.is_set():
+            try:
+                self.drain()
+            except Exception as e:
+                # offset was not advanced; the batch is retried next tick
+                print(f"Outbox relay {self.consumer} failed: {e!r}")
+            if time.monotonic() >= next_prune:
+                next_prune = time.monotonic() + OUTBOX_PRUNE_INTERVAL
+                db = SessionLocal()
+                try:
+                    pruned = self.prune(db)
+                    if pruned:
+                        print(f"Outbox relay {self.consumer}: pruned {pruned} delivered event(s)")
+                except Exception as e:
+                    db.rollback()
+                    print(f"Outbox prune failed: {e!r}")
+                finally:
+                    db.close()
+            self._stopping.wait(self.interval)
+
+
+outbox_relay = OutboxRelay()
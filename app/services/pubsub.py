@@ -0,0 +1,86 @@
+import asyncio
+import os
+import threading
+
+from app.services.outbox import add_commit_listener
+
+
+SUBSCRIBER_BUFFER_SIZE = int(os.getenv("SUBSCRIBER_BUFFER_SIZE", "100"))
+
+
+class Subscription:
+    """
+    One connection's view of a topic. Messages land in a bounded asyncio
+    queue owned by the connection's event loop; when the client falls
+    behind the oldest message is dropped and `dropped` is bumped so the
+    connection can tell the client to resync.
+    """
+
+    def __init__(self, topic: str, loop, maxsize: int):
+        self.topic = topic
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+        self.dropped = 0
+
+    def _offer(self, message):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class Broker:
+    """
+    In-process topic pub/sub. `publish` is safe to call from any thread
+    (the sync request handlers run in a threadpool).
+    """
+
+    def __init__(self):
+        self._subs = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic: str, maxsize: int = SUBSCRIBER_BUFFER_SIZE) -> Subscription:
+        sub = Subscription(topic, asyncio.get_running_loop(), maxsize)
+        with self._lock:
+            self._subs.setdefault(topic, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription):
+        with self._lock:
+            subs = self._subs.get(sub.topic)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subs[sub.topic]
+
+    def publish(self, topic: str, message):
+        with self._lock:
+            subs = list(self._subs.get(topic, ()))
+        for sub in subs:
+            try:
+                sub.loop.call_soon_threadsafe(sub._offer, message)
+            except RuntimeError:
+                # loop already closed; the connection is gone
+                self.unsubscribe(sub)
+
+    def subscriber_count(self, topic: str) -> int:
+        return len(self._subs.get(topic, ()))
+
+
+broker = Broker()
+
+
+def professional_topic(professional_id: int) -> str:
+    return f"professional:{professional_id}"
+
+
+@add_commit_listener
+def publish_booking_events(events):
+    for e in events:
+        previous = e.get("previous") or {}
+        targets = {e.get("professional_id"), previous.get("professional_id")}
+        for professional_id in targets - {None}:
+            broker.publish(professional_topic(professional_id), e)
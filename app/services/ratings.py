@@ -0,0 +1,317 @@
+"""
+Reviews, per-professional rating aggregates and best-rated professionals
+per market (area + service).
+
+    python -m app.services.ratings --check      # report drift against raw reviews
+    python -m app.services.ratings --backfill   # rebuild aggregates from raw reviews
+
+A review adds one to the professional's count and its rating to the sum
+with a single upsert, which also recomputes the smoothed score
+
+    score = (RATING_PRIOR_WEIGHT * RATING_PRIOR_MEAN + sum) / (RATING_PRIOR_WEIGHT + count)
+
+so a professional with two five-star reviews does not outrank one with
+two hundred 4.8s. The score is copied to Professional.rating, which
+/professionals/search already sorts on.
+"""
+import argparse
+import heapq
+import os
+import sys
+import threading
+import time
+
+from fastapi import HTTPException
+from sqlalchemy import func, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.core.invalidation import cache_bus
+from app.models.booking import Booking
+from app.models.professionals import Professional
+from app.models.review import ProfessionalRating, Review
+
+
+RATING_PRIOR_MEAN = float(os.getenv("RATING_PRIOR_MEAN", "4.0"))
+RATING_PRIOR_WEIGHT = float(os.getenv("RATING_PRIOR_WEIGHT", "5"))
+RATING_TOP_K = int(os.getenv("RATING_TOP_K", "20"))
+# safety net for missed cache bus messages
+RATING_TOP_K_REFRESH_SECONDS = float(os.getenv("RATING_TOP_K_REFRESH_SECONDS", "60"))
+
+RATING_MIN, RATING_MAX = 1, 5
+
+
+def smoothed_score(count: int, total: int) -> float:
+    return (RATING_PRIOR_WEIGHT * RATING_PRIOR_MEAN + total) / (RATING_PRIOR_WEIGHT + count)
+
+
+def _insert(db: Session):
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+# -------- TOP-K PER MARKET --------
+class MarketTopK:
+    """
+    A min-heap of the best `k` (score, professional_id) per (area_id,
+    service_id), loaded from the market rating index on first read. A
+    review that lifts a professional into the top k costs O(log k), one
+    that raises a listed score O(k). One that lowers a listed score drops
+    the market instead, since whoever is now k-th is not in the heap.
+    """
+
+    def __init__(self, k: int = RATING_TOP_K, ttl: float = RATING_TOP_K_REFRESH_SECONDS):
+        self.k = k
+        self.ttl = ttl
+        self._markets = {}       # (area_id, service_id) -> (loaded_at, heap)
+        self._lock = threading.Lock()
+
+    def _load(self, db: Session, market) -> list:
+        area_id, service_id = market
+        rows = (
+            db.query(Professional.rating, Professional.professional_id)
+            .filter(
+                Professional.area_id == area_id,
+                Professional.service_id == service_id,
+                Professional.is_active == True,
+                Professional.rating.isnot(None)
+            )
+            .order_by(Professional.rating.desc())
+            .limit(self.k)
+            .all()
+        )
+        heap = [(rating, professional_id) for rating, professional_id in rows]
+        heapq.heapify(heap)
+        return heap
+
+    def top(self, db: Session, area_id: int, service_id: int, limit: int) -> list[tuple[float, int]]:
+        market = (area_id, service_id)
+        with self._lock:
+            entry = self._markets.get(market)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            loaded_at = time.monotonic()
+            heap = self._load(db, market)
+            with self._lock:
+                self._markets[market] = entry = (loaded_at, heap)
+        with self._lock:
+            return heapq.nlargest(min(limit, self.k), entry[1])
+
+    def offer(self, area_id: int, service_id: int, professional_id: int, score: float):
+        market = (area_id, service_id)
+        with self._lock:
+            entry = self._markets.get(market)
+            if entry is None:
+                return
+            heap = entry[1]
+            for i, (old, pid) in enumerate(heap):
+                if pid == professional_id:
+                    if score < old:
+                        del self._markets[market]
+                        return
+                    heap[i] = (score, pid)
+                    heapq.heapify(heap)
+                    return
+            if len(heap) < self.k:
+                heapq.heappush(heap, (score, professional_id))
+            elif (score, professional_id) > heap[0]:
+                heapq.heapreplace(heap, (score, professional_id))
+
+    def invalidate(self, area_id: int | None = None, service_id: int | None = None):
+        with self._lock:
+            if area_id is None:
+                self._markets.clear()
+            else:
+                self._markets.pop((area_id, service_id), None)
+
+
+top_professionals = MarketTopK()
+
+
+def _drop_market(key: str | None):
+    if key is None:
+        return top_professionals.invalidate()
+    area_id, _, service_id = key.partition(":")
+    top_professionals.invalidate(int(area_id), int(service_id))
+
+
+cache_bus.subscribe("professionals", _drop_market)
+
+
+# -------- REVIEWS --------
+def submit_review(data, db: Session) -> Review:
+    if not RATING_MIN <= data.rating <= RATING_MAX:
+        raise HTTPException(400, f"rating must be between {RATING_MIN} and {RATING_MAX}")
+
+    booking = db.get(Booking, data.booking_id)
+    if not booking:
+        raise HTTPException(404, "Booking not found")
+    if booking.status != "completed":
+        raise HTTPException(400, "Only completed bookings can be reviewed")
+    if booking.professional_id is None:
+        raise HTTPException(400, "This booking has no professional to review")
+
+    review = Review(
+        booking_id=booking.booking_id,
+        user_id=booking.user_id,
+        professional_id=booking.professional_id,
+        rating=data.rating,
+        comment=data.comment
+    )
+    db.add(review)
+    try:
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(409, "This booking has already been reviewed")
+
+    score = add_to_aggregate(db, booking.professional_id, data.rating)
+    market = db.execute(
+        update(Professional)
+        .where(Professional.professional_id == booking.professional_id)
+        .values(rating=score)
+        .returning(Professional.area_id, Professional.service_id, Professional.is_active)
+    ).first()
+    db.commit()
+    db.refresh(review)
+
+    if market and market.is_active:
+        top_professionals.offer(market.area_id, market.service_id, booking.professional_id, score)
+        cache_bus.publish("professionals", f"{market.area_id}:{market.service_id}")
+    return review
+
+
+def add_to_aggregate(db: Session, professional_id: int, rating: int) -> float:
+    """
+    Fold one rating into the professional's aggregate with a single
+    atomic upsert; concurrent reviews never lose an update. Returns the
+    new score.
+    """
+    insert = _insert(db)
+    agg = ProfessionalRating.__table__.c
+    stmt = insert(ProfessionalRating).values(
+        professional_id=professional_id,
+        review_count=1,
+        rating_sum=rating,
+        score=smoothed_score(1, rating)
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[agg.professional_id],
+        set_={
+            "review_count": agg.review_count + 1,
+            "rating_sum": agg.rating_sum + rating,
+            # right-hand sides see the row as it was before this update
+            "score": (RATING_PRIOR_WEIGHT * RATING_PRIOR_MEAN + agg.rating_sum + rating)
+                     / (RATING_PRIOR_WEIGHT + agg.review_count + 1),
+        }
+    ).returning(agg.score)
+    return db.execute(stmt).scalar_one()
+
+
+def rating_summary(db: Session, professional_id: int) -> dict:
+    agg = db.get(ProfessionalRating, professional_id)
+    if not agg:
+        if not db.get(Professional, professional_id):
+            raise HTTPException(404, "Professional not found")
+        return {"professional_id": professional_id, "review_count": 0,
+                "average": 0.0, "score": smoothed_score(0, 0)}
+    return {
+        "professional_id": professional_id,
+        "review_count": agg.review_count,
+        "average": agg.rating_sum / agg.review_count if agg.review_count else 0.0,
+        "score": agg.score,
+    }
+
+
+def best_in_market(db: Session, area_id: int, service_id: int, limit: int = 10) -> list:
+    top = top_professionals.top(db, area_id, service_id, limit)
+    if not top:
+        return []
+    ids = [pid for _, pid in top]
+    by_id = {
+        p.professional_id: p
+        for p in db.query(Professional).filter(Professional.professional_id.in_(ids))
+    }
+    return [by_id[pid] for pid in ids if pid in by_id]
+
+
+# -------- BACKFILL --------
+def recompute(db: Session) -> dict:
+    """
+    professional_id -> (count, sum) from raw reviews.
+    """
+    rows = (
+        db.query(Review.professional_id, func.count(Review.review_id), func.sum(Review.rating))
+        .group_by(Review.professional_id)
+        .all()
+    )
+    return {pid: (count, int(total)) for pid, count, total in rows}
+
+
+def check_ratings(db: Session) -> list[dict]:
+    expected = recompute(db)
+    actual = {
+        r.professional_id: (r.review_count, r.rating_sum, r.score)
+        for r in db.query(ProfessionalRating)
+    }
+    drift = []
+    for pid in sorted(expected.keys() | actual.keys()):
+        count, total = expected.get(pid, (0, 0))
+        have = actual.get(pid, (0, 0, smoothed_score(0, 0)))
+        if have[:2] != (count, total) or abs(have[2] - smoothed_score(count, total)) > 1e-9:
+            drift.append({
+                "professional_id": pid,
+                "stored": {"count": have[0], "sum": have[1], "score": have[2]},
+                "expected": {"count": count, "sum": total, "score": smoothed_score(count, total)},
+            })
+    return drift
+
+
+def backfill_ratings(db: Session) -> int:
+    """
+    Replace every aggregate with a recompute from raw reviews and copy the
+    scores to Professional.rating. Run with review submission quiesced.
+    """
+    totals = recompute(db)
+    db.query(ProfessionalRating).delete(synchronize_session=False)
+    db.bulk_insert_mappings(ProfessionalRating, [
+        {"professional_id": pid, "review_count": count, "rating_sum": total,
+         "score": smoothed_score(count, total)}
+        for pid, (count, total) in totals.items()
+    ])
+    db.bulk_update_mappings(Professional, [
+        {"professional_id": pid, "rating": smoothed_score(count, total)}
+        for pid, (count, total) in totals.items()
+    ])
+    db.commit()
+    top_professionals.invalidate()
+    cache_bus.publish("professionals")
+    return len(totals)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--check", action="store_true")
+    group.add_argument("--backfill", action="store_true")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.backfill:
+            print(f"{backfill_ratings(db)} professional rating(s) written")
+            return
+        drift = check_ratings(db)
+        for row in drift:
+            print(row)
+        print(f"{len(drift)} professional(s) drifted")
+        sys.exit(1 if drift else 0)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Earnings and demand rollups, maintained from booking events.
+
+    python -m app.services.rollups --check     # report drift against raw bookings
+    python -m app.services.rollups --rebuild   # backfill from raw bookings
+
+Every booking contributes to one bucket per dimension and period: it
+counts as a booking, and as completed (with its price as earnings) or
+cancelled depending on its status. An event moves a booking's
+contribution from its previous state to its new one, so completions,
+cancellations, repricing, rescheduling and reassignment all reduce to a
+handful of `UPDATE ... SET x = x + delta` statements.
+"""
+import argparse
+import sys
+from itertools import chain
+from datetime import date, datetime, timedelta, timezone
+from decimal import Decimal
+
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.models.archive import ArchivedBooking
+from app.models.booking import Booking
+from app.models.outbox import OutboxOffset
+from app.models.rollup import EarningsRollup
+from app.services.outbox import booking_snapshot, expand_batch, outbox_relay
+
+
+DIMENSIONS = {
+    "professional": "professional_id",
+    "area": "area_id",
+    "service": "service_id",
+}
+PERIODS = ("day", "week", "month")
+MEASURES = ("bookings", "completed", "cancelled", "earnings")
+
+
+def period_start(value: date, period: str) -> date:
+    if period == "week":
+        return value - timedelta(days=value.weekday())
+    if period == "month":
+        return value.replace(day=1)
+    return value
+
+
+def _utc_date(value) -> date:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.date()
+
+
+def contribution(state: dict | None) -> dict:
+    """
+    Bucket key -> measures for one booking in the given state.
+    """
+    if not state or not state.get("scheduled_at"):
+        return {}
+
+    status = state.get("status")
+    completed = status == "completed"
+    price = state.get("total_price")
+    measures = {
+        "bookings": 1,
+        "completed": int(completed),
+        "cancelled": int(status == "cancelled"),
+        "earnings": Decimal(str(price)) if completed and price is not None else Decimal(0),
+    }
+
+    day = _utc_date(state["scheduled_at"])
+    out = {}
+    for dimension, attr in DIMENSIONS.items():
+        dimension_id = state.get(attr)
+        if dimension_id is None:
+            continue
+        for period in PERIODS:
+            out[(dimension, dimension_id, period, period_start(day, period))] = measures
+    return out
+
+
+def event_deltas(evt: dict) -> dict:
+    """
+    Net change to each bucket for one booking event.
+    """
+    after = None if evt["event_type"] == "booking.deleted" else evt
+    before = None
+    if evt["event_type"] != "booking.created":
+        before = {**evt, **(evt.get("previous") or {})}
+
+    deltas = {}
+    for sign, state in ((-1, before), (1, after)):
+        for key, measures in contribution(state).items():
+            bucket = deltas.setdefault(key, dict.fromkeys(MEASURES, 0))
+            for m in MEASURES:
+                bucket[m] += sign * measures[m]
+    return {k: v for k, v in deltas.items() if any(v.values())}
+
+
+def apply_deltas(db: Session, deltas: dict):
+    for (dimension, dimension_id, period, start), d in deltas.items():
+        updated = (
+            db.query(EarningsRollup)
+            .filter(
+                EarningsRollup.dimension == dimension,
+                EarningsRollup.dimension_id == dimension_id,
+                EarningsRollup.period == period,
+                EarningsRollup.period_start == start
+            )
+            .update({
+                getattr(EarningsRollup, m): getattr(EarningsRollup, m) + d[m]
+                for m in MEASURES if d[m]
+            }, synchronize_session=False)
+        )
+        if not updated:
+            db.add(EarningsRollup(
+                dimension=dimension, dimension_id=dimension_id,
+                period=period, period_start=start, **d
+            ))
+            db.flush()
+
+
+def apply_booking_event(evt: dict, db: Session):
+    # runs in the relay's transaction, so the offset and the rollups move together
+    if not evt["event_type"].startswith("booking."):
+        return
+
+    # a batch touches each bucket once, however many bookings it carries
+    deltas = {}
+    for item in expand_batch(evt):
+        for key, d in event_deltas(item).items():
+            bucket = deltas.setdefault(key, dict.fromkeys(MEASURES, 0))
+            for m in MEASURES:
+                bucket[m] += d[m]
+    apply_deltas(db, {k: v for k, v in deltas.items() if any(v.values())})
+
+
+outbox_relay.subscribe("*", apply_booking_event)
+
+
+# -------- RECOMPUTE --------
+def recompute(db: Session) -> dict:
+    """
+    Every bucket rebuilt from raw bookings, live and archived.
+    """
+    live = (booking_snapshot(b) for b in db.query(Booking).yield_per(1000))
+    # archiving writes no events, so archived bookings keep counting
+    archived = (
+        {
+            "status": a.status, "total_price": a.total_price, "scheduled_at": a.scheduled_at,
+            "professional_id": a.professional_id, "area_id": a.area_id, "service_id": a.service_id,
+        }
+        for a in db.query(ArchivedBooking).yield_per(1000)
+    )
+    totals = {}
+    for state in chain(live, archived):
+        for key, measures in contribution(state).items():
+            bucket = totals.setdefault(key, dict.fromkeys(MEASURES, 0))
+            for m in MEASURES:
+                bucket[m] += measures[m]
+    return totals
+
+
+def stored(db: Session) -> dict:
+    return {
+        (r.dimension, r.dimension_id, r.period, r.period_start): {m: getattr(r, m) for m in MEASURES}
+        for r in db.query(EarningsRollup).yield_per(1000)
+    }
+
+
+def check_rollups(db: Session) -> list[dict]:
+    """
+    Buckets whose stored measures differ from a recompute. Buckets touched
+    by events the relay has not delivered yet show up until it catches up.
+    """
+    expected = recompute(db)
+    actual = stored(db)
+    drift = []
+    for key in sorted(expected.keys() | actual.keys(), key=str):
+        want = expected.get(key, dict.fromkeys(MEASURES, 0))
+        have = actual.get(key, dict.fromkeys(MEASURES, 0))
+        diff = {m: (have[m], want[m]) for m in MEASURES if Decimal(str(have[m])) != Decimal(str(want[m]))}
+        if diff:
+            dimension, dimension_id, period, start = key
+            drift.append({
+                "dimension": dimension, "dimension_id": dimension_id,
+                "period": period, "period_start": start.isoformat(),
+                "stored_vs_expected": diff
+            })
+    return drift
+
+
+def rebuild_rollups(db: Session) -> int:
+    """
+    Replace every bucket with a recompute and move the relay past the
+    events already reflected in it. Run with booking writes quiesced:
+    an event whose transaction commits during the rebuild is skipped.
+    """
+    offset = (
+        db.query(OutboxOffset)
+        .filter(OutboxOffset.consumer == outbox_relay.consumer)
+        .with_for_update()
+        .first()
+    )
+    if not offset:
+        offset = OutboxOffset(consumer=outbox_relay.consumer, last_tx_id=0, last_event_id=0)
+        db.add(offset)
+
+    outbox_relay.skip_to_end(db, offset)
+    db.query(EarningsRollup).delete(synchronize_session=False)
+    totals = recompute(db)
+    db.bulk_insert_mappings(EarningsRollup, [
+        {"dimension": d, "dimension_id": i, "period": p, "period_start": s, **measures}
+        for (d, i, p, s), measures in totals.items()
+    ])
+    db.commit()
+    return len(totals)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--check", action="store_true")
+    group.add_argument("--rebuild", action="store_true")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        if args.rebuild:
+            print(f"{rebuild_rollups(db)} rollup bucket(s) written")
+            return
+        drift = check_rollups(db)
+        for row in drift:
+            print(row)
+        print(f"{len(drift)} bucket(s) drifted")
+        sys.exit(1 if drift else 0)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
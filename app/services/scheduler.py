@@ -0,0 +1,476 @@
+"""
+Booking reminders and, opt-in, expiry of bookings that were never taken up.
+
+Timers live in an in-process heap that only ever holds pending bookings
+scheduled inside a sliding horizon (SCHEDULER_HORIZON_HOURS). Every
+SCHEDULER_LOAD_INTERVAL the horizon is extended with one range query on
+ix_bookings_status_scheduled, so the bookings table is never scanned.
+Creates, reschedules and cancellations update the heap as they commit:
+directly in this worker, through the cache bus from other workers.
+
+  - reminder: BOOKING_REMINDER_LEAD_MINUTES before scheduled_at, sent
+    with send_notification;
+  - expiry (only with BOOKING_EXPIRY_ENABLED=1): a booking still pending
+    BOOKING_EXPIRE_AFTER_MINUTES after scheduled_at is cancelled through
+    update_booking_status.
+
+Expiry is off by default. Bookings have no accepted or assigned status,
+so "pending" also covers a job a professional is doing right now; expiry
+would cancel a long job mid-way, notify the customer, and leave the
+professional's completion refused with a 409 (nothing moves from
+cancelled to completed). Turn it on only where a booking that is still
+pending after its slot really was never taken up.
+
+Each timer re-reads its booking when it fires and does nothing if the
+booking has moved on, so a stale timer is harmless.
+
+Only one worker runs timers: whichever holds the lease in
+`scheduler_state`. A new leader (after a restart or failover) rebuilds
+the heap from the horizon query, sends reminders that came due since the
+stored watermark and sweeps overdue pending bookings in batches. The
+watermark is saved with each lease renewal, so a leader that dies can
+have its last minute of reminders sent again.
+
+The sweep only reaches back to the scheduler's first lease
+(`scheduler_state.started_at`). Bookings that were already overdue when
+it was first deployed stay pending and nobody is notified; cancel them
+deliberately if they should go. Enabling expiry on a scheduler that has
+been running for reminders sweeps back to that same first lease.
+"""
+import heapq
+import itertools
+import os
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.core.invalidation import cache_bus
+from app.models.booking import Booking
+from app.models.scheduler import SchedulerState
+from app.services.bookings import update_booking_status
+from app.services.notifications import send_notification
+from app.services.outbox import add_commit_listener
+
+
+SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "1") == "1"
+BOOKING_REMINDER_LEAD_MINUTES = float(os.getenv("BOOKING_REMINDER_LEAD_MINUTES", "120"))
+# cancels pending bookings past their slot; see the module docstring
+BOOKING_EXPIRY_ENABLED = os.getenv("BOOKING_EXPIRY_ENABLED", "0") == "1"
+BOOKING_EXPIRE_AFTER_MINUTES = float(os.getenv("BOOKING_EXPIRE_AFTER_MINUTES", "120"))
+SCHEDULER_HORIZON_HOURS = float(os.getenv("SCHEDULER_HORIZON_HOURS", "24"))
+SCHEDULER_LOAD_INTERVAL = float(os.getenv("SCHEDULER_LOAD_INTERVAL", "60"))
+SCHEDULER_LEASE_SECONDS = float(os.getenv("SCHEDULER_LEASE_SECONDS", "180"))
+# reload the whole horizon this often, in case a bus message was lost
+SCHEDULER_RESYNC_SECONDS = float(os.getenv("SCHEDULER_RESYNC_SECONDS", "900"))
+SCHEDULER_BATCH_SIZE = int(os.getenv("SCHEDULER_BATCH_SIZE", "1000"))
+
+SCHEDULER_NAME = "bookings"
+# keeps bus payloads well under the NOTIFY size limit
+_BUS_IDS_PER_MESSAGE = 500
+
+
+def _utc(value: datetime | None) -> datetime | None:
+    if value is None:
+        return None
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _parse(value) -> datetime | None:
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return _utc(value)
+
+
+class TimerHeap:
+    """
+    Min-heap of (fire_at, seq, key, payload). Rescheduling or cancelling a
+    key marks its old entry dead instead of searching the heap for it;
+    dead entries are dropped as they reach the top.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._live = {}          # key -> entry
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    def __len__(self):
+        return len(self._live)
+
+    def schedule(self, key, fire_at: float, payload=None):
+        with self._cond:
+            self._kill(key)
+            entry = [fire_at, next(self._seq), key, payload, True]
+            self._live[key] = entry
+            heapq.heappush(self._heap, entry)
+            if self._heap[0] is entry:
+                self._cond.notify()
+
+    def cancel(self, key):
+        with self._cond:
+            self._kill(key)
+
+    def _kill(self, key):
+        entry = self._live.pop(key, None)
+        if entry is not None:
+            entry[-1] = False
+
+    def clear(self):
+        with self._cond:
+            self._heap.clear()
+            self._live.clear()
+
+    def pop_due(self, now: float, limit: int) -> list:
+        due = []
+        with self._cond:
+            while self._heap and len(due) < limit:
+                fire_at, _, key, payload, alive = self._heap[0]
+                if alive and fire_at > now:
+                    break
+                heapq.heappop(self._heap)
+                if alive:
+                    del self._live[key]
+                    due.append((key, payload, fire_at))
+        return due
+
+    def wait(self, limit: float):
+        """
+        Sleep until the earliest timer is due, `limit` passes or `wake`.
+        """
+        with self._cond:
+            while self._heap and not self._heap[0][-1]:
+                heapq.heappop(self._heap)
+            timeout = min(limit, self._heap[0][0] - time.time()) if self._heap else limit
+            if timeout > 0:
+                self._cond.wait(timeout)
+
+    def wake(self):
+        with self._cond:
+            self._cond.notify_all()
+
+
+class BookingScheduler:
+    def __init__(self, enabled: bool = SCHEDULER_ENABLED, expire: bool = BOOKING_EXPIRY_ENABLED):
+        self.enabled = enabled
+        self.expire = expire
+        self.owner = uuid.uuid4().hex[:12]
+        self.lead = timedelta(minutes=BOOKING_REMINDER_LEAD_MINUTES)
+        self.expire_after = timedelta(minutes=BOOKING_EXPIRE_AFTER_MINUTES)
+        self.horizon = timedelta(hours=SCHEDULER_HORIZON_HOURS)
+
+        self.timers = TimerHeap()
+        self.is_leader = False
+        self.loaded_until = None      # pending bookings up to here are in the heap
+        self.watermark = None
+        self.started_at = None
+        self._fired_up_to = None      # latest reminder fired, not yet persisted
+        self._lock = threading.RLock()
+        self._next_maintenance = 0.0
+        self._next_resync = 0.0
+        self._thread = None
+        self._stopping = threading.Event()
+
+    # -------- TRACKING --------
+    def track(self, booking_id: int, status: str | None, scheduled_at: datetime | None, live: bool = True):
+        """
+        Bring one booking's timers in line with its current state. `live`
+        is False while loading, when a reminder that came due while no
+        leader was running (after the watermark) is sent straight away.
+        """
+        with self._lock:
+            self.timers.cancel(("reminder", booking_id))
+            self.timers.cancel(("expire", booking_id))
+            if not self.is_leader or status != "pending" or scheduled_at is None:
+                return
+            if self.loaded_until is None or scheduled_at > self.loaded_until:
+                return  # picked up when the horizon reaches it
+
+            now = datetime.now(timezone.utc)
+            remind_at = scheduled_at - self.lead
+            if scheduled_at > now:
+                if remind_at > now:
+                    self.timers.schedule(("reminder", booking_id), remind_at.timestamp(), scheduled_at)
+                elif not live and (self.watermark is None or remind_at > self.watermark):
+                    self.timers.schedule(("reminder", booking_id), now.timestamp(), scheduled_at)
+            if self.expire:
+                expire_at = scheduled_at + self.expire_after
+                self.timers.schedule(("expire", booking_id), expire_at.timestamp(), scheduled_at)
+
+    def refresh(self, db: Session, booking_ids: list[int]):
+        """
+        Re-read bookings another worker wrote and retrack them.
+        """
+        rows = {
+            r.booking_id: r for r in
+            db.query(Booking.booking_id, Booking.status, Booking.scheduled_at)
+            .filter(Booking.booking_id.in_(booking_ids))
+        }
+        for booking_id in booking_ids:
+            row = rows.get(booking_id)
+            if row is None:
+                self.track(booking_id, None, None)
+            else:
+                self.track(booking_id, row.status, _utc(row.scheduled_at))
+
+    def _load(self, db: Session, lower: datetime, upper: datetime) -> int:
+        """
+        Track every pending booking with lower < scheduled_at <= upper,
+        in keyset-paged batches.
+        """
+        loaded = 0
+        after = (lower, 0)
+        while True:
+            rows = (
+                db.query(Booking.booking_id, Booking.scheduled_at)
+                .filter(
+                    Booking.status == "pending",
+                    Booking.scheduled_at <= upper,
+                    or_(
+                        Booking.scheduled_at > after[0],
+                        and_(Booking.scheduled_at == after[0], Booking.booking_id > after[1])
+                    )
+                )
+                .order_by(Booking.scheduled_at, Booking.booking_id)
+                .limit(SCHEDULER_BATCH_SIZE)
+                .all()
+            )
+            for row in rows:
+                self.track(row.booking_id, "pending", _utc(row.scheduled_at), live=False)
+            loaded += len(rows)
+            if len(rows) < SCHEDULER_BATCH_SIZE:
+                return loaded
+            after = (rows[-1].scheduled_at, rows[-1].booking_id)
+
+    def _extend_horizon(self, db: Session, resync: bool = False):
+        now = datetime.now(timezone.utc)
+        upper = now + self.horizon
+        with self._lock:
+            if resync or self.loaded_until is None:
+                # without expiry only future bookings have timers
+                lower = now - self.expire_after if self.expire else now
+            else:
+                lower = self.loaded_until
+            # widen first, so a booking committed during the load is tracked
+            # by its own commit listener even if the query misses it
+            self.loaded_until = upper
+        self._load(db, lower, upper)
+
+    # -------- FIRING --------
+    def _remind(self, db: Session, booking_id: int, scheduled_at: datetime):
+        booking = db.get(Booking, booking_id)
+        if not booking or booking.status != "pending" or _utc(booking.scheduled_at) != scheduled_at:
+            return
+        send_notification(
+            booking.user_id,
+            f"Reminder: booking #{booking.booking_id} is scheduled for "
+            f"{scheduled_at:%Y-%m-%d %H:%M} UTC."
+        )
+
+    def _expire(self, db: Session, booking_id: int, scheduled_at: datetime | None = None):
+        booking = (
+            db.query(Booking)
+            .filter(Booking.booking_id == booking_id, Booking.status == "pending")
+            .with_for_update()
+            .first()
+        )
+        if not booking or (scheduled_at is not None and _utc(booking.scheduled_at) != scheduled_at):
+            db.rollback()
+            return
+        update_booking_status(booking_id, "cancelled", db)
+
+    def _fire_due(self, db: Session):
+        for (kind, booking_id), scheduled_at, _ in self.timers.pop_due(time.time(), SCHEDULER_BATCH_SIZE):
+            try:
+                if kind == "reminder":
+                    self._remind(db, booking_id, scheduled_at)
+                    # a caught-up reminder fires late; record when it was due
+                    due = scheduled_at - self.lead
+                    if self._fired_up_to is None or due > self._fired_up_to:
+                        self._fired_up_to = due
+                else:
+                    self._expire(db, booking_id, scheduled_at)
+            except Exception as e:
+                db.rollback()
+                print(f"Scheduler {kind} for booking {booking_id} failed: {e!r}")
+
+    def _expire_overdue(self, db: Session):
+        """
+        Pending bookings that expired since the scheduler first ran: the
+        backlog after an outage, or anything a timer missed. Usually an
+        empty index range.
+        """
+        cutoff = datetime.now(timezone.utc) - self.expire_after
+        # older ones predate the scheduler; see the module docstring
+        floor = self.started_at - self.expire_after
+        rows = (
+            db.query(Booking.booking_id)
+            .filter(
+                Booking.status == "pending",
+                Booking.scheduled_at > floor,
+                Booking.scheduled_at <= cutoff
+            )
+            .order_by(Booking.scheduled_at)
+            .limit(SCHEDULER_BATCH_SIZE)
+            .all()
+        )
+        for row in rows:
+            try:
+                self._expire(db, row.booking_id)
+            except Exception as e:
+                db.rollback()
+                print(f"Scheduler expiry for booking {row.booking_id} failed: {e!r}")
+
+    # -------- LEASE --------
+    def _acquire_lease(self, db: Session) -> bool:
+        now = datetime.now(timezone.utc)
+        if db.get(SchedulerState, SCHEDULER_NAME) is None:
+            try:
+                db.add(SchedulerState(name=SCHEDULER_NAME, started_at=now))
+                db.commit()
+            except IntegrityError:
+                db.rollback()
+
+        values = {SchedulerState.owner: self.owner, SchedulerState.lease_until: now + timedelta(seconds=SCHEDULER_LEASE_SECONDS)}
+        if self._fired_up_to is not None:
+            values[SchedulerState.watermark] = self._fired_up_to
+        updated = (
+            db.query(SchedulerState)
+            .filter(
+                SchedulerState.name == SCHEDULER_NAME,
+                or_(
+                    SchedulerState.owner == self.owner,
+                    SchedulerState.lease_until.is_(None),
+                    SchedulerState.lease_until < now
+                )
+            )
+            .update(values, synchronize_session=False)
+        )
+        db.commit()
+        if updated and self._fired_up_to is not None:
+            self.watermark, self._fired_up_to = self._fired_up_to, None
+        return bool(updated)
+
+    def _release_lease(self, db: Session):
+        values = {SchedulerState.owner: None, SchedulerState.lease_until: None}
+        if self._fired_up_to is not None:
+            values[SchedulerState.watermark] = self._fired_up_to
+        db.query(SchedulerState).filter(
+            SchedulerState.name == SCHEDULER_NAME,
+            SchedulerState.owner == self.owner
+        ).update(values, synchronize_session=False)
+        db.commit()
+
+    def maintain(self, db: Session):
+        leader = self._acquire_lease(db)
+        if leader and not self.is_leader:
+            state = db.get(SchedulerState, SCHEDULER_NAME)
+            if state.started_at is None:
+                # a row from before started_at existed
+                state.started_at = datetime.now(timezone.utc)
+                db.commit()
+            with self._lock:
+                self.started_at = _utc(state.started_at)
+                self.watermark = _utc(state.watermark)
+                self.timers.clear()
+                self.loaded_until = None
+                self.is_leader = True
+            print(f"Scheduler {self.owner} took the lease (watermark {self.watermark})")
+        elif not leader and self.is_leader:
+            with self._lock:
+                self.is_leader = False
+                self.timers.clear()
+                self.loaded_until = None
+            print(f"Scheduler {self.owner} lost the lease")
+        if not self.is_leader:
+            return
+
+        resync = time.monotonic() >= self._next_resync
+        if resync:
+            self._next_resync = time.monotonic() + SCHEDULER_RESYNC_SECONDS
+        if self.expire:
+            self._expire_overdue(db)
+        self._extend_horizon(db, resync)
+
+    # -------- THREAD --------
+    def start(self):
+        if self._thread or not self.enabled:
+            return
+        self._stopping.clear()
+        self._thread = threading.Thread(target=self._run, name="booking-scheduler", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        if not self._thread:
+            return
+        self._stopping.set()
+        self.timers.wake()
+        self._thread.join(timeout)
+        self._thread = None
+        if self.is_leader:
+            db = SessionLocal()
+            try:
+                # hand over straight away instead of after the lease runs out
+                self._release_lease(db)
+            finally:
+                db.close()
+            self.is_leader = False
+
+    def request_resync(self):
+        self._next_resync = self._next_maintenance = 0.0
+        self.timers.wake()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            db = SessionLocal()
+            try:
+                if time.monotonic() >= self._next_maintenance:
+                    self._next_maintenance = time.monotonic() + SCHEDULER_LOAD_INTERVAL
+                    self.maintain(db)
+                if self.is_leader:
+                    self._fire_due(db)
+            except Exception as e:
+                db.rollback()
+                print(f"Booking scheduler failed: {e!r}")
+            finally:
+                db.close()
+            if not self._stopping.is_set():
+                self.timers.wait(self._next_maintenance - time.monotonic())
+
+
+booking_scheduler = BookingScheduler()
+
+
+@add_commit_listener
+def track_booking_events(events):
+    ids = []
+    for e in events:
+        if e["event_type"] == "booking.deleted":
+            booking_scheduler.track(e["booking_id"], None, None)
+        else:
+            booking_scheduler.track(e["booking_id"], e.get("status"), _parse(e.get("scheduled_at")))
+        ids.append(e["booking_id"])
+    # the leader may be another worker
+    for i in range(0, len(ids), _BUS_IDS_PER_MESSAGE):
+        cache_bus.publish("bookings", ",".join(map(str, ids[i:i + _BUS_IDS_PER_MESSAGE])))
+
+
+def _on_bookings_changed(key: str | None):
+    if not booking_scheduler.is_leader:
+        return
+    if key is None:
+        # missed messages: reload the whole horizon
+        return booking_scheduler.request_resync()
+    db = SessionLocal()
+    try:
+        booking_scheduler.refresh(db, [int(i) for i in key.split(",")])
+    finally:
+        db.close()
+
+
+cache_bus.subscribe("bookings", _on_bookings_changed)
@@ -0,0 +1,329 @@
+"""
+Ranked, typeahead-friendly search over services and packages.
+
+The default backend is an in-memory inverted index: term -> {doc: weight}
+plus a sorted vocabulary, so the last (possibly partial) query word is
+expanded to every indexed term with that prefix by bisection. Documents
+are re-indexed one at a time as the catalog routers write them; other
+workers hear about the write on the cache bus and re-read that row. The
+first search builds the index; after that it is rebuilt in a background
+thread every SEARCH_REFRESH_SECONDS while the old one keeps serving.
+
+SEARCH_BACKEND=postgres queries tsvector/tsquery with ts_rank instead,
+which is always consistent across workers but costs a database round
+trip. The GIN indexes ix_services_search and ix_packages_search cover
+the exact tsvector expressions it matches against.
+"""
+import bisect
+import heapq
+import math
+import os
+import re
+import threading
+import time
+from operator import itemgetter
+
+from sqlalchemy import func, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from app.core.database import SessionLocal
+from app.core.invalidation import cache_bus
+from app.models.package import Package, package_search_vector
+from app.models.service import Service, service_search_vector
+
+
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "memory")
+SEARCH_REFRESH_SECONDS = float(os.getenv("SEARCH_REFRESH_SECONDS", "300"))
+SEARCH_MAX_PREFIX_TERMS = int(os.getenv("SEARCH_MAX_PREFIX_TERMS", "64"))
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+# field -> weight
+FIELDS = {
+    "service": {"name": 3.0, "category": 2.0, "description": 1.0},
+    "package": {"name": 3.0, "category": 2.0, "features": 1.0, "description": 1.0},
+}
+# a prefix match ranks below the same term typed out in full
+PREFIX_PENALTY = 0.7
+
+
+def tokenize(text: str | None) -> list[str]:
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+def document(kind: str, obj) -> dict:
+    if kind == "service":
+        return {
+            "type": "service", "id": obj.service_id, "name": obj.name,
+            "category": obj.category, "description": obj.description,
+            "price": float(obj.base_price) if obj.base_price is not None else None,
+        }
+    return {
+        "type": "package", "id": obj.package_id, "name": obj.name,
+        "category": obj.category, "description": obj.description,
+        "features": obj.features,
+        "price": float(obj.price) if obj.price is not None else None,
+    }
+
+
+class InvertedIndex:
+    def __init__(self):
+        self._postings = {}      # term -> {doc_key: weight}
+        self._doc_terms = {}     # doc_key -> set of terms
+        self._docs = {}          # doc_key -> result dict
+        self._vocab = []         # sorted terms
+        self._ranked = {}        # term -> [(weight, doc_key)] best first, built on demand
+        self._lock = threading.RLock()
+        self._built_at = None
+
+    # -------- WRITES --------
+    def upsert(self, kind: str, obj):
+        doc = document(kind, obj)
+        key = (kind, doc["id"])
+        weights = {}
+        for field, weight in FIELDS[kind].items():
+            for term in tokenize(doc.get(field)):
+                weights[term] = weights.get(term, 0.0) + weight
+
+        with self._lock:
+            self._remove(key)
+            self._docs[key] = {k: v for k, v in doc.items() if k not in ("description", "features")}
+            self._doc_terms[key] = set(weights)
+            for term, weight in weights.items():
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = {}
+                    bisect.insort(self._vocab, term)
+                # dampen repeated words so long descriptions don't dominate
+                postings[key] = 1.0 + math.log(weight)
+                self._ranked.pop(term, None)
+
+    def remove(self, kind: str, doc_id: int):
+        with self._lock:
+            self._remove((kind, doc_id))
+
+    def _remove(self, key):
+        for term in self._doc_terms.pop(key, ()):
+            postings = self._postings[term]
+            postings.pop(key, None)
+            self._ranked.pop(term, None)
+            if not postings:
+                del self._postings[term]
+                del self._vocab[bisect.bisect_left(self._vocab, term)]
+        self._docs.pop(key, None)
+
+    def rebuild(self, db: Session):
+        fresh = InvertedIndex()
+        for service in db.query(Service).yield_per(500):
+            fresh.upsert("service", service)
+        for package in db.query(Package).yield_per(500):
+            fresh.upsert("package", package)
+        with self._lock:
+            self._postings, self._doc_terms = fresh._postings, fresh._doc_terms
+            self._docs, self._vocab = fresh._docs, fresh._vocab
+            self._ranked = {}
+            self._built_at = time.monotonic()
+
+    def stale(self) -> bool:
+        return self._built_at is None or time.monotonic() - self._built_at > SEARCH_REFRESH_SECONDS
+
+    def expire(self):
+        self._built_at = None
+
+    # -------- QUERIES --------
+    def _prefix_terms(self, prefix: str):
+        start = bisect.bisect_left(self._vocab, prefix)
+        terms = []
+        for term in self._vocab[start:start + SEARCH_MAX_PREFIX_TERMS]:
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+        return terms
+
+    def _top(self, term: str, n: int):
+        ranked = self._ranked.get(term)
+        if ranked is None:
+            ranked = sorted(((w, k) for k, w in self._postings[term].items()), reverse=True)
+            self._ranked[term] = ranked
+        return ranked[:n]
+
+    def search(self, q: str, limit: int = 10, kind: str | None = None) -> list[dict]:
+        """
+        Every query word must match; the last one also matches as a prefix.
+        Score is the sum over words of idf * field-weighted term frequency,
+        taking the best of the terms a prefix expands to.
+        """
+        words = tokenize(q)
+        if not words:
+            return []
+        last_is_prefix = not q[-1:].isspace()
+
+        with self._lock:
+            total = len(self._docs) or 1
+            groups = []
+            for i, word in enumerate(words):
+                if i == len(words) - 1 and last_is_prefix:
+                    terms = [(t, 1.0 if t == word else PREFIX_PENALTY) for t in self._prefix_terms(word)]
+                else:
+                    terms = [(word, 1.0)] if word in self._postings else []
+                if not terms:
+                    return []
+                groups.append([
+                    (term, factor * math.log(1 + total / len(self._postings[term])))
+                    for term, factor in terms
+                ])
+
+            if len(groups) == 1 and kind is None:
+                # typeahead on one word: each term's best `limit` docs are
+                # enough to find the overall best `limit`
+                scores = {}
+                for term, scale in groups[0]:
+                    for weight, key in self._top(term, limit):
+                        s = weight * scale
+                        if s > scores.get(key, 0.0):
+                            scores[key] = s
+            else:
+                # intersect starting from the rarest word; later words only
+                # score documents still in the running
+                groups.sort(key=lambda g: sum(len(self._postings[t]) for t, _ in g))
+                scores = None
+                for group in groups:
+                    best = {}
+                    for term, scale in group:
+                        postings = self._postings[term]
+                        keys = postings.keys() if scores is None else scores.keys() & postings.keys()
+                        for key in keys:
+                            s = postings[key] * scale
+                            if s > best.get(key, 0.0):
+                                best[key] = s
+                    if scores is None:
+                        scores = {k: s for k, s in best.items() if kind is None or k[0] == kind}
+                    else:
+                        scores = {k: scores[k] + s for k, s in best.items()}
+                    if not scores:
+                        return []
+
+            best = heapq.nlargest(limit, scores.items(), key=itemgetter(1))
+            return [{**self._docs[key], "score": round(score, 4)} for key, score in best]
+
+
+search_index = InvertedIndex()
+_rebuild_lock = threading.Lock()
+
+
+def _rebuild_in_background():
+    db = SessionLocal()
+    try:
+        search_index.rebuild(db)
+    except Exception as e:
+        print(f"Search index rebuild failed: {e!r}")
+    finally:
+        db.close()
+        _rebuild_lock.release()
+
+
+def ensure_fresh(db: Session | None = None):
+    """
+    Build the index on first use. After that a stale index keeps serving
+    while one background thread rebuilds it.
+    """
+    if search_index._built_at is None:
+        with _rebuild_lock:
+            if search_index._built_at is not None:
+                return
+            own = db is None
+            db = db or SessionLocal()
+            try:
+                search_index.rebuild(db)
+            finally:
+                if own:
+                    db.close()
+    elif search_index.stale() and _rebuild_lock.acquire(blocking=False):
+        # released by the thread once the rebuild is done
+        threading.Thread(target=_rebuild_in_background, name="search-rebuild", daemon=True).start()
+
+
+def index_catalog_item(kind: str, obj):
+    """
+    Called by the catalog routers after a successful write.
+    """
+    if search_index._built_at is not None:
+        search_index.upsert(kind, obj)
+    cache_bus.publish("catalog", f"{kind}:{document(kind, obj)['id']}")
+
+
+def remove_catalog_item(kind: str, doc_id: int):
+    search_index.remove(kind, doc_id)
+    cache_bus.publish("catalog", f"{kind}:{doc_id}")
+
+
+def refresh_catalog_item(key: str | None):
+    """
+    Another worker wrote "service:12" or "package:3": re-read just that row.
+    """
+    if key is None:
+        return search_index.expire()
+    if search_index._built_at is None:
+        return
+    kind, _, doc_id = key.partition(":")
+    model = Service if kind == "service" else Package
+    db = SessionLocal()
+    try:
+        obj = db.get(model, int(doc_id))
+        if obj is None:
+            search_index.remove(kind, int(doc_id))
+        else:
+            search_index.upsert(kind, obj)
+    finally:
+        db.close()
+
+
+cache_bus.subscribe("catalog", refresh_catalog_item)
+
+
+# -------- POSTGRES BACKEND --------
+def _tsquery(q: str) -> str | None:
+    words = tokenize(q)
+    if not words:
+        return None
+    terms = words[:-1] + [words[-1] + ":*" if not q[-1:].isspace() else words[-1]]
+    return " & ".join(terms)
+
+
+def postgres_search(db: Session, q: str, limit: int = 10, kind: str | None = None) -> list[dict]:
+    tsq = _tsquery(q)
+    if tsq is None:
+        return []
+    query = func.to_tsquery("simple", tsq)
+
+    parts = []
+    if kind in (None, "service"):
+        parts.append(
+            select(literal("service").label("type"), Service.service_id.label("id"), Service.name,
+                   Service.category, Service.base_price.label("price"),
+                   func.ts_rank(service_search_vector, query).label("score"))
+            .where(service_search_vector.op("@@")(query))
+        )
+    if kind in (None, "package"):
+        parts.append(
+            select(literal("package").label("type"), Package.package_id.label("id"), Package.name,
+                   Package.category, Package.price.label("price"),
+                   func.ts_rank(package_search_vector, query).label("score"))
+            .where(package_search_vector.op("@@")(query))
+        )
+    combined = union_all(*parts).subquery()
+    rows = db.execute(
+        select(combined).order_by(combined.c.score.desc(), combined.c.type, combined.c.id).limit(limit)
+    ).mappings()
+    return [
+        {**row, "price": float(row["price"]) if row["price"] is not None else None,
+         "score": round(float(row["score"]), 4)}
+        for row in rows
+    ]
+
+
+def search_catalog(db: Session, q: str, limit: int = 10, kind: str | None = None) -> list[dict]:
+    if SEARCH_BACKEND == "postgres":
+        return postgres_search(db, q, limit, kind)
+    ensure_fresh(db)
+    return search_index.search(q, limit, kind)
@@ -0,0 +1,57 @@
+from fastapi import HTTPException, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only
+
+
+class FieldSelection:
+    """
+    Dependency for an optional `?fields=a,b,c` parameter, validated against
+    the response schema. Resolves to the requested names in order, or None
+    when the parameter is absent.
+    """
+
+    def __init__(self, schema):
+        self.allowed = list(schema.model_fields)
+
+    def __call__(self, fields: str | None = Query(
+        None, description="Comma-separated subset of fields to return"
+    )):
+        if not fields:
+            return None
+
+        names = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+        unknown = [n for n in names if n not in self.allowed]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown field(s): {', '.join(unknown)}. Allowed: {', '.join(self.allowed)}"
+            )
+        return names or None
+
+
+def load_fields(query, model, fields):
+    """
+    Restrict the SELECT to the requested columns (plus the primary key).
+    """
+    if fields is None:
+        return query
+
+    mapper = inspect(model)
+    columns = {attr.key for attr in mapper.column_attrs}
+    keys = [mapper.get_property_by_column(c).key for c in mapper.primary_key]
+    keys += [f for f in fields if f in columns and f not in keys]
+    return query.options(load_only(*(getattr(model, k) for k in keys)))
+
+
+def sparse_response(rows, fields):
+    """
+    Full rows go through the route's response_model as usual; a field
+    selection is serialised directly, touching only the loaded attributes.
+    """
+    if fields is None:
+        return rows
+    return JSONResponse(jsonable_encoder([
+        {f: getattr(row, f) for f in fields} for row in rows
+    ]))
@@ -0,0 +1,104 @@
+"""
+Cache invalidation bus: delivery latency and gap handling.
+
+    python -m benchmarks.cache_bus --messages 100
+    CACHE_BUS=postgres DATABASE_URL=postgresql://... python -m benchmarks.cache_bus
+
+Runs two buses in this process, each with its own publisher id, as two
+workers would. By default they share a temporary file log. Checks that:
+  - every message reaches the other worker in order, and never the sender;
+  - a skipped sequence number and a truncated log each cause one full flush.
+Exits non-zero on any mismatch.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("CACHE_BUS", f"file:{tempfile.mktemp(suffix='.bus')}")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app.core.invalidation import CACHE_BUS, InvalidationBus  # noqa: E402
+from benchmarks.run import percentile  # noqa: E402
+
+
+def wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.005)
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=100)
+    args = parser.parse_args()
+
+    writer, reader = InvalidationBus(CACHE_BUS), InvalidationBus(CACHE_BUS)
+    received, echoed, flushed = [], [], []
+    arrived = threading.Event()
+
+    def on_item(key):
+        if key is None:
+            flushed.append(time.perf_counter())
+        else:
+            received.append((int(key), time.perf_counter()))
+            arrived.set()
+
+    reader.subscribe("bench", on_item)
+    writer.subscribe("bench", lambda key: echoed.append(key))
+    reader.start()
+    writer.start()
+    if CACHE_BUS == "postgres":
+        # LISTEN has to be in place before anything is published
+        wait_for(lambda: reader.flushes and writer.flushes)
+        flushed.clear()
+        echoed.clear()
+
+    failures = []
+    latencies = []
+    for i in range(args.messages):
+        arrived.clear()
+        sent = time.perf_counter()
+        writer.publish("bench", i)
+        if not arrived.wait(5.0):
+            failures.append(f"message {i} never arrived")
+            break
+        latencies.append((received[-1][1] - sent) * 1000)
+
+    if [k for k, _ in received] != list(range(len(received))):
+        failures.append("messages arrived out of order")
+    if echoed:
+        failures.append(f"sender received {len(echoed)} of its own messages")
+
+    # a lost message: the next one the reader sees skips a number
+    next(writer._seq)
+    writer.publish("bench", -1)
+    if not wait_for(lambda: len(flushed) == 1):
+        failures.append(f"expected 1 flush after a sequence gap, saw {len(flushed)}")
+    if any(k == -1 for k, _ in received):
+        failures.append("message after a gap was applied instead of flushing")
+
+    if CACHE_BUS.startswith("file:"):
+        with open(CACHE_BUS[len("file:"):], "w"):
+            pass
+        if not wait_for(lambda: len(flushed) == 2):
+            failures.append(f"expected a flush after log truncation, saw {len(flushed) - 1}")
+
+    reader.stop()
+    writer.stop()
+
+    latencies.sort()
+    print(f"{CACHE_BUS}: {len(received)} message(s), delivery p50 {percentile(latencies, 50):.2f}ms "
+          f"p99 {percentile(latencies, 99):.2f}ms, {len(flushed)} flush(es)")
+    for failure in failures:
+        print("FAIL", failure)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Burst ingest throughput for POST /contact/: per-request commit vs write-behind.
+
+    python -m benchmarks.contact_ingest --submissions 5000 --threads 16
+
+Uses a throwaway SQLite file unless DATABASE_URL is already set.
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mktemp(suffix='.db')}")
+
+from app.core.database import SessionLocal, init_db  # noqa: E402
+from app.models.contact import Contact  # noqa: E402
+from app.routers.contact import create_contact  # noqa: E402
+from app.schemas.contact import ContactCreate  # noqa: E402
+from app.services.contact_buffer import contact_buffer  # noqa: E402
+
+
+def submission(i: int) -> ContactCreate:
+    return ContactCreate(
+        name=f"Visitor {i}",
+        email=f"visitor{i}@example.com",
+        phone="9999999999",
+        subject="Campaign enquiry",
+        message="I would like to know more about deep cleaning packages."
+    )
+
+
+def run(submissions: int, threads: int, write_behind: bool) -> dict:
+    contact_buffer.enabled = write_behind
+    contact_buffer.max_size = submissions
+    contact_buffer.start()
+    rejected = 0
+
+    def post(i):
+        db = SessionLocal()
+        try:
+            res = create_contact(submission(i), db)
+            return getattr(res, "status_code", 200)
+        finally:
+            db.close()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        for status in pool.map(post, range(submissions)):
+            rejected += status == 429
+    accepted = time.perf_counter() - start
+    contact_buffer.stop()
+    durable = time.perf_counter() - start
+
+    return {
+        "mode": "write-behind" if write_behind else "per-request commit",
+        "submissions": submissions,
+        "rejected": rejected,
+        "accept_seconds": round(accepted, 3),
+        "durable_seconds": round(durable, 3),
+        "accepted_per_second": round(submissions / accepted),
+        "durable_per_second": round(submissions / durable),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--submissions", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=16)
+    args = parser.parse_args()
+
+    init_db()
+    for write_behind in (False, True):
+        db = SessionLocal()
+        db.query(Contact).delete()
+        db.commit()
+        db.close()
+        print(run(args.submissions, args.threads, write_behind))
+
+
+if __name__ == "__main__":
+    main()
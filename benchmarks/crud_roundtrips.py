@@ -0,0 +1,165 @@
+"""
+Round trips per update/delete: SELECT + write + commit + refresh versus
+the single-statement RETURNING paths in app.core.repository.
+
+    python -m benchmarks.crud_roundtrips --iterations 2000
+    python -m benchmarks.crud_roundtrips --simulated-rtt-ms 0.5   # as if the DB were across a network
+
+Uses a throwaway SQLite file unless DATABASE_URL is already set. Runs the
+old handler bodies inline next to the current router functions and
+reports statements, commits and mean latency per operation.
+"""
+import argparse
+import itertools
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mktemp(suffix='.db')}")
+os.environ.setdefault("NOTIFICATION_SINK", "file:/dev/null")
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+
+from app.core.database import SessionLocal, get_engine, init_db  # noqa: E402
+from app.models import Area, Booking  # noqa: E402
+from app.routers.area import update_area  # noqa: E402
+from app.routers.bookings import delete_booking, update_booking  # noqa: E402
+from app.schemas.area import AreaUpdate  # noqa: E402
+from app.schemas.booking import BookingUpdate  # noqa: E402
+from app.services.bookings import update_booking_status  # noqa: E402
+from app.services.outbox import record_booking_event  # noqa: E402
+
+
+# -------- PREVIOUS HANDLER BODIES --------
+def legacy_update_area(area_id, data, db):
+    area = db.query(Area).filter(Area.area_id == area_id).first()
+    for k, v in data.dict(exclude_unset=True).items():
+        setattr(area, k, v)
+    db.commit()
+    db.refresh(area)
+    return area
+
+
+def legacy_update_booking(booking_id, data, db):
+    booking = db.query(Booking).filter(Booking.booking_id == booking_id).first()
+    changes = data.dict(exclude_unset=True)
+    previous = {key: getattr(booking, key) for key in changes}
+    for key, value in changes.items():
+        setattr(booking, key, value)
+    record_booking_event(db, booking, "booking.updated", jsonable_encoder(previous))
+    db.commit()
+    db.refresh(booking)
+    return booking
+
+
+def legacy_update_booking_status(booking_id, status, db):
+    booking = db.query(Booking).filter(Booking.booking_id == booking_id).first()
+    previous = {"status": booking.status}
+    booking.status = status
+    record_booking_event(db, booking, "booking.status_changed", previous)
+    db.commit()
+    db.refresh(booking)
+    return booking
+
+
+def legacy_delete_booking(booking_id, db):
+    booking = db.query(Booking).filter(Booking.booking_id == booking_id).first()
+    record_booking_event(db, booking, "booking.deleted")
+    db.delete(booking)
+    db.commit()
+
+
+# -------- HARNESS --------
+class RoundTrips:
+    def __init__(self, engine, simulated_rtt: float):
+        self.statements = 0
+        self.commits = 0
+        self.simulated_rtt = simulated_rtt
+        event.listen(engine, "before_cursor_execute", self._statement)
+        event.listen(engine, "commit", self._commit)
+
+    def _statement(self, *args):
+        self.statements += 1
+        if self.simulated_rtt:
+            time.sleep(self.simulated_rtt)
+
+    def _commit(self, conn):
+        self.commits += 1
+        if self.simulated_rtt:
+            time.sleep(self.simulated_rtt)
+
+
+def seed(n: int) -> tuple[int, list[int]]:
+    db = SessionLocal()
+    area = Area(name="Bench", city="Bench", pincode="000000")
+    db.add(area)
+    db.flush()
+    when = datetime.now(timezone.utc) + timedelta(days=1)
+    bookings = [
+        Booking(user_id=1, area_id=area.area_id, service_id=1, professional_id=1,
+                scheduled_at=when, total_price=100, details="bench")
+        for _ in range(n)
+    ]
+    db.add_all(bookings)
+    db.commit()
+    ids = [b.booking_id for b in bookings]
+    area_id = area.area_id
+    db.close()
+    return area_id, ids
+
+
+def measure(counter: RoundTrips, name: str, calls) -> dict:
+    counter.statements = counter.commits = 0
+    start = time.perf_counter()
+    for call in calls:
+        db = SessionLocal()
+        try:
+            call(db)
+        finally:
+            db.close()
+    elapsed = time.perf_counter() - start
+    n = len(calls)
+    return {
+        "operation": name,
+        "statements_per_op": round(counter.statements / n, 2),
+        "commits_per_op": round(counter.commits / n, 2),
+        "mean_ms": round(elapsed / n * 1000, 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--simulated-rtt-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    init_db()
+    n = args.iterations
+    area_id, ids = seed(4 * n)
+    counter = RoundTrips(get_engine(), args.simulated_rtt_ms / 1000)
+    reprice = BookingUpdate(total_price=120)
+    renames = (AreaUpdate(name=f"Bench {i}") for i in itertools.count())
+
+    groups = [
+        ("update_area", lambda db: legacy_update_area(area_id, next(renames), db),
+                        lambda db: update_area(area_id, next(renames), db)),
+        ("update_booking", lambda db, i=iter(ids[:n]): legacy_update_booking(next(i), reprice, db),
+                           lambda db, i=iter(ids[:n]): update_booking(next(i), reprice, db)),
+        ("update_booking_status",
+            lambda db, i=iter(ids[n:2 * n]): legacy_update_booking_status(next(i), "cancelled", db),
+            lambda db, i=iter(ids[n:2 * n]): update_booking_status(next(i), "completed", db)),
+        ("delete_booking", lambda db, i=iter(ids[2 * n:3 * n]): legacy_delete_booking(next(i), db),
+                           lambda db, i=iter(ids[3 * n:]): delete_booking(next(i), db)),
+    ]
+    for name, legacy, current in groups:
+        before = measure(counter, name, [legacy] * n)
+        after = measure(counter, name, [current] * n)
+        print(f"{name:24} statements {before['statements_per_op']:>4} -> {after['statements_per_op']:<4} "
+              f"commits {before['commits_per_op']} -> {after['commits_per_op']}  "
+              f"mean {before['mean_ms']}ms -> {after['mean_ms']}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Cold-start import budget for app.main.
+
+    python -m benchmarks.import_budget                  # check against the budget
+    python -m benchmarks.import_budget --report 25      # plus an -X importtime breakdown
+
+Imports app.main in fresh interpreters and fails (exit 1) when the median
+wall time exceeds --budget-ms (IMPORT_BUDGET_MS), or when importing it
+creates the database engine or pulls in modules that must stay lazy.
+Meant to run in CI next to the benchmarks.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1200"))
+
+# Only needed once a specific request path runs; importing any of them at
+# startup is a regression.
+MUST_STAY_LAZY = ["requests", "smtplib", "pydantic_settings", "numpy"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import app.main
+elapsed = (time.perf_counter() - start) * 1000
+import app.core.database as database
+print(json.dumps({
+    "ms": elapsed,
+    "engine_created": database._engine is not None,
+    "loaded": [m for m in %r if m in sys.modules],
+}))
+"""
+
+
+def child_env():
+    env = dict(os.environ)
+    # never reached if the engine stays lazy; set so a regression fails on
+    # the checks below rather than on a missing variable
+    env.setdefault("DATABASE_URL", "sqlite:///:memory:")
+    return env
+
+
+def measure(runs: int):
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE % MUST_STAY_LAZY],
+            capture_output=True, text=True, env=child_env(), check=True
+        )
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return samples
+
+
+def importtime_report(top: int):
+    """
+    Parse `-X importtime` output into (cumulative_us, self_us, module) rows.
+    """
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True, text=True, env=child_env(), check=True
+    )
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+
+    by_package = {}
+    for cumulative_us, self_us, name in rows:
+        package = name.strip().split(".")[0]
+        by_package[package] = by_package.get(package, 0) + self_us
+
+    print(f"\nTop {top} imports by cumulative time:")
+    for cumulative_us, self_us, name in sorted(rows, reverse=True)[:top]:
+        print(f"  {cumulative_us / 1000:8.1f}ms  (self {self_us / 1000:6.1f}ms)  {name}")
+
+    print("\nSelf time by top-level package:")
+    for package, us in sorted(by_package.items(), key=lambda kv: -kv[1])[:top]:
+        print(f"  {us / 1000:8.1f}ms  {package}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--report", type=int, default=0, metavar="N", help="print the top N imports")
+    args = parser.parse_args()
+
+    samples = measure(args.runs)
+    median = statistics.median(s["ms"] for s in samples)
+    failures = []
+    if median > args.budget_ms:
+        failures.append(f"import took {median:.0f}ms, budget is {args.budget_ms:.0f}ms")
+    if any(s["engine_created"] for s in samples):
+        failures.append("the database engine was created at import time")
+    eager = sorted({m for s in samples for m in s["loaded"]})
+    if eager:
+        failures.append(f"imported eagerly: {', '.join(eager)}")
+
+    print(f"import app.main: median {median:.0f}ms over {args.runs} runs "
+          f"(min {min(s['ms'] for s in samples):.0f}ms, budget {args.budget_ms:.0f}ms)")
+    if args.report:
+        importtime_report(args.report)
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Monthly partitioning of `bookings`, checked on a real Postgres.
+
+    python -m benchmarks.partition_check --database-url postgresql://localhost/scratch --reset
+
+Seeds the target with benchmarks.seed (every table is dropped first, so
+--reset is required), runs `app.core.partitions --convert` and checks:
+  - a --dry-run changes nothing;
+  - every row survived value for value, which also catches a column
+    order mismatch between `LIKE bookings` and `INSERT ... SELECT *`;
+  - booking_id's sequence survived the old table's DROP, belongs to the
+    new table and keeps counting;
+  - the model's indexes and foreign keys are back, and a dangling
+    user_id is rejected;
+  - a booking beyond the created months lands in the default partition,
+    and `ensure` moves it into its own month;
+  - an emptied month is dropped by `drop_empty_before`.
+Exits non-zero on any mismatch.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", ""))
+    parser.add_argument("--scale", type=int, default=20_000, help="number of bookings")
+    parser.add_argument("--reset", action="store_true", help="required: all tables are dropped first")
+    args = parser.parse_args()
+    if not args.database_url.startswith("postgresql"):
+        parser.error("partitioning needs Postgres; pass a postgresql:// --database-url")
+    if not args.reset:
+        parser.error("the check drops every table in the target database; pass --reset to confirm")
+    os.environ["DATABASE_URL"] = args.database_url
+
+    from sqlalchemy import text
+    from sqlalchemy.exc import IntegrityError
+
+    from app.core import partitions
+    from app.core.database import SessionLocal, get_engine
+    from app.models.booking import Booking
+    from benchmarks.seed import load, volumes
+
+    engine = get_engine()
+    load(engine, volumes(args.scale))
+
+    def snapshot(conn):
+        # the whole row as text, so values and column order both count
+        return conn.execute(text(
+            "SELECT count(*), md5(string_agg(b::text, ',' ORDER BY booking_id)) FROM bookings b"
+        )).one()
+
+    def table_of(conn, booking_id):
+        return conn.execute(text(
+            "SELECT tableoid::regclass::text FROM bookings WHERE booking_id = :id"
+        ), {"id": booking_id}).scalar()
+
+    failures = []
+    with engine.connect() as conn:
+        before = snapshot(conn)
+
+    partitions.convert(engine, dry_run=True, log=lambda line: None)
+    with engine.connect() as conn:
+        if partitions.is_partitioned(conn) or snapshot(conn) != before:
+            failures.append("--dry-run changed the table")
+
+    start = time.perf_counter()
+    partitions.convert(engine, log=lambda line: None)
+    elapsed = time.perf_counter() - start
+
+    with engine.connect() as conn:
+        if not partitions.is_partitioned(conn):
+            failures.append("bookings is not partitioned after --convert")
+        after = snapshot(conn)
+        if after != before:
+            failures.append(f"rows changed: {before} -> {after}")
+
+        sequence = conn.execute(text("SELECT pg_get_serial_sequence('bookings', 'booking_id')")).scalar()
+        if sequence != "public.bookings_booking_id_seq":
+            failures.append(f"booking_id sequence is {sequence!r}")
+
+        indexes = set(conn.execute(text(
+            "SELECT indexname FROM pg_indexes WHERE tablename = 'bookings'"
+        )).scalars())
+        missing = {ix.name for ix in Booking.__table__.indexes} - indexes
+        if missing:
+            failures.append(f"indexes missing: {sorted(missing)}")
+
+        fks = conn.execute(text(
+            "SELECT count(*) FROM pg_constraint WHERE conrelid = 'bookings'::regclass AND contype = 'f'"
+        )).scalar()
+        if fks != len(Booking.__table__.foreign_key_constraints):
+            failures.append(f"{fks} foreign key(s), model has {len(Booking.__table__.foreign_key_constraints)}")
+        months = [name for name in partitions.partitions(conn) if not name.endswith("_default")]
+
+    db = SessionLocal()
+    try:
+        template = db.query(Booking).order_by(Booking.booking_id).first()
+        fields = {c.key: getattr(template, c.key) for c in Booking.__mapper__.column_attrs
+                  if c.key not in ("booking_id", "created_at", "scheduled_at")}
+
+        now = datetime.now(timezone.utc)
+        fresh = Booking(**{**fields, "scheduled_at": now + timedelta(days=1)})
+        far = Booking(**{**fields, "scheduled_at": now + timedelta(days=400)})
+        db.add_all([fresh, far])
+        db.commit()
+        if fresh.booking_id <= before[0]:
+            failures.append(f"new booking got id {fresh.booking_id}, at or below the seeded {before[0]}")
+
+        db.add(Booking(**{**fields, "user_id": -1, "scheduled_at": now}))
+        try:
+            db.commit()
+            failures.append("a booking with a dangling user_id was accepted")
+        except IntegrityError:
+            db.rollback()
+
+        far_id = far.booking_id
+        far_month = partitions.partition_name(partitions.month_start(far.scheduled_at.date()))
+    finally:
+        db.close()
+
+    with engine.connect() as conn:
+        if table_of(conn, far_id) != "bookings_default":
+            failures.append(f"far-future booking went to {table_of(conn, far_id)}, not the default partition")
+
+    created = partitions.ensure(engine, log=lambda line: None)
+    with engine.connect() as conn:
+        if far_month not in created or table_of(conn, far_id) != far_month:
+            failures.append(f"ensure created {created}; far-future booking is in {table_of(conn, far_id)}")
+        if conn.execute(text("SELECT count(*) FROM bookings_default")).scalar():
+            failures.append("rows left in the default partition after ensure")
+    if partitions.ensure(engine, log=lambda line: None):
+        failures.append("a second ensure created partitions again")
+
+    oldest = datetime.strptime(months[0][len("bookings_"):], "%Y_%m").date()
+    with engine.begin() as conn:
+        conn.execute(text(f"DELETE FROM {months[0]}"))
+    dropped = partitions.drop_empty_before(engine, partitions.next_month(oldest), log=lambda line: None)
+    if dropped != [months[0]]:
+        failures.append(f"drop_empty_before dropped {dropped}, expected {[months[0]]}")
+
+    print(f"converted {before[0]} booking(s) into {len(months)} month partition(s) in {elapsed:.2f}s")
+    for failure in failures:
+        print("FAIL", failure)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Query-plan regression check for the hot queries.
+
+    python -m benchmarks.query_plans                       # seeded throwaway SQLite
+    python -m benchmarks.query_plans --database-url postgresql://... --scale 200000 --reset
+
+Seeds data with benchmarks.seed, builds each hot query with the router
+function that serves it, runs EXPLAIN and exits non-zero unless the plan
+uses the index the query was written for and, for ordered queries, reads
+rows in that index's order instead of sorting them. On Postgres
+sequential scans and sorts are disabled for the check, so it asserts that
+a usable index exists rather than second-guessing the planner's costing
+on a small data set.
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+
+from sqlalchemy import func, select, text
+from sqlalchemy.orm import Session
+
+from benchmarks.seed import load, volumes
+
+
+# a Sort node, not the "Sort Key:" detail line under one
+PG_SORT = re.compile(r"(^|->\s+)(Incremental )?Sort\s+\(")
+SQLITE_SORT = "USE TEMP B-TREE FOR ORDER BY"
+
+
+def _count(query):
+    # the statement Query.count() runs
+    return select(func.count()).select_from(query.statement.subquery())
+
+
+def hot_queries(db: Session):
+    """
+    The statements behind the busiest endpoints, built by the same
+    functions the routers call.
+    name -> (index the plan must use, whether it must avoid a sort, statement)
+    """
+    from app.models import Booking
+    from app.routers.bookings import user_bookings_query
+    from app.routers.professional_dashboard import jobs_query
+    from app.routers.professional_jobs import my_jobs_query
+    from app.routers.professionals import search_query
+
+    return {
+        "professionals.search": (
+            "ix_professionals_market_rating", True, search_query(db, 3, 5).statement
+        ),
+        "bookings.user": (
+            "ix_bookings_user_created", True, user_bookings_query(db, 42).statement
+        ),
+        "bookings.user.packages": (
+            "ix_bookings_user_created", True, user_bookings_query(db, 42, packages=True).statement
+        ),
+        "bookings.user.normal": (
+            "ix_bookings_user_created", True, user_bookings_query(db, 42, packages=False).statement
+        ),
+        "dashboard.pending_count": (
+            "ix_bookings_professional_status", False, _count(jobs_query(db, 17, "pending"))
+        ),
+        "dashboard.earnings": (
+            "ix_bookings_professional_status", False,
+            jobs_query(db, 17, "completed", Booking.total_price).statement
+        ),
+        "jobs.my_jobs": (
+            "ix_bookings_professional_status", False, my_jobs_query(db, 17).statement
+        ),
+    }
+
+
+def explain(conn, statement) -> list[str]:
+    sql = str(statement.compile(conn, compile_kwargs={"literal_binds": True}))
+    if conn.dialect.name == "sqlite":
+        return [row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+    return [row[0] for row in conn.exec_driver_sql(f"EXPLAIN {sql}")]
+
+
+def index_names(conn, index: str) -> set[str]:
+    """
+    `index` and, on a partitioned Postgres table, the per-partition
+    indexes the planner actually reports.
+    """
+    if conn.dialect.name != "postgresql":
+        return {index}
+    children = conn.execute(text(
+        "SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = to_regclass(:name)"
+    ), {"name": index}).scalars()
+    return {index, *children}
+
+
+def problems(plan: list[str], indexes: set[str], ordered: bool, dialect: str) -> list[str]:
+    found = []
+    if not any(re.search(rf"\b{re.escape(name)}\b", line) for line in plan for name in indexes):
+        found.append(f"{min(indexes)} not used")
+    if ordered:
+        if dialect == "sqlite":
+            sorts = any(SQLITE_SORT in line for line in plan)
+        else:
+            sorts = any(PG_SORT.search(line) for line in plan)
+        if sorts:
+            found.append("rows are sorted instead of read in index order")
+    return found
+
+
+def check(engine) -> bool:
+    ok = True
+    with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            # a Sort left in the plan now means no index can supply the order
+            conn.exec_driver_sql("SET enable_seqscan = off")
+            conn.exec_driver_sql("SET enable_sort = off")
+        db = Session(bind=conn)
+        for name, (index, ordered, statement) in hot_queries(db).items():
+            plan = explain(conn, statement)
+            found = problems(plan, index_names(conn, index), ordered, engine.dialect.name)
+            ok = ok and not found
+            print(f"{'FAIL' if found else 'ok  '} {name}{': ' + '; '.join(found) if found else ''}")
+            for line in plan:
+                print(f"       {line}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--scale", type=int, default=50_000)
+    parser.add_argument("--no-seed", action="store_true")
+    parser.add_argument("--reset", action="store_true", help="required to seed a database given by URL")
+    args = parser.parse_args()
+    if args.database_url and not (args.no_seed or args.reset):
+        parser.error("seeding drops every table in the target database; pass --reset or --no-seed")
+
+    with tempfile.TemporaryDirectory() as scratch:
+        os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{os.path.join(scratch, 'plans.db')}"
+        from app.core.database import get_engine
+
+        engine = get_engine()
+        if not args.no_seed:
+            load(engine, volumes(args.scale), log=lambda msg: None)
+        ok = check(engine)
+        engine.dispose()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Rating aggregates under concurrent review submission.
+
+    python -m benchmarks.rating_concurrency --bookings 2000 --threads 16
+    DATABASE_URL=postgresql://... python -m benchmarks.rating_concurrency
+
+Seeds one market of professionals with completed bookings, then submits
+every booking's review twice from a thread pool, so duplicates race
+each other as well as other reviews of the same professional. Checks:
+  - exactly one review per booking was accepted, the rest got 409;
+  - every aggregate matches a recompute from raw reviews;
+  - the in-memory top-k matches a sort of Professional.rating.
+Exits non-zero on any mismatch. Uses a throwaway SQLite file unless
+DATABASE_URL is already set.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mktemp(suffix='.db')}")
+
+from fastapi import HTTPException  # noqa: E402
+
+from app.core.database import SessionLocal, init_db  # noqa: E402
+from app.models import Area, Booking, Professional, Service, User  # noqa: E402
+from app.schemas.review import ReviewCreate  # noqa: E402
+from app.services.ratings import check_ratings, submit_review, top_professionals  # noqa: E402
+
+
+def seed(professionals: int, bookings: int, rng: random.Random):
+    db = SessionLocal()
+    area = Area(name="Bench", city="Bench", pincode="000000")
+    service = Service(name="Bench", category="Bench", base_price=100)
+    user = User(name="Bench", email=f"bench-{time.time_ns()}@example.com", phone="0", password_hash="x")
+    db.add_all([area, service, user])
+    db.flush()
+    pros = [
+        Professional(name=f"Pro {i}", email=f"pro-{time.time_ns()}-{i}@example.com", phone="0",
+                     password_hash="x", area_id=area.area_id, service_id=service.service_id)
+        for i in range(professionals)
+    ]
+    db.add_all(pros)
+    db.flush()
+    rows = [
+        Booking(user_id=user.user_id, area_id=area.area_id, service_id=service.service_id,
+                professional_id=rng.choice(pros).professional_id, status="completed",
+                scheduled_at=datetime.now(timezone.utc), total_price=100, details="bench")
+        for _ in range(bookings)
+    ]
+    db.add_all(rows)
+    db.commit()
+    market = (area.area_id, service.service_id)
+    ids = [b.booking_id for b in rows]
+    db.close()
+    return market, ids
+
+
+def submit(booking_id: int, rating: int) -> int:
+    db = SessionLocal()
+    try:
+        submit_review(ReviewCreate(booking_id=booking_id, rating=rating), db)
+        return 200
+    except HTTPException as e:
+        return e.status_code
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--professionals", type=int, default=25)
+    parser.add_argument("--bookings", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=16)
+    args = parser.parse_args()
+
+    init_db()
+    rng = random.Random(11)
+    market, ids = seed(args.professionals, args.bookings, rng)
+
+    db = SessionLocal()
+    top_professionals.top(db, *market, limit=10)  # load the heap so reviews update it in place
+    db.close()
+
+    attempts = [(booking_id, rng.randint(1, 5)) for booking_id in ids for _ in range(2)]
+    rng.shuffle(attempts)
+    start = time.perf_counter()
+    with ThreadPoolExecutor(args.threads) as pool:
+        statuses = list(pool.map(lambda a: submit(*a), attempts))
+    elapsed = time.perf_counter() - start
+
+    failures = []
+    accepted = statuses.count(200)
+    if accepted != len(ids) or statuses.count(409) != len(ids):
+        failures.append(f"expected {len(ids)} accepted and {len(ids)} duplicates, "
+                        f"got {accepted} accepted and statuses {sorted(set(statuses))}")
+
+    db = SessionLocal()
+    try:
+        drift = check_ratings(db)
+        if drift:
+            failures.append(f"{len(drift)} aggregate(s) drifted, e.g. {drift[0]}")
+
+        expected = [
+            p.professional_id for p in
+            db.query(Professional)
+            .filter(Professional.area_id == market[0], Professional.service_id == market[1])
+            .order_by(Professional.rating.desc(), Professional.professional_id.desc())
+            .limit(10)
+        ]
+        served = [pid for _, pid in top_professionals.top(db, *market, limit=10)]
+        if served != expected:
+            failures.append(f"top-k {served} != sorted {expected}")
+    finally:
+        db.close()
+
+    print(f"{len(attempts)} submissions on {args.threads} threads in {elapsed:.2f}s "
+          f"({len(attempts) / elapsed:.0f}/s), {accepted} accepted")
+    for failure in failures:
+        print("FAIL", failure)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Replay a traffic capture against a local instance.
+
+    TRAFFIC_CAPTURE_PATH=traffic.jsonl uvicorn app.main:app      # record
+    python -m benchmarks.replay traffic.jsonl --base-url http://127.0.0.1:8000 --speed 10 --out run.json
+    python -m benchmarks.replay traffic.jsonl --base-url ... --compare run.json
+    python -m benchmarks.replay worker-*.jsonl --base-url ...          # several captures, merged
+
+Requests are issued open-loop at their recorded arrival times (relative
+to the first one) divided by --speed, so the original mix and burstiness
+are preserved. Arrival times are epoch seconds, so captures written by
+different workers merge into one timeline. Bodies and query values are
+rebuilt from the recorded shapes. Latency is reported per route template;
+an error is a 5xx, or a 4xx for a request that originally succeeded.
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlencode
+
+from benchmarks.run import percentile
+
+
+def synthesize(shape, key: str = "", n: int = 0):
+    """
+    Inverse of app.core.capture.shape: a plausible value with the same structure.
+    """
+    if isinstance(shape, dict):
+        if set(shape) == {"list", "item"}:
+            return [synthesize(shape["item"], key, n) for _ in range(shape["list"])]
+        return {k: synthesize(v, k, n) for k, v in shape.items()}
+    if shape == "datetime":
+        return (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()
+    if shape == "int":
+        return 1
+    if isinstance(shape, str) and shape.startswith("int:"):
+        # as many digits as the original, smallest such number
+        return str(10 ** (int(shape[4:]) - 1))
+    if isinstance(shape, str) and shape.startswith("="):
+        return shape[1:]
+    if shape == "float":
+        return 1.0
+    if shape == "bool":
+        return True
+    if isinstance(shape, str) and shape.startswith("str:"):
+        length = int(shape[4:])
+        if key == "email":
+            return f"replay{n}@example.com"
+        return ("x" * length) or ""
+    return shape
+
+
+def load_log(paths: list[str]):
+    entries = []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                if "method" in entry:
+                    entries.append(entry)
+    entries.sort(key=lambda e: e["t"])
+    return entries
+
+
+def build_request(entry: dict, n: int):
+    query = {k: synthesize(v, k, n) for k, v in (entry.get("query") or {}).items()}
+    url = entry["path"] + (f"?{urlencode(query)}" if query else "")
+    body = entry.get("body")
+    if isinstance(body, str):
+        # too large or not JSON; nothing sensible to send
+        body = None
+    return entry["method"], url, synthesize(body, n=n) if body is not None else None
+
+
+async def replay(entries, base_url: str, speed: float, limit: int | None):
+    import httpx
+
+    samples = {}
+    errors = {}
+    if limit:
+        entries = entries[:limit]
+    origin = entries[0]["t"] if entries else 0
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+        start = time.monotonic()
+
+        async def fire(n, entry):
+            delay = (entry["t"] - origin) / speed - (time.monotonic() - start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            method, url, body = build_request(entry, n)
+            route = f"{entry['method']} {entry.get('route') or entry['path']}"
+            t0 = time.perf_counter()
+            try:
+                res = await client.request(method, url, json=body)
+                # replaying a request that was rejected originally is not an error
+                failed = res.status_code >= 500 or (
+                    res.status_code >= 400 and entry.get("status", 200) < 400
+                )
+            except Exception:
+                failed = True
+            samples.setdefault(route, []).append(time.perf_counter() - t0)
+            if failed:
+                errors[route] = errors.get(route, 0) + 1
+
+        await asyncio.gather(*(fire(n, e) for n, e in enumerate(entries)))
+        wall = time.monotonic() - start
+
+    results = {}
+    for route, lat in sorted(samples.items()):
+        lat.sort()
+        results[route] = {
+            "requests": len(lat),
+            "errors": errors.get(route, 0),
+            "p50_ms": round(percentile(lat, 50) * 1000, 3),
+            "p95_ms": round(percentile(lat, 95) * 1000, 3),
+            "p99_ms": round(percentile(lat, 99) * 1000, 3),
+        }
+    return results, wall
+
+
+def compare(current: dict, previous: dict):
+    print(f"\n{'route':<48}{'p50 Δ%':>10}{'p95 Δ%':>10}{'p99 Δ%':>10}")
+    for route, res in current.items():
+        old = previous.get(route)
+        if not old:
+            print(f"{route:<48}{'(new)':>10}")
+            continue
+        delta = lambda k: f"{(res[k] - old[k]) / old[k] * 100:+.1f}" if old[k] else "n/a"
+        print(f"{route:<48}{delta('p50_ms'):>10}{delta('p95_ms'):>10}{delta('p99_ms'):>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("log", nargs="+", help="capture file(s), e.g. one per worker")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--speed", type=float, default=1.0, help="1 = real time, 10 = ten times faster")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--out", default=None)
+    parser.add_argument("--compare", default=None)
+    args = parser.parse_args()
+
+    entries = load_log(args.log)
+    results, wall = asyncio.run(replay(entries, args.base_url, args.speed, args.limit))
+
+    for route, r in results.items():
+        print(f"{route:<48} n={r['requests']:<6} p50 {r['p50_ms']:>8.2f}ms  p95 {r['p95_ms']:>8.2f}ms  "
+              f"p99 {r['p99_ms']:>8.2f}ms  errors {r['errors']}")
+    print(f"replayed {sum(r['requests'] for r in results.values())} requests in {wall:.1f}s at {args.speed}x")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"speed": args.speed, "wall_seconds": round(wall, 3), "results": results}, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(results, json.load(f)["results"])
+
+
+if __name__ == "__main__":
+    main()
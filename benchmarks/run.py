@@ -0,0 +1,216 @@
+"""
+Endpoint benchmark suite.
+
+    python -m benchmarks.run --scale 100000 --concurrency 16 --requests 500 --out baseline.json
+    python -m benchmarks.run --database-url sqlite:///bench.db --no-seed --compare baseline.json
+
+Seeds a database with benchmarks.seed (unless --no-seed), then drives the
+real FastAPI app in-process through httpx's ASGI transport, or a running
+server with --base-url. Writes p50/p95/p99 latency and throughput per
+scenario as JSON, and prints the delta against --compare if given.
+Seeding drops every table first, so seeding a --database-url needs
+--reset. Any 4xx or 5xx response counts as an error.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.seed import BENCH_PASSWORD, load, volumes
+
+
+def percentile(sorted_values, p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # nearest-rank
+    k = max(0, min(len(sorted_values) - 1, math.ceil(p / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def scenarios(v: dict):
+    """
+    name -> function(rng) returning (method, url, json_body). One or two
+    hot endpoints per router.
+    """
+    def rid(rng, table):
+        return rng.randint(1, v[table])
+
+    def booking_body(rng):
+        return {
+            "user_id": rid(rng, "users"),
+            "area_id": rid(rng, "areas"),
+            "service_id": rid(rng, "services"),
+            "professional_id": rid(rng, "professionals"),
+            "scheduled_at": (datetime.now(timezone.utc) + timedelta(days=2)).isoformat(),
+            "total_price": 499,
+            "details": "Benchmark booking",
+        }
+
+    return {
+        "areas.list": lambda rng: ("GET", "/areas/", None),
+        "services.list": lambda rng: ("GET", "/services/", None),
+        "packages.list": lambda rng: ("GET", "/packages/", None),
+        "users.get": lambda rng: ("GET", f"/users/{rid(rng, 'users')}", None),
+        "professionals.search": lambda rng: (
+            "GET", f"/professionals/search?area_id={rid(rng, 'areas')}&service_id={rid(rng, 'services')}", None),
+        "bookings.user": lambda rng: ("GET", f"/bookings/user/{rid(rng, 'users')}", None),
+        "bookings.get": lambda rng: ("GET", f"/bookings/{rid(rng, 'bookings')}", None),
+        "bookings.create": lambda rng: ("POST", "/bookings/", booking_body(rng)),
+        "jobs.my_jobs": lambda rng: ("GET", f"/professionals/jobs/my-jobs/{rid(rng, 'professionals')}", None),
+        "dashboard.get": lambda rng: ("GET", f"/professionals/dashboard/{rid(rng, 'professionals')}", None),
+        "auth.login": lambda rng: (
+            "POST", "/auth/login", {"email": f"user{rid(rng, 'users')}@bench.local", "password": BENCH_PASSWORD}),
+        "contact.create": lambda rng: ("POST", "/contact/", {
+            "name": "Bench", "email": "bench@bench.local", "phone": "9999999999",
+            "subject": "Benchmark", "message": "Load test submission"}),
+    }
+
+
+async def drive(client, make_request, n: int, concurrency: int, seed: int) -> dict:
+    latencies = []
+    errors = 0
+    counter = iter(range(n))
+
+    async def worker(w):
+        nonlocal errors
+        rng = random.Random(seed * 1000 + w)
+        for _ in counter:
+            method, url, body = make_request(rng)
+            start = time.perf_counter()
+            try:
+                res = await client.request(method, url, json=body)
+                # a 4xx means the scenario is not exercising what it claims to
+                if res.status_code >= 400:
+                    errors += 1
+            except Exception:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(w) for w in range(concurrency)))
+    wall = time.perf_counter() - start
+
+    latencies.sort()
+    ms = lambda s: round(s * 1000, 3)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p95_ms": ms(percentile(latencies, 95)),
+        "p99_ms": ms(percentile(latencies, 99)),
+        "mean_ms": ms(sum(latencies) / len(latencies)) if latencies else 0.0,
+        "throughput_rps": round(len(latencies) / wall, 1) if wall else 0.0,
+    }
+
+
+def compare(current: dict, baseline: dict):
+    print(f"\n{'scenario':<22}{'p50 Δ%':>10}{'p95 Δ%':>10}{'p99 Δ%':>10}{'rps Δ%':>10}")
+    for name, res in current["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if not old:
+            print(f"{name:<22}{'(new)':>10}")
+            continue
+        delta = lambda k: f"{(res[k] - old[k]) / old[k] * 100:+.1f}" if old[k] else "n/a"
+        print(f"{name:<22}{delta('p50_ms'):>10}{delta('p95_ms'):>10}{delta('p99_ms'):>10}{delta('throughput_rps'):>10}")
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except Exception:
+        return None
+
+
+async def main_async(args, v):
+    import httpx
+
+    if args.base_url:
+        client = httpx.AsyncClient(base_url=args.base_url, timeout=60)
+    else:
+        from app.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+
+    selected = scenarios(v)
+    if args.only:
+        selected = {k: f for k, f in selected.items() if k in args.only.split(",")}
+
+    results = {}
+    async with client:
+        for name, make_request in selected.items():
+            await drive(client, make_request, min(args.warmup, args.requests), args.concurrency, args.seed)
+            results[name] = await drive(client, make_request, args.requests, args.concurrency, args.seed)
+            r = results[name]
+            print(f"{name:<22} p50 {r['p50_ms']:>8.2f}ms  p95 {r['p95_ms']:>8.2f}ms  "
+                  f"p99 {r['p99_ms']:>8.2f}ms  {r['throughput_rps']:>8.1f} req/s  errors {r['errors']}")
+    return results
+
+
+def run(args, database_url: str):
+    os.environ["DATABASE_URL"] = database_url
+    # the limiter would turn most of the login scenario into 429s
+    os.environ.setdefault("RATE_LIMIT_RULES", "")
+    os.environ.setdefault("NOTIFICATION_SINK", f"file:{os.devnull}")
+
+    v = volumes(args.scale)
+    if not args.no_seed:
+        from app.core.database import engine
+        print(f"Seeding {database_url}: {v}")
+        load(engine, v, args.seed)
+
+    results = asyncio.run(main_async(args, v))
+
+    report = {
+        "meta": {
+            "revision": git_revision(),
+            "at": datetime.now(timezone.utc).isoformat(),
+            "database": database_url.split("://")[0],
+            "volumes": v,
+            "concurrency": args.concurrency,
+            "requests_per_scenario": args.requests,
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(report, json.load(f))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--base-url", default=None, help="benchmark a running server instead of in-process")
+    parser.add_argument("--no-seed", action="store_true", help="reuse an already seeded database")
+    parser.add_argument("--reset", action="store_true", help="required to seed a database given by URL")
+    parser.add_argument("--scale", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=300, help="per scenario")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--only", default=None, help="comma separated scenario names")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default=None)
+    parser.add_argument("--compare", default=None)
+    args = parser.parse_args()
+    if args.no_seed and not (args.database_url or args.base_url):
+        parser.error("--no-seed needs --database-url or --base-url")
+    if args.database_url and not (args.no_seed or args.reset):
+        parser.error("seeding drops every table in the target database; pass --reset or --no-seed")
+
+    with tempfile.TemporaryDirectory() as scratch:
+        run(args, args.database_url or f"sqlite:///{os.path.join(scratch, 'bench.db')}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Per-keystroke latency of the in-memory catalog search.
+
+    python -m benchmarks.search_latency --services 500 --packages 1500
+
+Indexes a synthetic catalog (no database needed), then replays typeahead
+sessions one keystroke at a time and prints p50/p99/max per query.
+Exits non-zero when p99 is over --budget-ms (default 1ms).
+"""
+import argparse
+import random
+import sys
+import time
+
+from app.models.package import Package
+from app.models.service import Service
+from app.services.search import InvertedIndex
+from benchmarks.run import percentile
+
+# each category has its own vocabulary; descriptions mix in common filler
+# words with a long-tail (Zipf-ish) distribution, like a real catalog
+CATEGORIES = {
+    "cleaning": "deep clean cleaning kitchen bathroom sofa carpet mattress sanitization disinfection",
+    "pest control": "pest control termite cockroach bed bugs mosquito rodent fumigation",
+    "plumbing": "plumbing plumber leak tap pipe drain blockage tank geyser",
+    "electrical": "electrical electrician wiring fan light switch socket inverter",
+    "appliances": "appliance ac repair servicing gas refill washing machine refrigerator microwave chimney",
+    "water": "water purifier ro filter softener membrane",
+    "painting": "painting wall waterproofing texture putty enamel",
+    "salon": "salon haircut facial massage spa waxing manicure pedicure",
+    "moving": "move packers shifting relocation truck loading",
+    "outdoor": "car wash bike garden lawn pressure washing",
+}
+FILLER = (
+    "service professional home expert trained verified quick same day visit hour warranty "
+    "included materials tools safe eco friendly premium standard basic annual contract "
+    "inspection checkup free doorstep booking rated trusted hygienic equipment support"
+).split()
+
+SESSIONS = [
+    "deep clean kitchen", "ac repair", "pest control termite", "bathroom cleaning",
+    "washing machine repair", "sofa", "water purifier service", "electrician wiring",
+]
+
+
+def catalog(services: int, packages: int, seed: int = 7):
+    rng = random.Random(seed)
+    themes = [(name, words.split()) for name, words in CATEGORIES.items()]
+    filler_weights = [1 / (rank + 1) for rank in range(len(FILLER))]
+
+    def text(words, n, filler=0.5):
+        return " ".join(
+            rng.choices(FILLER, filler_weights)[0] if rng.random() < filler else rng.choice(words)
+            for _ in range(n)
+        )
+
+    for i in range(1, services + 1):
+        category, words = rng.choice(themes)
+        yield "service", Service(service_id=i, name=text(words, 3, 0.1), category=category,
+                                 description=text(words, 25), base_price=rng.randint(200, 5000))
+    for i in range(1, packages + 1):
+        category, words = rng.choice(themes)
+        yield "package", Package(package_id=i, name=text(words, 4, 0.1), category=category,
+                                 price=rng.randint(500, 20000), features=text(words, 15),
+                                 description=text(words, 40))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--services", type=int, default=500)
+    parser.add_argument("--packages", type=int, default=1500)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--budget-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    index = InvertedIndex()
+    start = time.perf_counter()
+    for kind, obj in catalog(args.services, args.packages):
+        index.upsert(kind, obj)
+    print(f"indexed {args.services + args.packages} documents in {time.perf_counter() - start:.2f}s")
+
+    samples = []
+    for _ in range(args.rounds):
+        for session in SESSIONS:
+            for end in range(1, len(session) + 1):
+                t = time.perf_counter()
+                index.search(session[:end], limit=10)
+                samples.append((time.perf_counter() - t) * 1000)
+
+    samples.sort()
+    p99 = percentile(samples, 99)
+    print(f"{len(samples)} keystrokes: p50 {percentile(samples, 50):.3f}ms  "
+          f"p99 {p99:.3f}ms  max {samples[-1]:.3f}ms")
+    sys.exit(0 if p99 <= args.budget_ms else 1)
+
+
+if __name__ == "__main__":
+    main()
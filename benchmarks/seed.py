@@ -0,0 +1,217 @@
+"""
+Synthetic data generator for benchmarks.
+
+    python -m benchmarks.seed --database-url sqlite:///bench.db --scale 10000 --reset
+
+`--scale` sets the number of bookings; the other tables are derived from
+it unless given explicitly. Rows are generated deterministically from
+`--seed` and loaded in chunks with executemany (COPY on Postgres).
+Every user and professional gets the password `benchpass`.
+"""
+import argparse
+import csv
+import io
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+
+BENCH_PASSWORD = "benchpass"
+
+SERVICE_NAMES = [
+    ("Deep Cleaning", "Cleaning"), ("Bathroom Cleaning", "Cleaning"), ("Kitchen Cleaning", "Cleaning"),
+    ("Leak Repair", "Plumbing"), ("Pipe Installation", "Plumbing"), ("Wiring", "Electrical"),
+    ("Switch Installation", "Electrical"), ("AC Repair", "Appliance Repair"),
+    ("Washing Machine Repair", "Appliance Repair"), ("Furniture Repair", "Carpenter"),
+    ("Gardening", "Gardening"), ("Interior Painting", "Renovation"), ("CCTV Setup", "Technology"),
+    ("WiFi Setup", "Technology"),
+]
+CITIES = ["Bengaluru", "Mumbai", "Delhi", "Chennai", "Hyderabad", "Pune", "Kolkata", "Ahmedabad"]
+STATUSES = ["pending", "completed", "completed", "completed", "cancelled"]
+
+
+def volumes(scale: int, **overrides) -> dict:
+    v = {
+        "areas": max(10, scale // 2000),
+        "services": len(SERVICE_NAMES),
+        "packages": 50,
+        "users": max(100, scale // 5),
+        "professionals": max(50, scale // 50),
+        "bookings": scale,
+    }
+    v.update({k: n for k, n in overrides.items() if n is not None})
+    return v
+
+
+def generate(v: dict, seed: int = 42):
+    """
+    Yields (model, row_iterator) in foreign-key order.
+    """
+    from app.core.security import hash_password
+    from app.models import Area, Booking, Package, Professional, Service, User
+
+    rng = random.Random(seed)
+    password_hash = hash_password(BENCH_PASSWORD)
+    now = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    yield Area, ({
+        "area_id": i,
+        "name": f"Area {i}",
+        "city": CITIES[i % len(CITIES)],
+        "pincode": str(560001 + i),
+    } for i in range(1, v["areas"] + 1))
+
+    yield Service, ({
+        "service_id": i,
+        "name": SERVICE_NAMES[(i - 1) % len(SERVICE_NAMES)][0],
+        "category": SERVICE_NAMES[(i - 1) % len(SERVICE_NAMES)][1],
+        "description": f"Professional {SERVICE_NAMES[(i - 1) % len(SERVICE_NAMES)][0].lower()} at home",
+        "base_price": 299 + 100 * (i % 7),
+    } for i in range(1, v["services"] + 1))
+
+    yield Package, ({
+        "package_id": i,
+        "name": f"Package {i}",
+        "category": SERVICE_NAMES[i % len(SERVICE_NAMES)][1],
+        "price": 999 + 250 * (i % 9),
+        "duration": f"{1 + i % 6} hours",
+        "features": "Trained staff, eco-friendly supplies, 30 day warranty, free re-visit",
+        "description": "Bundled home care package with priority scheduling. " * 4,
+    } for i in range(1, v["packages"] + 1))
+
+    yield User, ({
+        "user_id": i,
+        "name": f"User {i}",
+        "email": f"user{i}@bench.local",
+        "phone": f"9{i:09d}",
+        "address": f"{i} Main Road",
+        "password_hash": password_hash,
+        "created_at": (now - timedelta(days=rng.randint(0, 720))).replace(tzinfo=None),
+    } for i in range(1, v["users"] + 1))
+
+    yield Professional, ({
+        "professional_id": i,
+        "name": f"Professional {i}",
+        "email": f"pro{i}@bench.local",
+        "password_hash": password_hash,
+        "phone": f"8{i:09d}",
+        "area_id": rng.randint(1, v["areas"]),
+        "service_id": rng.randint(1, v["services"]),
+        "rating": round(rng.uniform(3.0, 5.0), 2),
+        "is_active": rng.random() < 0.9,
+    } for i in range(1, v["professionals"] + 1))
+
+    def bookings():
+        for i in range(1, v["bookings"] + 1):
+            created = now - timedelta(minutes=rng.randint(0, 60 * 24 * 720))
+            row = {
+                "booking_id": i,
+                "user_id": rng.randint(1, v["users"]),
+                "area_id": rng.randint(1, v["areas"]),
+                "package_id": None,
+                "service_id": None,
+                "professional_id": None,
+                "scheduled_at": created + timedelta(hours=rng.randint(2, 24 * 14)),
+                "status": rng.choice(STATUSES),
+                "total_price": 299 + rng.randint(0, 40) * 50,
+                "details": "Synthetic booking",
+                "created_at": created,
+            }
+            if rng.random() < 0.2:
+                row["package_id"] = rng.randint(1, v["packages"])
+            else:
+                row["service_id"] = rng.randint(1, v["services"])
+                row["professional_id"] = rng.randint(1, v["professionals"])
+            yield row
+
+    yield Booking, bookings()
+
+
+def _chunks(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _copy(conn, table, chunk):
+    cols = list(chunk[0].keys())
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for row in chunk:
+        writer.writerow(["\\N" if row[c] is None else row[c] for c in cols])
+    buf.seek(0)
+    cursor = conn.connection.cursor()
+    cursor.copy_expert(
+        f"COPY {table.name} ({', '.join(cols)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')", buf
+    )
+
+
+def load(engine, v: dict, seed: int = 42, chunk_size: int = 20_000, log=print):
+    """
+    Drop and recreate every table, then bulk load the generated rows.
+    """
+    from sqlalchemy import insert, text
+
+    from app.core.database import Base
+    from app.models import Area, Booking, Package, Professional, Service, User
+
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+
+    with engine.begin() as conn:
+        if engine.dialect.name == "sqlite":
+            conn.exec_driver_sql("PRAGMA synchronous=OFF")
+            conn.exec_driver_sql("PRAGMA journal_mode=MEMORY")
+
+        for model, rows in generate(v, seed):
+            table = model.__table__
+            start = time.perf_counter()
+            n = 0
+            for chunk in _chunks(rows, chunk_size):
+                if engine.dialect.name == "postgresql":
+                    _copy(conn, table, chunk)
+                else:
+                    conn.execute(insert(table), chunk)
+                n += len(chunk)
+            log(f"  {table.name:<14} {n:>10} rows in {time.perf_counter() - start:6.2f}s")
+
+        if engine.dialect.name == "postgresql":
+            # ids were loaded explicitly, move the serial sequences past them
+            for model in (Area, Service, Package, User, Professional, Booking):
+                pk = model.__table__.primary_key.columns.values()[0].name
+                conn.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{model.__tablename__}', '{pk}'), "
+                    f"COALESCE((SELECT MAX({pk}) FROM {model.__tablename__}), 1))"
+                ))
+        conn.exec_driver_sql("ANALYZE")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///bench.db"))
+    parser.add_argument("--scale", type=int, default=10_000, help="number of bookings")
+    for table in ("areas", "services", "packages", "users", "professionals"):
+        parser.add_argument(f"--{table}", type=int)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--chunk-size", type=int, default=20_000)
+    parser.add_argument("--reset", action="store_true", help="required: all tables are dropped first")
+    args = parser.parse_args()
+    if not args.reset:
+        parser.error("seeding drops every table in the target database; pass --reset to confirm")
+
+    os.environ["DATABASE_URL"] = args.database_url
+    from app.core.database import engine
+
+    v = volumes(args.scale, areas=args.areas, services=args.services, packages=args.packages,
+                users=args.users, professionals=args.professionals)
+    print(f"Seeding {args.database_url}: {v}")
+    load(engine, v, args.seed, args.chunk_size)
+
+
+if __name__ == "__main__":
+    main()